@@ -0,0 +1,100 @@
+import time
+import torch
+import argparse
+import pyoe
+
+
+def legacy_input(X: torch.Tensor) -> dict:
+    """
+    Build the input of ARMNet as done before the field ids were cached: the ids
+    are materialised for every row, and the values are copied because the network
+    used to clamp them in place.
+
+    Args:
+        X (torch.Tensor): the batch of values.
+
+    Returns:
+        out (dict): the input of ARMNet.
+    """
+    ids = torch.arange(X.shape[1]).repeat(X.shape[0]).view(X.shape[0], -1)
+    return {"value": X.clone(), "id": ids.to(X.device)}
+
+
+def measure(step, device: str, repeat: int) -> float:
+    """
+    Return the median latency of a step, after a few warm-up steps.
+
+    Args:
+        step (Callable): the function that runs a step.
+        device (str): the device used by the step.
+        repeat (int): the number of measured steps.
+
+    Returns:
+        out (float): the median latency in milliseconds.
+    """
+    for _ in range(3):
+        step()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        step()
+        if device == "cuda":
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the latency of ARMNet per batch size."
+    )
+    parser.add_argument("--dataset", default="dataset_experiment_info/beijingPM2.5")
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--paths", nargs="+", default=["legacy", "cached", "compiled"])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    dataloader = pyoe.Dataloader(dataset_name=args.dataset, data_dir=args.data_dir)
+    X = pyoe.Preprocessor(missing_fill="zero").fill(dataloader.get_data())
+    X = torch.as_tensor(X, dtype=torch.float, device=args.device)
+
+    print(f"ARMNet on {args.device}, latency in milliseconds (median)")
+    print(f"{'path':<10} {'batch':>6} {'inference':>10} {'training':>10}")
+    for path in args.paths:
+        torch.manual_seed(0)
+        model = pyoe.ArmnetModel(
+            dataloader=dataloader,
+            device=args.device,
+            compile_net=path == "compiled",
+        )
+        model.process_model(lr=0.01)
+        if path == "legacy":
+            preprocess = legacy_input
+        else:
+            preprocess = model._ArmnetModel__preprocess_x
+
+        for batch_size in args.batch_sizes:
+            x_batch = X[:batch_size]
+
+            def inference():
+                with torch.no_grad():
+                    model.net(preprocess(x_batch))
+
+            def training():
+                model.optimizer.zero_grad()
+                model.net(preprocess(x_batch)).sum().backward()
+                model.optimizer.step()
+
+            # batch normalization needs more than one row to train
+            model.net.eval()
+            inference_ms = measure(inference, args.device, args.repeat)
+            model.net.train()
+            if batch_size > 1:
+                training_ms = f"{measure(training, args.device, args.repeat):10.3f}"
+            else:
+                training_ms = f"{'-':>10}"
+            print(f"{path:<10} {batch_size:>6} {inference_ms:10.3f} {training_ms}")
@@ -0,0 +1,80 @@
+import time
+import torch
+import argparse
+from pyoe.OEBench.entmax import entmax_module
+
+# the attention of ArmnetModel: 2 heads of 32 exponential neurons
+NHEAD, NHID = 2, 32
+
+
+def measure(step, device: str, repeat: int) -> float:
+    """
+    Return the median latency of a step, after a few warm-up steps.
+
+    Args:
+        step (Callable): the function that runs a step.
+        device (str): the device used by the step.
+        repeat (int): the number of measured steps.
+
+    Returns:
+        out (float): the median latency in milliseconds.
+    """
+    for _ in range(3):
+        step()
+    times = []
+    for _ in range(repeat):
+        if device == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        step()
+        if device == "cuda":
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the entmax implementations on ARMNet attention gates."
+    )
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--fields", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--alphas", type=float, nargs="+", default=[1.5, 1.7, 2.0])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"entmax on {args.device}, latency in milliseconds (median)")
+    print(
+        f"{'alpha':>5} {'fields':>6} {'method':<9} "
+        f"{'forward':>9} {'backward':>9} {'error':>9}"
+    )
+    for alpha in args.alphas:
+        methods = ["bisect", "adaptive"] + (["exact"] if alpha in (1.5, 2.0) else [])
+        for nfield in args.fields:
+            torch.manual_seed(0)
+            # attention gates as computed by SparseAttLayer
+            gates = torch.randn(
+                args.batch_size, NHEAD, NHID, nfield, device=args.device
+            )
+            reference = entmax_module(alpha, method="bisect", n_iter=100)(gates)
+            for method in methods:
+                module = entmax_module(alpha, method=method)
+                error = (module(gates) - reference).abs().max().item()
+                x = gates.clone().requires_grad_()
+
+                def forward():
+                    with torch.no_grad():
+                        module(gates)
+
+                def backward():
+                    module(x).sum().backward()
+
+                forward_ms = measure(forward, args.device, args.repeat)
+                backward_ms = measure(backward, args.device, args.repeat)
+                print(
+                    f"{alpha:>5} {nfield:>6} {method:<9} "
+                    f"{forward_ms:9.3f} {backward_ms:9.3f} {error:9.1e}"
+                )
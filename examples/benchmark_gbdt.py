@@ -0,0 +1,31 @@
+import argparse
+import pyoe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the exact, histogram and warm-started GBDT."
+    )
+    parser.add_argument("--dataset", default="dataset_experiment_info/room_occupancy")
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument(
+        "--modes", nargs="+", default=["exact", "hist", "warm_start"]
+    )
+    parser.add_argument("--trees-per-fit", type=int, default=10)
+    args = parser.parse_args()
+
+    dataloader = pyoe.Dataloader(dataset_name=args.dataset, data_dir=args.data_dir)
+    preprocessor = pyoe.Preprocessor(missing_fill="zero")
+
+    print(f"{'mode':<11} {'time':>9} {'rows/s':>10} {'error':>10}")
+    for mode in args.modes:
+        model = pyoe.GdbtModel(
+            dataloader=dataloader, mode=mode, trees_per_fit=args.trees_per_fit
+        )
+        # test-then-train over the windows of the dataset
+        trainer = pyoe.PrequentialTrainer(dataloader, model, preprocessor)
+        window_metrics = trainer.train()
+        seconds = trainer.get_last_training_time()
+        print(
+            f"{mode:<11} {seconds:8.3f}s {len(dataloader) / seconds:>10.0f} "
+            f"{window_metrics.mean():>10.4f}"
+        )
@@ -0,0 +1,50 @@
+import os
+import torch
+import argparse
+import pyoe
+
+# all codes with regard to multi-process training should be put in the
+# `if __name__ == "__main__":` block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the convergence of Hogwild! against naive training."
+    )
+    parser.add_argument("--dataset", default="dataset_experiment_info/beijingPM2.5")
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--passes", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--lr", type=float, default=0.01)
+    args = parser.parse_args()
+
+    dataloader = pyoe.Dataloader(dataset_name=args.dataset, data_dir=args.data_dir)
+    preprocessor = pyoe.Preprocessor(missing_fill="zero")
+    X = torch.as_tensor(dataloader.get_data(), dtype=torch.float)
+    y = torch.as_tensor(dataloader.get_target(), dtype=torch.float)
+
+    print(f"{len(dataloader)} samples, Hogwild! with {args.processes} processes")
+    print(f"{'trainer':<10} {'pass':>4} {'time':>9} {'loss':>12}")
+    for name in ["naive", "hogwild"]:
+        # same initial weights for both trainers
+        torch.manual_seed(0)
+        model = pyoe.MlpModel(dataloader=dataloader, device="cpu")
+        options = dict(lr=args.lr, batch_size=args.batch_size)
+        if name == "naive":
+            trainer = pyoe.NaiveTrainer(dataloader, model, preprocessor, **options)
+        else:
+            trainer = pyoe.HogwildTrainer(
+                dataloader,
+                model,
+                preprocessor,
+                num_processes=args.processes,
+                **options,
+            )
+
+        # loss on the whole dataset against the cumulative training time
+        elapsed = 0.0
+        for index in range(args.passes):
+            trainer.train()
+            elapsed += trainer.get_last_training_time()
+            with torch.no_grad():
+                loss = model.calculate_loss(X, y)
+            print(f"{name:<10} {index + 1:>4} {elapsed:8.3f}s {loss:>12.4f}")
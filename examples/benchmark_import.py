@@ -0,0 +1,86 @@
+import sys
+import time
+import argparse
+import subprocess
+
+# backends that must not be imported by `import pyoe` alone
+HEAVY_MODULES = [
+    "autogluon",
+    "pyod",
+    "pytorch_tabnet",
+    "menelaus",
+    "river",
+    "streamad",
+    "skmultiflow",
+    "torchvision",
+    "sklearn.ensemble",
+]
+
+STATEMENTS = {
+    "import pyoe": "import pyoe",
+    "pyoe.Dataloader": "import pyoe; pyoe.Dataloader",
+    "pyoe.MlpModel": "import pyoe; pyoe.MlpModel",
+}
+
+
+def measure(statement: str, repeat: int) -> float:
+    """
+    Return the best wall time of running a statement in a fresh interpreter.
+
+    Args:
+        statement (str): the statement to run.
+        repeat (int): the number of runs.
+
+    Returns:
+        out (float): the best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def imported_heavy_modules() -> list[str]:
+    """
+    Return the heavy backends imported by `import pyoe`.
+
+    Returns:
+        out (list[str]): the names of the imported backends.
+    """
+    code = (
+        "import sys, pyoe; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup of pyoe.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="fail if `import pyoe` takes longer than this many seconds",
+    )
+    args = parser.parse_args()
+
+    baseline = measure("import torch", args.repeat)
+    print(f"{'import torch (baseline)':<24} {baseline:.3f}s")
+    timings = {}
+    for name, statement in STATEMENTS.items():
+        timings[name] = measure(statement, args.repeat)
+        print(f"{name:<24} {timings[name]:.3f}s")
+
+    # guard the lazy imports
+    heavy = imported_heavy_modules()
+    if heavy:
+        sys.exit(f"`import pyoe` imported heavy backends: {heavy}")
+    if args.budget is not None and timings["import pyoe"] > args.budget:
+        sys.exit(f"`import pyoe` took longer than {args.budget:.3f}s")
+    print("No heavy backend is imported by `import pyoe`")
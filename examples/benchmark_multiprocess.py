@@ -0,0 +1,48 @@
+import os
+import argparse
+import pyoe
+
+MODELS = {"mlp": "MlpModel", "armnet": "ArmnetModel"}
+
+# all codes with regard to multi-process training should be put in the
+# `if __name__ == "__main__":` block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scaling of data-parallel training on CPU."
+    )
+    parser.add_argument("--dataset", default="dataset_experiment_info/beijingPM2.5")
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument("--model", choices=list(MODELS), default="mlp")
+    parser.add_argument("--world-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+
+    dataloader = pyoe.Dataloader(dataset_name=args.dataset, data_dir=args.data_dir)
+    preprocessor = pyoe.Preprocessor(missing_fill="zero")
+    num_samples = len(dataloader) * args.epochs
+
+    print(f"{args.model} on {os.cpu_count()} cores, {num_samples} samples per pass")
+    baseline = None
+    for world_size in args.world_sizes:
+        model = getattr(pyoe, MODELS[args.model])(dataloader=dataloader, device="cpu")
+        trainer = pyoe.NaiveTrainer(
+            dataloader,
+            model,
+            preprocessor,
+            epochs=args.epochs,
+            batch_size=args.batch_size,
+        )
+        multi_process_trainer = pyoe.MultiProcessTrainer(
+            world_size, dataloader, trainer, preprocessor
+        )
+        multi_process_trainer.train()
+
+        # the time includes spawning the processes and returning the weights
+        seconds = multi_process_trainer.get_last_training_time()
+        throughput = num_samples / seconds
+        baseline = baseline or throughput
+        print(
+            f"{world_size:>3} processes {seconds:8.3f}s "
+            f"{throughput:>12.0f} samples/s {throughput / baseline:6.2f}x"
+        )
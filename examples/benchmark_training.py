@@ -0,0 +1,108 @@
+import time
+import torch
+import warnings
+import argparse
+import pyoe
+from torch.utils.data import DataLoader as TorchDataLoader
+
+MODELS = {"mlp": "MlpModel", "armnet": "ArmnetModel"}
+
+
+def train_legacy(trainer: pyoe.NaiveTrainer) -> None:
+    """
+    Train one pass as done before the device-resident loop: every batch is
+    loaded on the host, copied into a new tensor, moved to the device and
+    batched again by two ``torch.utils.data.DataLoader`` objects.
+
+    Args:
+        trainer (pyoe.NaiveTrainer): the trainer to take the model and data from.
+    """
+    model = trainer.model
+    if model.get_model_type() == "armnet":
+        # the id tensor that ARMNet expects next to the values
+        preprocess = model._ArmnetModel__preprocess_x
+    else:
+        preprocess = lambda x: x
+    loader = pyoe.BatchDataloader(
+        pyoe.DataloaderWrapper(trainer.dataloader),
+        batch_size=trainer.batch_size,
+        shuffle=True,
+    )
+    for X, y, _ in loader:
+        X = trainer.preprocessor.fill(X)
+        X = torch.tensor(X, dtype=torch.float).to(trainer.device)
+        y = torch.tensor(y, dtype=torch.float).to(trainer.device)
+        for _ in range(trainer.epochs):
+            x_loader = TorchDataLoader(X, batch_size=trainer.batch_size)
+            y_loader = TorchDataLoader(y, batch_size=trainer.batch_size)
+            for x_batch, y_batch in zip(x_loader, y_loader):
+                x_batch = preprocess(x_batch.to(trainer.device).float())
+                y_batch = y_batch.to(trainer.device).float()
+                model.optimizer.zero_grad()
+                out = model.net(x_batch).reshape(-1)
+                loss = model.criterion(out, y_batch.reshape(-1))
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(model.net.parameters(), max_norm=1.0)
+                model.optimizer.step()
+
+
+def measure(train, device: str, repeat: int) -> float:
+    """
+    Return the best wall time of a training pass.
+
+    Args:
+        train (Callable): the function that runs a training pass.
+        device (str): the device used for training.
+        repeat (int): the number of passes.
+
+    Returns:
+        out (float): the best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        train()
+        if device == "cuda":
+            torch.cuda.synchronize()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the training throughput of MLP and ARMNet models."
+    )
+    parser.add_argument("--dataset", default="dataset_experiment_info/beijingPM2.5")
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument("--model", choices=list(MODELS), default="mlp")
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # the legacy path copy-constructs tensors, which torch warns about
+    warnings.filterwarnings("ignore", message="To copy construct")
+
+    dataloader = pyoe.Dataloader(dataset_name=args.dataset, data_dir=args.data_dir)
+    model = getattr(pyoe, MODELS[args.model])(dataloader=dataloader, device=args.device)
+    preprocessor = pyoe.Preprocessor(missing_fill="zero")
+    options = dict(epochs=args.epochs, batch_size=args.batch_size)
+    trainers = {
+        "legacy": pyoe.NaiveTrainer(dataloader, model, preprocessor, **options),
+        "loaded": pyoe.NaiveTrainer(
+            dataloader, model, preprocessor, resident=False, **options
+        ),
+        "resident": pyoe.NaiveTrainer(dataloader, model, preprocessor, **options),
+    }
+
+    num_samples = len(dataloader) * args.epochs
+    print(f"{args.model} on {args.device}, {num_samples} samples per pass")
+    for name, trainer in trainers.items():
+        if name == "legacy":
+            train = lambda: train_legacy(trainer)
+        else:
+            train = trainer.train
+        seconds = measure(train, args.device, args.repeat)
+        print(f"{name:<10} {seconds:.3f}s {num_samples / seconds:>12.0f} samples/s")
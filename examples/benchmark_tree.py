@@ -0,0 +1,33 @@
+import argparse
+import pyoe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark a refitted decision tree against a Hoeffding tree."
+    )
+    parser.add_argument(
+        "--datasets",
+        nargs="+",
+        default=[
+            "dataset_experiment_info/room_occupancy",
+            "dataset_experiment_info/electricity_prices",
+        ],
+    )
+    parser.add_argument("--data-dir", default="./data/")
+    parser.add_argument("--modes", nargs="+", default=["refit", "stream"])
+    args = parser.parse_args()
+
+    print(f"{'dataset':<45} {'mode':<7} {'time':>9} {'rows/s':>10} {'error':>10}")
+    for dataset in args.datasets:
+        dataloader = pyoe.Dataloader(dataset_name=dataset, data_dir=args.data_dir)
+        preprocessor = pyoe.Preprocessor(missing_fill="zero")
+        for mode in args.modes:
+            model = pyoe.TreeModel(dataloader=dataloader, mode=mode)
+            # test-then-train over the windows of the dataset
+            trainer = pyoe.PrequentialTrainer(dataloader, model, preprocessor)
+            window_metrics = trainer.train()
+            seconds = trainer.get_last_training_time()
+            print(
+                f"{dataset:<45} {mode:<7} {seconds:8.3f}s "
+                f"{len(dataloader) / seconds:>10.0f} {window_metrics.mean():>10.4f}"
+            )
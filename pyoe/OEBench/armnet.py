@@ -1,16 +1,20 @@
 from einops import rearrange
 import torch
 import torch.nn as nn
-from .entmax import EntmaxBisect
+from .entmax import entmax_module
 from .layers import Embedding, MLP
 
 
 class SparseAttLayer(nn.Module):
-    def __init__(self, nhead: int, nfield: int, nemb: int, d_k: int, nhid: int, alpha: float = 1.5):
-        """ Multi-Head Sparse Attention Layer """
+    def __init__(self, nhead: int, nfield: int, nemb: int, d_k: int, nhid: int, alpha: float = 1.5,
+                 entmax_method: str = 'auto'):
+        """ Multi-Head Sparse Attention Layer
+
+        :param entmax_method:   'exact' (sort, alpha 1.5 and 2 only), 'bisect' (fixed iterations),
+                                'adaptive' (bisection until converged) or 'auto' (fastest available)
+        """
         super(SparseAttLayer, self).__init__()
-        self.sparsemax = nn.Softmax(dim=-1) if alpha == 1. \
-            else EntmaxBisect(alpha, dim=-1)
+        self.sparsemax = entmax_module(alpha, dim=-1, method=entmax_method)
 
         self.scale = d_k ** -0.5
         self.bilinear_w = nn.Parameter(torch.zeros(nhead, nemb, d_k))                   # nhead*nemb*d_k
@@ -43,7 +47,7 @@ class ARMNetModel(nn.Module):
     """
     def __init__(self, nfield: int, nfeat: int, nemb: int, nhead: int, alpha: float, nhid: int,
                  mlp_nlayer: int, mlp_nhid: int, dropout: float, ensemble: bool,
-                 deep_nlayer: int, deep_nhid: int, noutput: int = 1):
+                 deep_nlayer: int, deep_nhid: int, noutput: int = 1, entmax_method: str = 'auto'):
         '''
         :param nfield:          Number of Fields
         :param nfeat:           Total Number of Features
@@ -58,12 +62,13 @@ class ARMNetModel(nn.Module):
         :param deep_nlayer:     Number of layers for Ensemble DNN
         :param deep_nhid:       Number of hidden neurons for Ensemble DNN
         :param noutput:         Number of prediction output, e.g., 1 for binary cls
+        :param entmax_method:   How the sparse attention is computed, see SparseAttLayer
         '''
         super().__init__()
         # embedding
         self.embedding = Embedding(nfeat, nemb)
         # arm
-        self.attn_layer = SparseAttLayer(nhead, nfield, nemb, nemb, nhid, alpha)
+        self.attn_layer = SparseAttLayer(nhead, nfield, nemb, nemb, nhid, alpha, entmax_method)
         self.arm_bn = nn.BatchNorm1d(nhead*nhid)
         # MLP
         self.mlp = MLP(nhead * nhid * nemb, mlp_nlayer, mlp_nhid, dropout, noutput=noutput)
@@ -76,10 +81,11 @@ class ARMNetModel(nn.Module):
 
     def forward(self, x):
         """
-        :param x:   {'id': [bsz, nfield], LongTensor, 'value': [bsz, nfield], FloatTensor}
+        :param x:   {'id': [bsz, nfield] or [1, nfield], LongTensor, 'value': [bsz, nfield], FloatTensor}
         :return:    y: [bsz], FloatTensor of size B, for Regression or Classification
         """
-        x['value'].clamp_(0.001, 1.)
+        # clamp out of place, the input of the caller is left untouched
+        x = {'id': x['id'], 'value': x['value'].clamp(0.001, 1.)}
         x_arm = self.embedding(x)                                       # bsz*nfield*nemb
 
         arm_weight = self.attn_layer(x_arm)                             # bsz*nhead*nhid*nfield
@@ -102,10 +108,10 @@ class ARMNetModel(nn.Module):
 
     def feature_extractor(self, x):
         """
-        :param x:   {'id': [bsz, nfield], LongTensor, 'value': [bsz, nfield], FloatTensor}
+        :param x:   {'id': [bsz, nfield] or [1, nfield], LongTensor, 'value': [bsz, nfield], FloatTensor}
         :return:    hidden-layer feature
         """
-        x['value'].clamp_(0.001, 1.)
+        x = {'id': x['id'], 'value': x['value'].clamp(0.001, 1.)}
         x_arm = self.embedding(x)                                       # bsz*nfield*nemb
 
         arm_weight = self.attn_layer(x_arm)                             # bsz*nhead*nhid*nfield
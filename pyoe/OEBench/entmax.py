@@ -7,6 +7,7 @@ https://arxiv.org/pdf/1905.05702 for detailed description.
 # Author: Ben Peters
 # Author: Vlad Niculae <vlad@vene.ro>
 
+import math
 import torch
 import torch.nn as nn
 from torch.autograd import Function
@@ -26,7 +27,8 @@ class EntmaxBisectFunction(Function):
         return cls._gp_inv(torch.clamp(X, min=0), alpha)
 
     @classmethod
-    def forward(cls, ctx, X, alpha=1.5, dim=-1, n_iter=50, ensure_sum_one=True):
+    def forward(cls, ctx, X, alpha=1.5, dim=-1, n_iter=50, ensure_sum_one=True,
+                tol=None):
 
         if not isinstance(alpha, torch.Tensor):
             alpha = torch.tensor(alpha, dtype=X.dtype, device=X.device)
@@ -50,6 +52,15 @@ class EntmaxBisectFunction(Function):
 
         dm = tau_hi - tau_lo
 
+        if tol is not None:
+            # the bracket halves at each iteration, so the number of iterations
+            # that brings it under the tolerance is known up front
+            width = dm.max().item()
+            if width > tol:
+                n_iter = min(n_iter, math.ceil(math.log2(width / tol)))
+            else:
+                n_iter = min(n_iter, 1)
+
         for it in range(n_iter):
 
             dm /= 2
@@ -60,6 +71,10 @@ class EntmaxBisectFunction(Function):
             mask = (f_m * f_lo >= 0).unsqueeze(dim)
             tau_lo = torch.where(mask, tau_m, tau_lo)
 
+            # stop as soon as every row sums to one within the tolerance
+            if tol is not None and f_m.abs().max() <= tol:
+                break
+
         if ensure_sum_one:
             p_m /= p_m.sum(dim=dim).unsqueeze(dim=dim)
 
@@ -97,7 +112,7 @@ class EntmaxBisectFunction(Function):
             d_alpha -= dY * (S - Y_skewed * ent) / (ctx.alpha - 1)
             d_alpha = d_alpha.sum(ctx.dim).unsqueeze(ctx.dim)
 
-        return dX, d_alpha, None, None, None
+        return dX, d_alpha, None, None, None, None
 
 
 # slightly more efficient special case for sparsemax
@@ -115,9 +130,10 @@ class SparsemaxBisectFunction(EntmaxBisectFunction):
         return torch.clamp(x, min=0)
 
     @classmethod
-    def forward(cls, ctx, X, dim=-1, n_iter=50, ensure_sum_one=True):
+    def forward(cls, ctx, X, dim=-1, n_iter=50, ensure_sum_one=True, tol=None):
         return super().forward(
-            ctx, X, alpha=2, dim=dim, n_iter=50, ensure_sum_one=True
+            ctx, X, alpha=2, dim=dim, n_iter=n_iter,
+            ensure_sum_one=ensure_sum_one, tol=tol
         )
 
     @classmethod
@@ -128,10 +144,10 @@ class SparsemaxBisectFunction(EntmaxBisectFunction):
         q = dX.sum(ctx.dim) / gppr.sum(ctx.dim)
         q = q.unsqueeze(ctx.dim)
         dX -= q * gppr
-        return dX, None, None, None
+        return dX, None, None, None, None
 
 
-def entmax_bisect(X, alpha=1.5, dim=-1, n_iter=50, ensure_sum_one=True):
+def entmax_bisect(X, alpha=1.5, dim=-1, n_iter=50, ensure_sum_one=True, tol=None):
     """alpha-entmax: normalizing sparse transform (a la softmax).
 
     Solves the optimization problem:
@@ -167,15 +183,20 @@ def entmax_bisect(X, alpha=1.5, dim=-1, n_iter=50, ensure_sum_one=True):
         Whether to divide the result by its sum. If false, the result might
         sum to close but not exactly 1, which might cause downstream problems.
 
+    tol : float or None
+        If given, the bisection stops early, once every row sums to one within
+        tol or the bracket of the threshold is narrower than tol. Checking the
+        rows synchronizes with the device at each iteration.
+
     Returns
     -------
     P : torch tensor, same shape as X
         The projection result, such that P.sum(dim=dim) == 1 elementwise.
     """
-    return EntmaxBisectFunction.apply(X, alpha, dim, n_iter, ensure_sum_one)
+    return EntmaxBisectFunction.apply(X, alpha, dim, n_iter, ensure_sum_one, tol)
 
 
-def sparsemax_bisect(X, dim=-1, n_iter=50, ensure_sum_one=True):
+def sparsemax_bisect(X, dim=-1, n_iter=50, ensure_sum_one=True, tol=None):
     """sparsemax: normalizing sparse transform (a la softmax), via bisection.
 
     Solves the projection:
@@ -198,6 +219,10 @@ def sparsemax_bisect(X, dim=-1, n_iter=50, ensure_sum_one=True):
         Whether to divide the result by its sum. If false, the result might
         sum to close but not exactly 1, which might cause downstream problems.
 
+    tol : float or None
+        If given, the bisection stops early, once every row sums to one within
+        tol or the bracket of the threshold is narrower than tol.
+
     Note: This function does not yet support normalizing along anything except
     the last dimension. Please use transposing and views to achieve more
     general behavior.
@@ -207,11 +232,11 @@ def sparsemax_bisect(X, dim=-1, n_iter=50, ensure_sum_one=True):
     P : torch tensor, same shape as X
         The projection result, such that P.sum(dim=dim) == 1 elementwise.
     """
-    return SparsemaxBisectFunction.apply(X, dim, n_iter, ensure_sum_one)
+    return SparsemaxBisectFunction.apply(X, dim, n_iter, ensure_sum_one, tol)
 
 
 class SparsemaxBisect(nn.Module):
-    def __init__(self, dim=-1, n_iter=None):
+    def __init__(self, dim=-1, n_iter=50, tol=None):
         """sparsemax: normalizing sparse transform (a la softmax) via bisection
 
         Solves the projection:
@@ -226,17 +251,21 @@ class SparsemaxBisect(nn.Module):
         n_iter : int
             Number of bisection iterations. For float32, 24 iterations should
             suffice for machine precision.
+
+        tol : float or None
+            If given, the bisection stops early once it has converged within tol.
         """
         self.dim = dim
         self.n_iter = n_iter
+        self.tol = tol
         super().__init__()
 
     def forward(self, X):
-        return sparsemax_bisect(X, dim=self.dim, n_iter=self.n_iter)
+        return sparsemax_bisect(X, dim=self.dim, n_iter=self.n_iter, tol=self.tol)
 
 
 class EntmaxBisect(nn.Module):
-    def __init__(self, alpha=1.5, dim=-1, n_iter=50):
+    def __init__(self, alpha=1.5, dim=-1, n_iter=50, tol=None):
         """alpha-entmax: normalizing sparse map (a la softmax) via bisection.
 
         Solves the optimization problem:
@@ -263,13 +292,224 @@ class EntmaxBisect(nn.Module):
             Number of bisection iterations. For float32, 24 iterations should
             suffice for machine precision.
 
+        tol : float or None
+            If given, the bisection stops early once it has converged within tol.
+
         """
         self.dim = dim
         self.n_iter = n_iter
+        self.tol = tol
         self.alpha = alpha
         super().__init__()
 
     def forward(self, X):
         return entmax_bisect(
-            X, alpha=self.alpha, dim=self.dim, n_iter=self.n_iter
+            X, alpha=self.alpha, dim=self.dim, n_iter=self.n_iter, tol=self.tol
         )
+
+
+def _make_ix_like(X, dim):
+    """The positions 1..d along dim, shaped to broadcast against X."""
+    d = X.size(dim)
+    rho = torch.arange(1, d + 1, device=X.device, dtype=X.dtype)
+    view = [1] * X.dim()
+    view[0] = -1
+    return rho.view(view).transpose(0, dim)
+
+
+class SparsemaxFunction(Function):
+    @classmethod
+    def _threshold_and_support(cls, X, dim=-1):
+        """Exact sparsemax threshold of the shifted input, by sorting."""
+        topk, _ = torch.sort(X, dim=dim, descending=True)
+        topk_cumsum = topk.cumsum(dim) - 1
+        rhos = _make_ix_like(topk, dim)
+        support = rhos * topk > topk_cumsum
+
+        support_size = support.sum(dim=dim).unsqueeze(dim)
+        tau = topk_cumsum.gather(dim, support_size - 1)
+        tau /= support_size.to(X.dtype)
+        return tau, support_size
+
+    @classmethod
+    def forward(cls, ctx, X, dim=-1):
+        ctx.dim = dim
+        max_val, _ = X.max(dim=dim, keepdim=True)
+        X = X - max_val
+        tau, support_size = cls._threshold_and_support(X, dim=dim)
+        output = torch.clamp(X - tau, min=0)
+        ctx.save_for_backward(support_size, output)
+        return output
+
+    @classmethod
+    def backward(cls, ctx, dY):
+        support_size, output = ctx.saved_tensors
+        dX = torch.where(output > 0, dY, dY.new_zeros(1))
+        v_hat = dX.sum(dim=ctx.dim, keepdim=True) / support_size.to(dY.dtype)
+        dX = torch.where(output > 0, dX - v_hat, dX)
+        return dX, None
+
+
+class Entmax15Function(Function):
+    @classmethod
+    def _threshold_and_support(cls, X, dim=-1):
+        """Exact 1.5-entmax threshold of the shifted input, by sorting."""
+        Xsrt, _ = torch.sort(X, dim=dim, descending=True)
+        rho = _make_ix_like(Xsrt, dim)
+        mean = Xsrt.cumsum(dim) / rho
+        mean_sq = (Xsrt ** 2).cumsum(dim) / rho
+        ss = rho * (mean_sq - mean ** 2)
+        delta = (1 - ss) / rho
+        delta_nz = torch.clamp(delta, 0)
+        tau = mean - torch.sqrt(delta_nz)
+
+        support_size = (tau <= Xsrt).sum(dim).unsqueeze(dim)
+        tau_star = tau.gather(dim, support_size - 1)
+        return tau_star, support_size
+
+    @classmethod
+    def forward(cls, ctx, X, dim=-1):
+        ctx.dim = dim
+        max_val, _ = X.max(dim=dim, keepdim=True)
+        X = (X - max_val) / 2
+        tau_star, _ = cls._threshold_and_support(X, dim=dim)
+        Y = torch.clamp(X - tau_star, min=0) ** 2
+        ctx.save_for_backward(Y)
+        return Y
+
+    @classmethod
+    def backward(cls, ctx, dY):
+        Y, = ctx.saved_tensors
+        gppr = Y.sqrt()
+        dX = dY * gppr
+        q = dX.sum(ctx.dim, keepdim=True) / gppr.sum(ctx.dim, keepdim=True)
+        dX -= q * gppr
+        return dX, None
+
+
+def sparsemax(X, dim=-1):
+    """sparsemax: normalizing sparse transform (a la softmax), exact.
+
+    Solves the projection:
+
+        min_p ||x - p||_2   s.t.    p >= 0, sum(p) == 1.
+
+    The threshold is found exactly by sorting X along dim, which costs
+    O(d log d) per row instead of a fixed number of bisection passes.
+
+    Parameters
+    ----------
+    X : torch.Tensor
+        The input tensor.
+
+    dim : int
+        The dimension along which to apply sparsemax.
+
+    Returns
+    -------
+    P : torch tensor, same shape as X
+        The projection result, such that P.sum(dim=dim) == 1 elementwise.
+    """
+    return SparsemaxFunction.apply(X, dim)
+
+
+def entmax15(X, dim=-1):
+    """1.5-entmax: normalizing sparse transform (a la softmax), exact.
+
+    Solves the optimization problem:
+
+        max_p <x, p> - H_1.5(p)    s.t.    p >= 0, sum(p) == 1.
+
+    where H_1.5(p) is the Tsallis alpha-entropy with alpha=1.5. The threshold
+    is found exactly by sorting X along dim.
+
+    Parameters
+    ----------
+    X : torch.Tensor
+        The input tensor.
+
+    dim : int
+        The dimension along which to apply 1.5-entmax.
+
+    Returns
+    -------
+    P : torch tensor, same shape as X
+        The projection result, such that P.sum(dim=dim) == 1 elementwise.
+    """
+    return Entmax15Function.apply(X, dim)
+
+
+class Sparsemax(nn.Module):
+    def __init__(self, dim=-1):
+        """sparsemax: normalizing sparse transform (a la softmax), exact.
+
+        Parameters
+        ----------
+        dim : int
+            The dimension along which to apply sparsemax.
+        """
+        self.dim = dim
+        super().__init__()
+
+    def forward(self, X):
+        return sparsemax(X, dim=self.dim)
+
+
+class Entmax15(nn.Module):
+    def __init__(self, dim=-1):
+        """1.5-entmax: normalizing sparse transform (a la softmax), exact.
+
+        Parameters
+        ----------
+        dim : int
+            The dimension along which to apply 1.5-entmax.
+        """
+        self.dim = dim
+        super().__init__()
+
+    def forward(self, X):
+        return entmax15(X, dim=self.dim)
+
+
+def entmax_module(alpha=1.5, dim=-1, method="auto", n_iter=50, tol=1e-6):
+    """Build the fastest alpha-entmax module available for alpha.
+
+    Parameters
+    ----------
+    alpha : float
+        The alpha of the entmax. 1 is softmax, 2 is sparsemax.
+
+    dim : int
+        The dimension along which to apply alpha-entmax.
+
+    method : str
+        "exact" sorts the input (only for alpha 1.5 and 2), "bisect" runs
+        n_iter bisection iterations, "adaptive" runs the bisection until it
+        converges within tol, and "auto" picks "exact" when available and
+        "adaptive" otherwise.
+
+    n_iter : int
+        The maximum number of bisection iterations.
+
+    tol : float
+        The tolerance of the "adaptive" bisection.
+
+    Returns
+    -------
+    module : nn.Module
+        The entmax module.
+    """
+    if alpha == 1.:
+        return nn.Softmax(dim=dim)
+    exact = {1.5: Entmax15, 2.: Sparsemax}
+    if method == "auto":
+        method = "exact" if alpha in exact else "adaptive"
+    if method == "exact":
+        if alpha not in exact:
+            raise ValueError(f"No exact entmax for alpha={alpha}, only 1.5 and 2.")
+        return exact[alpha](dim=dim)
+    if method == "bisect":
+        return EntmaxBisect(alpha, dim=dim, n_iter=n_iter)
+    if method == "adaptive":
+        return EntmaxBisect(alpha, dim=dim, n_iter=n_iter, tol=tol)
+    raise ValueError(f"Entmax method {method} is not supported.")
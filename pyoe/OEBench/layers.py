@@ -14,10 +14,10 @@ class Embedding(nn.Module):
 
     def forward(self, x):
         """
-        :param x:   {'id': LongTensor B*F, 'value': FloatTensor B*F}
+        :param x:   {'id': LongTensor B*F or 1*F, 'value': FloatTensor B*F}
         :return:    embeddings B*F*E
         """
-        emb = self.embedding(x['id'])                           # B*F*E
+        emb = self.embedding(x['id'])                           # B*F*E or 1*F*E
         return emb * x['value'].unsqueeze(2)                    # B*F*E
 
 
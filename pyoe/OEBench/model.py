@@ -2,7 +2,6 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import math
-import torchvision.models as models
 
 
 class FcNet(nn.Module):
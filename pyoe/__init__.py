@@ -1,5 +1,99 @@
+import importlib
 from .dataloaders import *
-from .algorithms import *
-from .models import *
-from .metrics import *
 from .preprocessors import *
+
+# models, algorithms and metrics pull in torch models and their backends, so
+# they are only imported when one of their classes is first accessed
+_LAZY_SUBMODULES = ("algorithms", "models", "metrics", "OEBench")
+_LAZY_ATTRIBUTES = {
+    # algorithms
+    "TrainerTemplate": "algorithms",
+    "NaiveTrainer": "algorithms",
+    "IcarlTrainer": "algorithms",
+    "ClusterTrainer": "algorithms",
+    "MultiProcessTrainer": "algorithms",
+    "HogwildTrainer": "algorithms",
+    "PrequentialTrainer": "algorithms",
+    "EwcTrainer": "algorithms",
+    "LwfTrainer": "algorithms",
+    "LossTemplate": "algorithms",
+    "classification_loss": "algorithms",
+    "classification_loss_tree": "algorithms",
+    "regression_loss": "algorithms",
+    "regression_loss_tree": "algorithms",
+    "window_mean": "algorithms",
+    # models
+    "ModelTemplate": "models",
+    "MlpModel": "models",
+    "TreeModel": "models",
+    "GdbtModel": "models",
+    "TabnetModel": "models",
+    "ArmnetModel": "models",
+    "CluStreamModel": "models",
+    "DbStreamModel": "models",
+    "DenStreamModel": "models",
+    "StreamKMeansModel": "models",
+    "XStreamDetectorModel": "models",
+    "RShashDetectorModel": "models",
+    "HSTreeDetectorModel": "models",
+    "LodaDetectorModel": "models",
+    "RrcfDetectorModel": "models",
+    "ChronosModel": "models",
+    "ExemplarMemory": "models",
+    "ClusterNet": "models",
+    "CluStreamNet": "models",
+    "DbStreamNet": "models",
+    "DenStreamNet": "models",
+    "StreamKMeansNet": "models",
+    "OutlierDetectorNet": "models",
+    "XStreamDetectorNet": "models",
+    "RShashDetectorNet": "models",
+    "HSTreeDetectorNet": "models",
+    "LodaDetectorNet": "models",
+    "RrcfDetectorNet": "models",
+    "HoeffdingTreeNet": "models",
+    "HistGbdtNet": "models",
+    "IncrementalTabnetNet": "models",
+    "ChronosPredictorNet": "models",
+    # OEBench networks and helpers re-exported by models
+    "ARMNetModel": "models",
+    "SparseAttLayer": "models",
+    "Embedding": "models",
+    "MLP": "models",
+    "FcNet": "models",
+    "EWC": "models",
+    "ewc_train": "models",
+    "normal_train": "models",
+    "entmax_module": "models",
+    # metrics
+    "MetricTemplate": "metrics",
+    "EffectivenessMetric": "metrics",
+    "DriftDelayMetric": "metrics",
+}
+
+
+def __getattr__(name: str):
+    """
+    Import the lazy submodules and their public classes on first access.
+
+    Args:
+        name (str): the name of the attribute.
+
+    Returns:
+        out: the submodule or the attribute.
+    """
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    # other names are not looked up in the submodules, so that probing them
+    # (e.g. with ``hasattr``) does not import the heavy backends
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES) | set(_LAZY_ATTRIBUTES))
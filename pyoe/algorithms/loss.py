@@ -1,14 +1,50 @@
 import torch
-import numpy as np
 from torch import nn
-from typing import Optional
+from typing import Optional, Sequence
 from abc import abstractmethod
 
 
+def window_mean(
+    values: torch.Tensor,
+    lengths: Sequence[int] | torch.Tensor,
+    weights: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """
+    Compute the (weighted) mean of consecutive windows of values in one pass on the
+    device of the values.
+
+    Args:
+        values (torch.Tensor): The values of all the windows, one after another.
+        lengths (Sequence[int] | torch.Tensor): The number of values in each window.
+        weights (Optional[torch.Tensor]): Optional weights of the values.
+
+    Returns:
+        out (torch.Tensor): The mean of each window.
+    """
+    device = values.device
+    lengths = torch.as_tensor(lengths, device=device)
+    window_index = torch.repeat_interleave(
+        torch.arange(len(lengths), device=device), lengths
+    )
+    values = values.reshape(-1).float()
+    weights = (
+        torch.ones_like(values) if weights is None else weights.reshape(-1).float()
+    )
+    totals = torch.zeros(len(lengths), device=device).index_add_(
+        0, window_index, values * weights
+    )
+    counts = torch.zeros(len(lengths), device=device).index_add_(
+        0, window_index, weights
+    )
+    return totals / counts
+
+
 class LossTemplate:
     """
     This is a template for loss function. We implemented some common loss
     functions and you can also implement your own loss function using this template.
+    Loss functions that implement ``output_errors`` can also evaluate many windows at
+    once with ``loss_windows``.
     """
 
     def __init__(self, net: nn.Module, **kargws) -> None:
@@ -43,54 +79,100 @@ class LossTemplate:
         """
         pass
 
+    def outputs(self, x_window: torch.Tensor) -> torch.Tensor:
+        """
+        This function computes the outputs of the model for the input data.
 
-class classification_loss(LossTemplate):
+        Args:
+            x_window (torch.Tensor): The input data window.
 
-    def __init__(self, net: nn.Module, **kwargs):
-        super().__init__(net, **kwargs)
+        Returns:
+            out (torch.Tensor): The outputs of the model.
+        """
+        return self.net(x_window)
 
-    def loss(
+    def output_errors(self, out: torch.Tensor, y_window: torch.Tensor) -> torch.Tensor:
+        """
+        This function computes the error of every sample from the outputs of the model.
+
+        Args:
+            out (torch.Tensor): The outputs of the model.
+            y_window (torch.Tensor): The target data window.
+
+        Returns:
+            out (torch.Tensor): The error of each sample.
+        """
+        raise NotImplementedError
+
+    def errors(self, x_window: torch.Tensor, y_window: torch.Tensor) -> torch.Tensor:
+        """
+        This function computes the error of every sample in the window.
+
+        Args:
+            x_window (torch.Tensor): The input data window.
+            y_window (torch.Tensor): The target data window.
+
+        Returns:
+            out (torch.Tensor): The error of each sample.
+        """
+        return self.output_errors(self.outputs(x_window), y_window)
+
+    def loss_windows(
         self,
-        x_window: torch.Tensor,
-        y_window: torch.Tensor,
-        y_outlier: Optional[torch.Tensor] = None,
-        **kwargs,
-    ):
-        # calculate the predicted label
-        out: torch.Tensor = self.net(x_window)
-        _, pred_label = torch.max(out.data.view(y_window.shape[0], -1), 1)
-
-        # make sure all tensors are on the same device
-        device = x_window.device
-
-        # calculate the accuracy
-        if y_outlier is None:
-            acc = (
-                torch.tensor(
-                    [y_window[i][pred_label[i]] for i in np.arange(y_window.shape[0])],
-                    device=device,
-                )
-                .sum()
-                .item()
-                / y_window.shape[0]
-            )
-        else:
-            acc = (
-                torch.tensor(
-                    [y_window[i][pred_label[i]] for i in np.arange(y_window.shape[0])],
-                    device=device,
-                )
-                * (1 - y_outlier)
-            ).sum().item() / (y_window.shape[0] - y_outlier.sum().item())
+        x_windows: Sequence[torch.Tensor],
+        y_windows: Sequence[torch.Tensor],
+        y_outliers: Optional[Sequence[torch.Tensor]] = None,
+    ) -> torch.Tensor:
+        """
+        This function computes the loss of many windows with a single pass of the
+        model, without synchronizing with the host for each window.
 
-        return 1 - acc
+        Args:
+            x_windows (Sequence[torch.Tensor]): The input data windows.
+            y_windows (Sequence[torch.Tensor]): The target data windows.
+            y_outliers (Optional[Sequence[torch.Tensor]]): Optional outlier target data
+                of the windows. Outliers are left out of the loss if given.
+
+        Returns:
+            out (torch.Tensor): The loss of each window.
+        """
+        errors = self.errors(torch.cat(list(x_windows)), torch.cat(list(y_windows)))
+        weights = None if y_outliers is None else 1 - torch.cat(list(y_outliers))
+        return window_mean(errors, [len(y) for y in y_windows], weights)
 
+    def _mean(
+        self, errors: torch.Tensor, y_outlier: Optional[torch.Tensor] = None
+    ) -> float:
+        """
+        This function averages the errors of the samples which are not outliers.
 
-class classification_loss_tree(LossTemplate):
+        Args:
+            errors (torch.Tensor): The error of each sample.
+            y_outlier (Optional[torch.Tensor]): Optional outlier target data.
+
+        Returns:
+            out (float): The average error.
+        """
+        weights = None if y_outlier is None else 1 - y_outlier
+        return window_mean(errors, [errors.shape[0]], weights).item()
+
+
+class classification_loss(LossTemplate):
 
     def __init__(self, net: nn.Module, **kwargs):
         super().__init__(net, **kwargs)
 
+    def output_errors(self, out: torch.Tensor, y_window: torch.Tensor) -> torch.Tensor:
+        # the predicted label is given by the highest score, or by the model itself
+        if out.dim() > 1:
+            pred_label = torch.argmax(out.detach().view(y_window.shape[0], -1), 1)
+        else:
+            pred_label = out.long()
+
+        # the target is one-hot encoded, pick the value at the predicted label
+        correct = torch.gather(y_window, 1, pred_label.view(-1, 1).to(y_window.device))
+        return 1 - correct.view(-1).float()
+
     def loss(
         self,
         x_window: torch.Tensor,
@@ -98,28 +180,20 @@ class classification_loss_tree(LossTemplate):
         y_outlier: Optional[torch.Tensor] = None,
         **kwargs,
     ):
-        # calculate the predicted label
-        pred_label = torch.LongTensor(self.net.predict(x_window))
-
-        # calculate the accuracy
-        if y_outlier is None:
-            acc = (
-                torch.tensor(
-                    [y_window[i][pred_label[i]] for i in np.arange(y_window.shape[0])]
-                )
-                .sum()
-                .item()
-                / y_window.shape[0]
-            )
-        else:
-            acc = (
-                torch.tensor(
-                    [y_window[i][pred_label[i]] for i in np.arange(y_window.shape[0])]
-                )
-                * (1 - y_outlier)
-            ).sum().item() / (y_window.shape[0] - y_outlier.sum().item())
+        # calculate the error rate
+        return self._mean(self.errors(x_window, y_window), y_outlier)
+
+
+class classification_loss_tree(classification_loss):
 
-        return 1 - acc
+    def __init__(self, net: nn.Module, **kwargs):
+        super().__init__(net, **kwargs)
+
+    def outputs(self, x_window: torch.Tensor) -> torch.Tensor:
+        x_window = torch.as_tensor(x_window)
+        return torch.as_tensor(
+            self.net.predict(x_window.cpu().numpy()), device=x_window.device
+        )
 
 
 class regression_loss(LossTemplate):
@@ -127,6 +201,10 @@ class regression_loss(LossTemplate):
     def __init__(self, net: nn.Module, **kwargs):
         super().__init__(net, **kwargs)
 
+    def output_errors(self, out: torch.Tensor, y_window: torch.Tensor) -> torch.Tensor:
+        out = out.detach().reshape(-1).to(y_window.device)
+        return torch.square(out - y_window.reshape(-1))
+
     def loss(
         self,
         x_window: torch.Tensor,
@@ -134,39 +212,17 @@ class regression_loss(LossTemplate):
         y_outlier: Optional[torch.Tensor] = None,
         **kwargs,
     ):
-        # calculate the predicted label
-        out = self.net(x_window).reshape(-1).detach()
-
-        # calculate the loss
-        if y_outlier is None:
-            loss = torch.mean(torch.square(out - y_window))
-        else:
-            loss = torch.sum(torch.square(out - y_window) * (1 - y_outlier)) / (
-                y_window.shape[0] - y_outlier.sum().item()
-            )
-        return loss.item()
+        # calculate the mean squared error
+        return self._mean(self.errors(x_window, y_window), y_outlier)
 
 
-class regression_loss_tree(LossTemplate):
+class regression_loss_tree(regression_loss):
 
     def __init__(self, net: nn.Module, **kwargs):
         super().__init__(net, **kwargs)
 
-    def loss(
-        self,
-        x_window: torch.Tensor,
-        y_window: torch.Tensor,
-        y_outlier: Optional[torch.Tensor] = None,
-        **kwargs,
-    ):
-        # calculate the predicted label
-        out = torch.Tensor(self.net.predict(x_window))
-
-        # calculate the loss
-        if y_outlier is None:
-            loss = torch.mean(torch.square(out - y_window))
-        else:
-            loss = torch.sum(torch.square(out - y_window) * (1 - y_outlier)) / (
-                y_window.shape[0] - y_outlier.sum().item()
-            )
-        return loss.item()
+    def outputs(self, x_window: torch.Tensor) -> torch.Tensor:
+        x_window = torch.as_tensor(x_window)
+        return torch.as_tensor(
+            self.net.predict(x_window.cpu().numpy()), device=x_window.device
+        )
@@ -1,15 +1,25 @@
+from __future__ import annotations
+
 import os
 import time
 import torch
+import numpy as np
+import socket
 import logging
+import itertools
+import tempfile
 import torch.distributed as dist
 from abc import abstractmethod
-from torch.utils.data import DataLoader as TorchDataLoader
+from typing import Callable, TYPE_CHECKING
+from torch.nn.parallel import DistributedDataParallel
 from torch.utils.data.distributed import DistributedSampler
 from .loss import *
 from ..preprocessors import Preprocessor
-from ..models import ModelTemplate
-from ..dataloaders import Dataloader, DataloaderWrapper
+from ..dataloaders import Dataloader, DataloaderWrapper, BatchDataloader
+
+# models import this package, so they are only imported for type checking
+if TYPE_CHECKING:
+    from ..models import ModelTemplate
 
 
 class TrainerTemplate:
@@ -95,8 +105,13 @@ class NaiveTrainer(TrainerTemplate):
     """
     This class is a training wrapper for the model. It will call the
     model's preprocessing and training function to train the model.
+    For MLP and ARMNet models, the dataset is moved to the device once and
+    mini-batches are sliced from it by index.
     """
 
+    # models whose training loop accepts device-resident batches
+    RESIDENT_MODEL_TYPES = ("mlp", "armnet")
+
     def __init__(
         self,
         dataloader: Dataloader,
@@ -106,8 +121,23 @@ class NaiveTrainer(TrainerTemplate):
         epochs: int = 1,
         batch_size: int = 64,
         buffer_size: int = 100,
+        resident: bool = True,
         **kargws,
     ) -> None:
+        """
+        Args:
+            dataloader (Dataloader): The dataloader object.
+            model (ModelTemplate): The model object.
+            preprocessor (Preprocessor): The preprocessor object.
+            lr (float): The learning rate.
+            epochs (int): The number of epochs.
+            batch_size (int): The batch size.
+            buffer_size (int): The buffer size.
+            resident (bool): Whether to keep the dataset on the device during training
+                (MLP and ARMNet models only). Set it to False if the dataset does not
+                fit in the memory of the device.
+            **kwargs: Additional optional parameters.
+        """
         super().__init__(
             dataloader,
             model,
@@ -118,6 +148,7 @@ class NaiveTrainer(TrainerTemplate):
             buffer_size,
             **kargws,
         )
+        self.resident = resident
         # preprocess the model
         self.model.process_model(lr=self.lr)
 
@@ -139,14 +170,14 @@ class NaiveTrainer(TrainerTemplate):
             need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
             **kwargs: Additional optional parameters.
         """
-        # use the correct device for training
+        # use the correct device for training (no copy if it is already there)
         X, y, y_outlier = (
-            torch.tensor(X, dtype=torch.float).to(self.device),
-            torch.tensor(y, dtype=torch.float).to(self.device),
+            torch.as_tensor(X, dtype=torch.float, device=self.device),
+            torch.as_tensor(y, dtype=torch.float, device=self.device),
             (
                 None
                 if y_outlier is None
-                else torch.tensor(y_outlier, dtype=torch.float).to(self.device)
+                else torch.as_tensor(y_outlier, dtype=torch.float, device=self.device)
             ),
         )
 
@@ -162,20 +193,67 @@ class NaiveTrainer(TrainerTemplate):
         """
         self._time_start()
 
-        # load data using the dataloader
-        torch_dataloader = TorchDataLoader(
-            DataloaderWrapper(self.dataloader, need_test),
-            batch_size=self.batch_size,
-            shuffle=True,
-        )
-
-        # train the model
-        for X, y, y_outlier in torch_dataloader:
-            X = self.preprocessor.fill(X)
-            self._train(X, y, y_outlier, need_test=need_test)
+        if (
+            self.resident
+            and self.model_type in self.RESIDENT_MODEL_TYPES
+            and isinstance(self.dataloader, Dataloader)
+        ):
+            self.__train_resident(need_test)
+        else:
+            # load data using the dataloader
+            torch_dataloader = BatchDataloader(
+                DataloaderWrapper(self.dataloader, need_test),
+                batch_size=self.batch_size,
+                shuffle=True,
+            )
+
+            # train the model
+            for X, y, y_outlier in torch_dataloader:
+                X = self.preprocessor.fill(X)
+                self._train(X, y, y_outlier, need_test=need_test)
 
         self._time_end()
 
+    def __train_resident(self, need_test: bool = False) -> None:
+        """
+        This function trains the model on the whole dataset, which is copied to
+        the device once. Batches are drawn in a random order as in ``train``, but
+        they are sliced from the device tensors instead of being loaded and
+        converted one by one.
+
+        Args:
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
+        X_all = torch.as_tensor(
+            self.dataloader.get_data(), dtype=torch.float, device=self.device
+        )
+        y_all = torch.as_tensor(
+            self.dataloader.get_target(), dtype=torch.float, device=self.device
+        )
+        y_outlier_all = (
+            torch.as_tensor(
+                self.dataloader.outlier_label, dtype=torch.float, device=self.device
+            )
+            if need_test
+            else None
+        )
+        # missing values are filled batch by batch, as in the loaded path
+        has_missing = bool(torch.isnan(X_all).any())
+
+        permutation = torch.randperm(X_all.shape[0], device=self.device)
+        for indices in permutation.split(self.batch_size):
+            X = X_all[indices]
+            if has_missing:
+                X = self.preprocessor.fill(X)
+            self.model.train_naive(
+                X,
+                y_all[indices],
+                None if y_outlier_all is None else y_outlier_all[indices],
+                self.batch_size,
+                self.epochs,
+                need_test,
+            )
+
 
 class IcarlTrainer(TrainerTemplate):
     """
@@ -225,14 +303,14 @@ class IcarlTrainer(TrainerTemplate):
             need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
             **kwargs: Additional optional parameters.
         """
-        # use the correct device for training
+        # use the correct device for training (no copy if it is already there)
         X, y, y_outlier = (
-            torch.tensor(X, dtype=torch.float).to(self.device),
-            torch.tensor(y, dtype=torch.float).to(self.device),
+            torch.as_tensor(X, dtype=torch.float, device=self.device),
+            torch.as_tensor(y, dtype=torch.float, device=self.device),
             (
                 None
                 if y_outlier is None
-                else torch.tensor(y_outlier, dtype=torch.float).to(self.device)
+                else torch.as_tensor(y_outlier, dtype=torch.float, device=self.device)
             ),
         )
 
@@ -251,7 +329,7 @@ class IcarlTrainer(TrainerTemplate):
         self._time_start()
 
         # load data using the dataloader
-        torch_dataloader = TorchDataLoader(
+        torch_dataloader = BatchDataloader(
             DataloaderWrapper(self.dataloader, need_test),
             batch_size=self.batch_size,
             shuffle=True,
@@ -302,7 +380,7 @@ class ClusterTrainer(TrainerTemplate):
         self._time_start()
 
         # load data using the dataloader
-        torch_dataloader = TorchDataLoader(
+        torch_dataloader = BatchDataloader(
             DataloaderWrapper(self.dataloader, need_test),
             batch_size=self.batch_size,
             shuffle=True,
@@ -363,7 +441,12 @@ directly from the model. We keep it commented here for future use.
 class MultiProcessTrainer(TrainerTemplate):
     """
     This is a multi-process training function. It will create a distributed
-    dataloader and train the model using the distributed data.
+    dataloader and train the model using the distributed data. The network of the
+    model is wrapped with ``DistributedDataParallel`` in every process, so the
+    gradients are averaged across processes after each backward pass and all the
+    processes train the same model. The trained weights and the state of the
+    optimizer are then loaded back into the model of the trainer. The dataset is
+    placed in shared memory once and every process attaches to it.
     """
 
     def __init__(
@@ -373,30 +456,60 @@ class MultiProcessTrainer(TrainerTemplate):
         trainer: TrainerTemplate,
         preprocessor: Preprocessor,
     ):
+        """
+        Args:
+            world_size (int): The number of processes.
+            dataloader (Dataloader): The dataloader object.
+            trainer (TrainerTemplate): The trainer used by every process.
+            preprocessor (Preprocessor): The preprocessor object.
+        """
+        if not isinstance(trainer.model.get_net(), torch.nn.Module):
+            logging.error(f"Model not supported: {trainer.model.get_model_type()}")
+            raise ValueError("Multi-process training only supports NN model.")
         self.world_size = world_size
         self.dataloader = dataloader
         self.trainer = trainer
         self.preprocessor = preprocessor
+        self.running_time: float | None = None
 
-    def _train(self, rank: int, need_test: bool):
+    def _train(self, rank: int, need_test: bool, state_path: str, init_method: str):
         """
         This function is a wrapper function used by one sub-process to train the model.
 
         Args:
             rank (int): The rank of the sub-process.
             need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+            state_path (str): The file where the first process saves the trained
+                weights and the state of the optimizer.
+            init_method (str): The url of the rendezvous of the process group.
         """
 
         # initialize the process group
-        dist.init_process_group("gloo", rank=rank, world_size=self.world_size)
+        dist.init_process_group(
+            "gloo", init_method=init_method, rank=rank, world_size=self.world_size
+        )
         os.environ["CUDA_VISIBLE_DEVICES"] = str(rank)
+        # share the cores between processes instead of oversubscribing them
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.world_size))
+
+        # spawn hands the weights over in shared memory, give every process its
+        # own copy so that the replicas do not step the same memory
+        model = self.trainer.model
+        net = model.net
+        with torch.no_grad():
+            for tensor in itertools.chain(net.parameters(), net.buffers()):
+                tensor.data = tensor.data.clone()
+        # wrap the network so that the gradients are all-reduced in backward,
+        # the optimizer of the model still holds the same parameters
+        model.net = DistributedDataParallel(net)
 
         # using a wrapper dataloader to handle the parameter need_test
         wrapper = DataloaderWrapper(self.dataloader, need_test)
 
-        # create the dataloader using DistributedSampler
+        # create the dataloader using DistributedSampler, which pads the shards
+        # so that every process runs the same number of steps
         sampler = DistributedSampler(wrapper, num_replicas=self.world_size, rank=rank)
-        torch_dataloader = TorchDataLoader(
+        torch_dataloader = BatchDataloader(
             wrapper, sampler=sampler, batch_size=self.trainer.batch_size
         )
 
@@ -406,6 +519,18 @@ class MultiProcessTrainer(TrainerTemplate):
             X = self.preprocessor.fill(X)
             self.trainer._train(X, y, outlier_label, need_test=need_test)
 
+        # the weights are the same in every process, save those of the first one
+        # together with its optimizer state (e.g. the moments of Adam)
+        model.net = net
+        if rank == 0:
+            optimizer = getattr(model, "optimizer", None)
+            state = {
+                "net": net.state_dict(),
+                "optimizer": None if optimizer is None else optimizer.state_dict(),
+            }
+            torch.save(state, state_path)
+        dist.destroy_process_group()
+
     def train(self, need_test=False):
         """
         This function is used to train the model using multi-process.
@@ -413,12 +538,607 @@ class MultiProcessTrainer(TrainerTemplate):
         Args:
             need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
         """
+        # a local rendezvous if the address of the process group is not given, it
+        # is passed to the processes instead of being left in the environment
+        address = os.environ.get("MASTER_ADDR", "localhost")
+        port = os.environ.get("MASTER_PORT")
+        if port is None:
+            with socket.socket() as sock:
+                sock.bind(("localhost", 0))
+                port = str(sock.getsockname()[1])
+        init_method = f"tcp://{address}:{port}"
+
+        self._time_start()
+
+        # the processes attach to the dataset instead of receiving a copy each
+        if isinstance(self.dataloader, Dataloader):
+            self.dataloader.share_memory()
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = os.path.join(state_dir, "state.pt")
+            # start the multi-process training
+            torch.multiprocessing.spawn(
+                self._train,
+                nprocs=self.world_size,
+                args=(need_test, state_path, init_method),
+            )
+            # load the trained weights and optimizer state into the model of this
+            # process, so that further training continues from them
+            state = torch.load(state_path, map_location=self.trainer.device)
+            model = self.trainer.model
+            model.net.load_state_dict(state["net"])
+            if state["optimizer"] is not None:
+                model.optimizer.load_state_dict(state["optimizer"])
+
+        self._time_end()
+
+
+class HogwildTrainer(NaiveTrainer):
+    """
+    This class trains the model with Hogwild!, a lock-free parallel SGD. The network
+    of the model is placed in shared memory, and several processes update it
+    asynchronously, each on a disjoint shard of the dataset. It suits small networks
+    (e.g. ``MlpModel``) on CPU, whose training loop alone cannot keep all the cores
+    busy.
+    """
+
+    def __init__(
+        self,
+        dataloader: Dataloader,
+        model: ModelTemplate,
+        preprocessor: Preprocessor,
+        lr: float = 0.01,
+        epochs: int = 1,
+        batch_size: int = 64,
+        buffer_size: int = 100,
+        num_processes: int | None = None,
+        **kargws,
+    ) -> None:
+        """
+        Args:
+            dataloader (Dataloader): The dataloader object.
+            model (ModelTemplate): The model object.
+            preprocessor (Preprocessor): The preprocessor object.
+            lr (float): The learning rate.
+            epochs (int): The number of epochs.
+            batch_size (int): The batch size.
+            buffer_size (int): The buffer size.
+            num_processes (int | None): The number of processes. Defaults to the
+                number of CPU cores.
+            **kwargs: Additional optional parameters.
+        """
+        if not isinstance(model.get_net(), torch.nn.Module):
+            logging.error(f"Model not supported: {model.get_model_type()}")
+            raise ValueError("Hogwild training only supports NN model.")
+        if model.get_device() != "cpu":
+            logging.error(f"Device not supported: {model.get_device()}")
+            raise ValueError("Hogwild training only supports CPU.")
+        super().__init__(
+            dataloader,
+            model,
+            preprocessor,
+            lr,
+            epochs,
+            batch_size,
+            buffer_size,
+            resident=False,
+            **kargws,
+        )
+        self.num_processes = num_processes or os.cpu_count() or 1
+
+    def _train_process(self, rank: int, need_test: bool) -> None:
+        """
+        This function is used by one sub-process to train the shared model on its
+        shard of the dataset.
+
+        Args:
+            rank (int): The rank of the sub-process.
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
+        # one thread per process, the processes already use all the cores
+        torch.set_num_threads(1)
+
+        # using a wrapper dataloader to handle the parameter need_test
+        wrapper = DataloaderWrapper(self.dataloader, need_test)
+
+        # every process draws the batches of its own shard in a random order
+        sampler = DistributedSampler(
+            wrapper, num_replicas=self.num_processes, rank=rank, shuffle=True
+        )
+        torch_dataloader = BatchDataloader(
+            wrapper, sampler=sampler, batch_size=self.batch_size
+        )
+
+        logging.info(f"Process {rank} starts with {len(torch_dataloader)} batches.")
+        # train the model, the optimizer steps the shared weights without locking
+        for X, y, y_outlier in torch_dataloader:
+            X = self.preprocessor.fill(X)
+            self._train(X, y, y_outlier, need_test=need_test)
+
+    def train(self, need_test: bool = False) -> None:
+        """
+        This function is used to train the model with regression or classification task using Hogwild! algorithm.
 
+        Args:
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
         self._time_start()
 
-        # start the multi-process training
+        # the processes update the weights of this model and attach to the dataset
+        self.model.net.share_memory()
+        if isinstance(self.dataloader, Dataloader):
+            self.dataloader.share_memory()
+
         torch.multiprocessing.spawn(
-            self._train, nprocs=self.world_size, args=(need_test,)
+            self._train_process, nprocs=self.num_processes, args=(need_test,)
         )
 
         self._time_end()
+
+
+class PrequentialTrainer(TrainerTemplate):
+    """
+    This class trains the model with the prequential (test-then-train) protocol of
+    open environment learning. The stream is walked window by window in order, and
+    the model is evaluated on each window before it is trained on it. The dataset
+    is moved to the device once, and the per-window metrics (error rate for
+    classification, MSE for regression) are computed together on the device at the
+    end of the stream.
+    """
+
+    def __init__(
+        self,
+        dataloader: Dataloader,
+        model: ModelTemplate,
+        preprocessor: Preprocessor,
+        lr: float = 0.01,
+        epochs: int = 1,
+        batch_size: int = 64,
+        buffer_size: int = 100,
+        window_size: int | None = None,
+        **kargws,
+    ) -> None:
+        """
+        Args:
+            dataloader (Dataloader): The dataloader object.
+            model (ModelTemplate): The model object.
+            preprocessor (Preprocessor): The preprocessor object.
+            lr (float): The learning rate.
+            epochs (int): The number of epochs for each window.
+            batch_size (int): The batch size.
+            buffer_size (int): The buffer size.
+            window_size (int | None): The number of samples in a window. Defaults to
+                the window size in the schema of the dataset.
+            **kwargs: Additional optional parameters.
+        """
+        super().__init__(
+            dataloader,
+            model,
+            preprocessor,
+            lr,
+            epochs,
+            batch_size,
+            buffer_size,
+            **kargws,
+        )
+        self.window_size = window_size or self.dataloader.get_window_size()
+        if self.window_size is None:
+            raise ValueError("Window size is not specified.")
+        # metrics of the windows in the last training
+        self.window_metrics: np.ndarray | None = None
+        # preprocess the model
+        self.model.process_model(lr=self.lr)
+
+    def train(self, need_test: bool = False) -> np.ndarray:
+        """
+        This function is used to train the model with regression or classification task using prequential algorithm.
+
+        Args:
+            need_test (bool): If this parameter is True, outliers are left out of the metrics
+                and the accurate loss will be calculated during training.
+
+        Returns:
+            out (np.ndarray): The metric of every window but the first one, which is
+                only trained on.
+        """
+        self._time_start()
+
+        X_all = torch.as_tensor(
+            self.dataloader.get_data(), dtype=torch.float, device=self.device
+        )
+        y_all = torch.as_tensor(
+            self.dataloader.get_target(), dtype=torch.float, device=self.device
+        )
+        y_outlier_all = (
+            torch.as_tensor(
+                self.dataloader.outlier_label, dtype=torch.float, device=self.device
+            )
+            if need_test
+            else None
+        )
+
+        # the outputs of the model on each window, before it is trained on it
+        outputs = []
+        for begin in range(0, X_all.shape[0], self.window_size):
+            window = slice(begin, begin + self.window_size)
+            X = X_all[window]
+            if torch.isnan(X).any():
+                X = self.preprocessor.fill(X).to(self.device, torch.float)
+            y = y_all[window]
+            y_outlier = None if y_outlier_all is None else y_outlier_all[window]
+
+            # test
+            out = None
+            if begin > 0:
+                with torch.no_grad():
+                    out = self.model.predict(X)
+                outputs.append(out)
+            # then train
+            self._train_window(X, y, y_outlier, out, need_test=need_test)
+
+        self.window_metrics = self.__window_metrics(
+            outputs,
+            y_all[self.window_size :],
+            None if y_outlier_all is None else y_outlier_all[self.window_size :],
+        )
+
+        self._time_end()
+        return self.window_metrics
+
+    def _train_window(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        y_outlier: torch.Tensor | None,
+        out: torch.Tensor | None,
+        need_test: bool = False,
+    ) -> None:
+        """
+        This function is used to train the model on a window, after it is evaluated on it.
+
+        Args:
+            X (torch.Tensor): The input data of the window.
+            y (torch.Tensor): The target data of the window.
+            y_outlier (torch.Tensor | None): The outlier target data of the window.
+            out (torch.Tensor | None): The outputs of the model on the window before
+                training, None for the first window.
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
+        self.model.train_naive(X, y, y_outlier, self.batch_size, self.epochs, need_test)
+
+    def _train_window_regularized(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        regularizer: Callable[[torch.Tensor, slice], torch.Tensor],
+    ) -> None:
+        """
+        This function trains a neural network model on a window with an additional
+        regularization term in the loss, as done by continual learning algorithms.
+
+        Args:
+            X (torch.Tensor): The input data of the window.
+            y (torch.Tensor): The target data of the window.
+            regularizer (Callable[[torch.Tensor, slice], torch.Tensor]): The function
+                that computes the regularization term from the outputs of a mini-batch
+                and its position in the window.
+        """
+        net = self.model.get_net()
+        for epoch in range(self.epochs):
+            for begin in range(0, X.shape[0], self.batch_size):
+                batch = slice(begin, begin + self.batch_size)
+                self.model.optimizer.zero_grad()
+                out = self.model.predict(X[batch])
+                loss = self._batch_loss(out, y[batch]) + regularizer(out, batch)
+                loss.backward()
+
+                # using gradient clipping to avoid gradient explosion
+                torch.nn.utils.clip_grad_norm_(net.parameters(), max_norm=1.0)
+                self.model.optimizer.step()
+
+    def _batch_loss(self, out: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+        """
+        This function computes the training loss of a mini-batch.
+
+        Args:
+            out (torch.Tensor): The outputs of the model.
+            y (torch.Tensor): The target data (one-hot encoded for classification).
+
+        Returns:
+            out (torch.Tensor): The loss.
+        """
+        if self.task == "classification":
+            return self.model.criterion(out, y)
+        return self.model.criterion(out.reshape(-1), y.reshape(-1))
+
+    def __window_metrics(
+        self,
+        outputs: list[torch.Tensor],
+        y: torch.Tensor,
+        y_outlier: torch.Tensor | None,
+    ) -> np.ndarray:
+        """
+        This function computes the metrics of all the windows at once.
+
+        Args:
+            outputs (list[torch.Tensor]): The outputs of the model on each window.
+            y (torch.Tensor): The target data of the windows.
+            y_outlier (torch.Tensor | None): The outlier labels of the windows, outliers
+                are left out of the metrics if given.
+
+        Returns:
+            out (np.ndarray): The metric of each window.
+        """
+        if len(outputs) == 0:
+            return np.empty(0)
+
+        errors = self.model.loss.output_errors(torch.cat(outputs), y)
+        weights = None if y_outlier is None else 1 - y_outlier
+        lengths = [len(out) for out in outputs]
+        return window_mean(errors, lengths, weights).cpu().numpy()
+
+
+class EwcTrainer(PrequentialTrainer):
+    """
+    This class trains neural network models with online Elastic Weight Consolidation
+    (EWC) under the prequential protocol. After each window, the diagonal Fisher
+    information of the parameters is estimated on the window in mini-batches and
+    folded into a running average, and the parameters are kept as anchors. Training
+    on the next windows is then penalized for moving important parameters away from
+    their anchors. The Fisher information and the anchors are single flat vectors, so
+    the memory does not grow with the number of windows.
+    """
+
+    def __init__(
+        self,
+        dataloader: Dataloader,
+        model: ModelTemplate,
+        preprocessor: Preprocessor,
+        lr: float = 0.01,
+        epochs: int = 1,
+        batch_size: int = 64,
+        buffer_size: int = 100,
+        window_size: int | None = None,
+        reg: float = 1.0,
+        fisher_decay: float = 0.9,
+        **kargws,
+    ) -> None:
+        """
+        Args:
+            dataloader (Dataloader): The dataloader object.
+            model (ModelTemplate): The model object.
+            preprocessor (Preprocessor): The preprocessor object.
+            lr (float): The learning rate.
+            epochs (int): The number of epochs for each window.
+            batch_size (int): The batch size.
+            buffer_size (int): The buffer size.
+            window_size (int | None): The number of samples in a window. Defaults to
+                the window size in the schema of the dataset.
+            reg (float): The weight of the EWC penalty.
+            fisher_decay (float): The weight of the past windows in the running
+                average of the Fisher information.
+            **kwargs: Additional optional parameters.
+        """
+        if not isinstance(model.get_net(), torch.nn.Module):
+            logging.error(f"Model not supported: {model.get_model_type()}")
+            raise ValueError("EWC only supports NN model.")
+        super().__init__(
+            dataloader,
+            model,
+            preprocessor,
+            lr,
+            epochs,
+            batch_size,
+            buffer_size,
+            window_size,
+            **kargws,
+        )
+        self.reg = reg
+        self.fisher_decay = fisher_decay
+        self.params = [p for p in self.net.parameters() if p.requires_grad]
+        # flat Fisher information and anchors, with a view for each parameter
+        num_params = sum(p.numel() for p in self.params)
+        self.fisher = torch.zeros(num_params, device=self.device)
+        self.anchors = torch.zeros(num_params, device=self.device)
+        self.__fisher_views = self.__split(self.fisher)
+        self.__anchor_views = self.__split(self.anchors)
+        self.consolidated = False
+
+    def __split(self, vector: torch.Tensor) -> list[torch.Tensor]:
+        """
+        Split a flat vector into views shaped like the parameters.
+
+        Args:
+            vector (torch.Tensor): The flat vector.
+
+        Returns:
+            out (list[torch.Tensor]): The view for each parameter.
+        """
+        sizes = [p.numel() for p in self.params]
+        return [
+            view.view_as(p) for view, p in zip(torch.split(vector, sizes), self.params)
+        ]
+
+    def penalty(self) -> torch.Tensor:
+        """
+        This function computes the EWC penalty of the current parameters.
+
+        Returns:
+            out (torch.Tensor): The penalty.
+        """
+        return sum(
+            (fisher * (p - anchor) ** 2).sum()
+            for p, fisher, anchor in zip(
+                self.params, self.__fisher_views, self.__anchor_views
+            )
+        )
+
+    def consolidate(self, X: torch.Tensor, y: torch.Tensor) -> None:
+        """
+        This function estimates the Fisher information on a window in mini-batches,
+        folds it into the running average and anchors the current parameters.
+
+        Args:
+            X (torch.Tensor): The input data of the window.
+            y (torch.Tensor): The target data of the window.
+        """
+        fisher = torch.zeros_like(self.fisher)
+        views = self.__split(fisher)
+        for begin in range(0, X.shape[0], self.batch_size):
+            batch = slice(begin, begin + self.batch_size)
+            self.net.zero_grad()
+            self._batch_loss(self.model.predict(X[batch]), y[batch]).backward()
+            # the squared gradients, weighted by the size of the mini-batch
+            with torch.no_grad():
+                for view, p in zip(views, self.params):
+                    if p.grad is not None:
+                        view.addcmul_(p.grad, p.grad, value=len(X[batch]))
+        self.net.zero_grad()
+        fisher /= X.shape[0]
+
+        with torch.no_grad():
+            if self.consolidated:
+                self.fisher.mul_(self.fisher_decay).add_(
+                    fisher, alpha=1 - self.fisher_decay
+                )
+            else:
+                self.fisher.copy_(fisher)
+            for anchor, p in zip(self.__anchor_views, self.params):
+                anchor.copy_(p)
+        self.consolidated = True
+
+    def _train_window(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        y_outlier: torch.Tensor | None,
+        out: torch.Tensor | None,
+        need_test: bool = False,
+    ) -> None:
+        """
+        This function trains the model on a window with the EWC penalty, then
+        consolidates the window.
+
+        Args:
+            X (torch.Tensor): The input data of the window.
+            y (torch.Tensor): The target data of the window.
+            y_outlier (torch.Tensor | None): The outlier target data of the window.
+            out (torch.Tensor | None): The outputs of the model on the window before
+                training, None for the first window.
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
+        if self.consolidated:
+            self._train_window_regularized(
+                X, y, lambda out, batch: self.reg * self.penalty()
+            )
+        else:
+            self._train_window_regularized(X, y, lambda out, batch: 0)
+        self.consolidate(X, y)
+
+
+class LwfTrainer(PrequentialTrainer):
+    """
+    This class trains neural network models with Learning without Forgetting (LwF)
+    under the prequential protocol. While training on a window, the model is
+    distilled towards its own outputs from before the window (the teacher). The
+    teacher outputs are the ones computed to evaluate the model on the window, so
+    they cost no extra forward pass and are reused across epochs.
+    """
+
+    def __init__(
+        self,
+        dataloader: Dataloader,
+        model: ModelTemplate,
+        preprocessor: Preprocessor,
+        lr: float = 0.01,
+        epochs: int = 1,
+        batch_size: int = 64,
+        buffer_size: int = 100,
+        window_size: int | None = None,
+        reg: float = 1.0,
+        temperature: float = 2.0,
+        **kargws,
+    ) -> None:
+        """
+        Args:
+            dataloader (Dataloader): The dataloader object.
+            model (ModelTemplate): The model object.
+            preprocessor (Preprocessor): The preprocessor object.
+            lr (float): The learning rate.
+            epochs (int): The number of epochs for each window.
+            batch_size (int): The batch size.
+            buffer_size (int): The buffer size.
+            window_size (int | None): The number of samples in a window. Defaults to
+                the window size in the schema of the dataset.
+            reg (float): The weight of the distillation loss.
+            temperature (float): The temperature of the distillation for classification.
+            **kwargs: Additional optional parameters.
+        """
+        if not isinstance(model.get_net(), torch.nn.Module):
+            logging.error(f"Model not supported: {model.get_model_type()}")
+            raise ValueError("LwF only supports NN model.")
+        super().__init__(
+            dataloader,
+            model,
+            preprocessor,
+            lr,
+            epochs,
+            batch_size,
+            buffer_size,
+            window_size,
+            **kargws,
+        )
+        self.reg = reg
+        self.temperature = temperature
+
+    def distillation_loss(
+        self, out: torch.Tensor, teacher_out: torch.Tensor
+    ) -> torch.Tensor:
+        """
+        This function computes the distillation loss of the outputs of the model
+        towards the outputs of the teacher.
+
+        Args:
+            out (torch.Tensor): The outputs of the model.
+            teacher_out (torch.Tensor): The outputs of the teacher.
+
+        Returns:
+            out (torch.Tensor): The distillation loss.
+        """
+        if self.task == "classification":
+            # cross entropy between the softened distributions
+            log_student = torch.log_softmax(out / self.temperature, dim=1)
+            teacher = torch.softmax(teacher_out / self.temperature, dim=1)
+            return -(teacher * log_student).sum(dim=1).mean()
+        return self.model.criterion(out.reshape(-1), teacher_out.reshape(-1))
+
+    def _train_window(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        y_outlier: torch.Tensor | None,
+        out: torch.Tensor | None,
+        need_test: bool = False,
+    ) -> None:
+        """
+        This function trains the model on a window, distilled towards the outputs of
+        the model before the window.
+
+        Args:
+            X (torch.Tensor): The input data of the window.
+            y (torch.Tensor): The target data of the window.
+            y_outlier (torch.Tensor | None): The outlier target data of the window.
+            out (torch.Tensor | None): The outputs of the model on the window before
+                training, None for the first window.
+            need_test (bool): If this parameter is True, the accurate loss will be calculated during training.
+        """
+        if out is None:
+            self._train_window_regularized(X, y, lambda out, batch: 0)
+        else:
+            teacher_out = out.detach()
+            self._train_window_regularized(
+                X,
+                y,
+                lambda out, batch: self.reg
+                * self.distillation_loss(out, teacher_out[batch]),
+            )
@@ -1,2 +1,4 @@
 from .base import *
 from .pipeline import *
+from .timeseries import *
+from .windows import *
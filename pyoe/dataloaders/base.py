@@ -1,14 +1,23 @@
 import os
-import wget
 import logging
 import scipy.io
 import numpy as np
 import pandas as pd
 import torch
 from abc import abstractmethod
-from torch.utils.data import Dataset
+from typing import Literal, TYPE_CHECKING
+from torch.utils.data import Dataset, DataLoader as TorchDataLoader
+from torch.utils.data import BatchSampler, RandomSampler, SequentialSampler, Sampler
 from ..utils import shingle
-from .pipeline import load_data
+from .pipeline import load_data, load_cached_arrays
+from .pipeline import get_dataset_cache, get_cache_options
+from .cache import DatasetCache
+from .store import DatasetStore, DownloadProgress
+from .store import get_dataset_url, get_dataset_checksum
+from .timeseries import TimeSeriesArray
+
+if TYPE_CHECKING:
+    from autogluon.timeseries import TimeSeriesDataFrame
 
 
 class BaseDataloader(Dataset):
@@ -103,6 +112,10 @@ class BaseDataloader(Dataset):
         self.data_dir: str = data_dir
         self.reload: bool = reload
         self.current_index: int = 0
+        # the window size from the dataset schema (None if the dataset has none)
+        self.window_size: int | None = None
+        # progress of the archives downloaded for this dataset, keyed by url
+        self.download_progress: dict[str, DownloadProgress] = {}
 
         # prepare for the dataset
         self.__load_dataset_with_error_checking()
@@ -151,9 +164,9 @@ class BaseDataloader(Dataset):
     def __prepare_dataset(self) -> None:
         """
         Prepare the dataset by downloading it if it does not exist.
+        Archives are extracted atomically, so existing folders are complete.
         """
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        os.makedirs(self.data_dir, exist_ok=True)
         self.__download_dataset()
 
     def __download_dataset(self) -> None:
@@ -183,23 +196,20 @@ class BaseDataloader(Dataset):
         Download the dataset from the website.
         """
         try:
-            # download from the website
-            logging.info(
-                "Start to download datasets from http://137.132.83.144/yiqun/dataset.zip"
-            )
-            wget.download("http://137.132.83.144/yiqun/dataset.zip", out=self.data_dir)
-            wget.download(
-                "http://137.132.83.144/yiqun/dataset_experiment_info.zip",
-                out=self.data_dir,
-            )
-            logging.info("Downloading finished!")
-            # unzip those downloaded files
-            logging.info("Start to unzip the downloaded archive...")
-            os.system(f"unzip {self.data_dir}dataset.zip -d {self.data_dir}")
-            os.system(
-                f"unzip {self.data_dir}dataset_experiment_info.zip -d {self.data_dir}"
+            # download from the website (once for all jobs) and unzip, in parallel
+            store = DatasetStore()
+            self.download_progress = store.progress
+            archives = ["dataset", "dataset_experiment_info"]
+            store.extract_all(
+                {get_dataset_url(f"{archive}.zip"): [archive] for archive in archives},
+                self.data_dir,
+                checksums={
+                    get_dataset_url(f"{archive}.zip"): get_dataset_checksum(
+                        f"{archive}.zip"
+                    )
+                    for archive in archives
+                },
             )
-            logging.info("Unzipping finished!")
         except Exception as e:
             # error occurred while downloading
             logging.error("Obtaining datasets failed!")
@@ -210,19 +220,15 @@ class BaseDataloader(Dataset):
         Download the dataset from the website.
         """
         try:
-            # download from the website
-            logging.info(
-                "Start to download datasets from http://137.132.83.144/yiqun/OD_datasets.zip"
+            # download from the website (once for all jobs) and unzip
+            store = DatasetStore()
+            self.download_progress = store.progress
+            store.extract(
+                get_dataset_url("OD_datasets.zip"),
+                self.data_dir,
+                ["OD_datasets"],
+                get_dataset_checksum("OD_datasets.zip"),
             )
-            # download from the website
-            wget.download(
-                "http://137.132.83.144/yiqun/OD_datasets.zip", out=self.data_dir
-            )
-            logging.info("Downloading finished!")
-            # unzip those downloaded files
-            logging.info("Start to unzip the downloaded archive...")
-            os.system(f"unzip {self.data_dir}OD_datasets.zip -d {self.data_dir}")
-            logging.info("Unzipping finished!")
         except Exception as e:
             # error occurred while downloading
             logging.error("Obtaining datasets failed!")
@@ -233,19 +239,15 @@ class BaseDataloader(Dataset):
         Download the dataset from the website.
         """
         try:
-            # download from the website
-            logging.info(
-                "Start to download datasets from http://137.132.83.144/yiqun/financial_datasets.zip"
-            )
-            # download from the website
-            wget.download(
-                "http://137.132.83.144/yiqun/financial_datasets.zip", out=self.data_dir
+            # download from the website (once for all jobs) and unzip
+            store = DatasetStore()
+            self.download_progress = store.progress
+            store.extract(
+                get_dataset_url("financial_datasets.zip"),
+                self.data_dir,
+                ["financial_datasets"],
+                get_dataset_checksum("financial_datasets.zip"),
             )
-            logging.info("Downloading finished!")
-            # unzip those downloaded files
-            logging.info("Start to unzip the downloaded archive...")
-            os.system(f"unzip {self.data_dir}financial_datasets.zip -d {self.data_dir}")
-            logging.info("Unzipping finished!")
         except Exception as e:
             # error occurred while downloading
             logging.error("Obtaining datasets failed!")
@@ -353,6 +355,15 @@ class BaseDataloader(Dataset):
         """
         return self.task
 
+    def get_window_size(self) -> int | None:
+        """
+        Return the window size of the dataset, as given by its schema.
+
+        Returns:
+            out (int | None): the window size, or None if the dataset has no schema.
+        """
+        return self.window_size
+
     def get_missing_rate(self) -> float:
         """
         Return the missing rate for the dataset.
@@ -468,6 +479,12 @@ class Dataloader(BaseDataloader):
     """
     This class is used to load the dataset from local files.
     For non-time-series data only, the data is stored in a torch tensor.
+
+    With ``storage="mmap"``, features and targets of OEBench datasets are
+    memory-mapped from the dataset cache instead of being read into memory.
+    ``get_data()`` and ``__getitem__`` then return zero-copy views, processes
+    reading the same dataset share one page-cache copy, and datasets larger than
+    RAM stay loadable.
     """
 
     def __init__(
@@ -475,6 +492,10 @@ class Dataloader(BaseDataloader):
         dataset_name: str,
         data_dir: str = "./data/",
         reload: bool = False,
+        storage: Literal["memory", "mmap"] = "memory",
+        chunk_size: int | None = None,
+        imputation: Literal["global", "window"] | None = None,
+        n_jobs: int = 1,
     ):
         """
         Args:
@@ -482,40 +503,236 @@ class Dataloader(BaseDataloader):
             data_dir (str): the directory to store the dataset.
             reload (bool):
                 whether to reload the dataset or load from cache files if exists
-        """
+            storage (Literal["memory", "mmap"]):
+                whether to keep the data in memory or memory-map it from the cache.
+            chunk_size (int | None):
+                if set, the raw data is preprocessed in blocks of this many rows,
+                which allows large datasets to be ingested with little memory.
+                Null values are then imputed window by window.
+            imputation (Literal["global", "window"] | None):
+                how null values are imputed with ``KNNImputer``: over all rows
+                ("global", the default in memory) or window by window ("window",
+                the default in chunks), which scales linearly with the row count.
+            n_jobs (int):
+                the number of parallel jobs used for window imputation.
+        """
+        if storage not in ("memory", "mmap"):
+            raise ValueError(f"Storage {storage} is not supported.")
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.imputation = imputation
+        self.n_jobs = n_jobs
+        # the cache that data and target are memory-mapped from (if any)
+        self.mapped_cache = None
+        # outlier labels and the data they are computed from (if not cached)
+        self.__outlier_label = None
+        self.__outlier_source = None
         super().__init__(
             dataset_name=dataset_name,
             data_dir=data_dir,
             reload=reload,
         )
 
-    def __getitem__(self, idx: int, return_outlier_label=False):
+    def __getitem__(self, idx, return_outlier_label=False):
         """
         Return the data and target at the given index. This function is required by
         PyTorch. Note that ``return_outlier_label`` is passed by using a wrapper
-        class ``DataloaderWrapper``.
+        class ``DataloaderWrapper``. A whole batch can be fetched at once by
+        passing a sequence of indices, which costs a single slicing operation.
 
         Args:
-            idx (int): the index of the sample.
+            idx (int | Sequence[int] | torch.Tensor): the index of the sample
+                or the indices of a batch.
             return_outlier_label (bool): whether to return the outlier label.
 
         Returns:
             value (tuple): a tuple of data, target and outlier (if ``return_outlier_label`` is ``True``).
         """
+        data = self.data[idx]
         return (
-            torch.tensor(self.data[idx]),
-            torch.tensor(self.target[idx]),
+            data,
+            torch.as_tensor(self.target[idx]),
             (
-                torch.tensor(self.outlier_label[idx])
+                torch.as_tensor(self.outlier_label[idx])
                 if return_outlier_label
-                else torch.tensor([])
+                # zero-sized, so no memory is allocated for it
+                else torch.empty(data.shape[:-1] + (0,))
             ),
         )
 
-    def _load_common_dataset(self) -> None:
+    def __getitems__(self, indices: list[int], return_outlier_label=False) -> list:
         """
-        Load the dataset from local files.
+        Return a list of samples at the given indices. This function is used by
+        ``torch.utils.data.DataLoader`` when batching automatically. The samples are
+        fetched with a single slicing operation and returned as views of the batch.
+
+        Args:
+            indices (list[int]): the indices of the samples.
+            return_outlier_label (bool): whether to return the outlier label.
+
+        Returns:
+            value (list): a list of (data, target, outlier) tuples.
+        """
+        return list(zip(*self.__getitem__(indices, return_outlier_label)))
+
+    def __getstate__(self) -> dict:
+        """
+        Memory-mapped data is not pickled (e.g. when spawning training processes),
+        it is mapped again from the dataset cache when unpickling. Arrays placed in
+        shared memory by ``share_memory`` are pickled as their shared tensors, which
+        ``torch.multiprocessing`` hands over by reference.
+
+        Returns:
+            out (dict): the state of the dataloader.
+        """
+        state = self.__dict__.copy()
+        if self.mapped_cache is not None:
+            state["data"], state["target"] = None, None
+        shared_arrays = []
+        for key, value in state.items():
+            if (
+                isinstance(value, np.ndarray)
+                and isinstance(value.base, torch.Tensor)
+                and value.base.is_shared()
+            ):
+                state[key] = value.base
+                shared_arrays.append(key)
+        state["_Dataloader__shared_arrays"] = shared_arrays
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state of the dataloader and map the data from the cache again.
+
+        Args:
+            state (dict): the state of the dataloader.
+        """
+        shared_arrays = state.pop("_Dataloader__shared_arrays", [])
+        self.__dict__.update(state)
+        for key in shared_arrays:
+            self.__dict__[key] = self.__dict__[key].numpy()
+        if self.mapped_cache is not None:
+            self.data = torch.from_numpy(self.mapped_cache.load_array("data", "c"))
+            self.target = torch.from_numpy(self.mapped_cache.load_array("target", "c"))
+
+    def share_memory(self) -> "Dataloader":
+        """
+        Move the data, the target and the outlier labels into shared memory, so that
+        processes spawned with ``torch.multiprocessing`` attach to them instead of
+        receiving a copy of the dataset each. Memory-mapped data is already shared
+        through the page cache and is left as is.
+
+        Returns:
+            out (Dataloader): the dataloader itself.
+        """
+        if self.mapped_cache is None:
+            self.data = self.__share(self.data)
+            self.target = self.__share(self.target)
+        if self.__outlier_label is not None:
+            self.__outlier_label = self.__share(self.__outlier_label)
+        if isinstance(self.__outlier_source, pd.DataFrame):
+            # only the values are needed to mark the outliers
+            self.__outlier_source = self.__share(
+                self.__outlier_source.to_numpy(dtype=np.float64)
+            )
+        return self
+
+    @staticmethod
+    def __share(value: torch.Tensor | np.ndarray) -> torch.Tensor | np.ndarray:
+        """
+        Move a tensor or an array into shared memory.
+
+        Args:
+            value (torch.Tensor | np.ndarray): the tensor or the array.
+
+        Returns:
+            out (torch.Tensor | np.ndarray): the shared tensor, or an array view of
+                a shared tensor.
+        """
+        if isinstance(value, torch.Tensor):
+            return value.share_memory_()
+        return torch.from_numpy(np.ascontiguousarray(value)).share_memory_().numpy()
+
+    def __dataset_cache(self) -> DatasetCache:
         """
+        Return the cache of the dataset for the preprocessing options of this
+        dataloader.
+
+        Returns:
+            out (DatasetCache): the cache of the dataset.
+        """
+        options = get_cache_options(self.chunk_size, self.imputation)
+        return get_dataset_cache(self.dataset_name, self.data_dir, options)
+
+    def __load_common_arrays(
+        self, data_one_hot: pd.DataFrame, target_data_nonnull: pd.DataFrame
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Load data and target as float64 arrays from the dataset cache, storing
+        them there first if needed. In ``mmap`` storage, the arrays are mapped
+        copy-on-write, otherwise they are read into memory.
+
+        Args:
+            data_one_hot (pd.DataFrame): the data after one hot encoding.
+            target_data_nonnull (pd.DataFrame): the target data.
+
+        Returns:
+            data (torch.Tensor): the data in float64.
+            target (torch.Tensor): the target in float64.
+        """
+        cache = self.__dataset_cache()
+        mmap_mode = "c" if self.storage == "mmap" else None
+        try:
+            if not (cache.has_array("data") and cache.has_array("target")):
+                with cache.lock():
+                    # another process may have stored them while we waited
+                    if not (cache.has_array("data") and cache.has_array("target")):
+                        cache.save_arrays(
+                            {
+                                "data": data_one_hot.astype(float).values,
+                                "target": target_data_nonnull.astype(float).values,
+                            }
+                        )
+            data = cache.load_array("data", mmap_mode)
+            target = cache.load_array("target", mmap_mode)
+        except (OSError, KeyError) as e:
+            # fall back to in-memory data if the cache is not usable
+            logging.warning(f'Dataset cache not usable due to "{e}", using memory')
+            data = data_one_hot.astype(float).values
+            target = target_data_nonnull.astype(float).values
+            mmap_mode = None
+
+        self.mapped_cache = cache if mmap_mode is not None else None
+        return torch.from_numpy(data), torch.from_numpy(target)
+
+    def _load_common_dataset(self) -> None:
+        """
+        Load the dataset from local files. If the dataset is cached, only the data
+        and target arrays are read (or mapped), none of the cached frames.
+        """
+        mmap_mode = "c" if self.storage == "mmap" else None
+        cached = None
+        if not self.reload:
+            cached = load_cached_arrays(
+                self.dataset_name,
+                self.data_dir,
+                mmap_mode,
+                self.chunk_size,
+                self.imputation,
+            )
+        if cached is not None:
+            data, target, meta = cached
+            self.data, self.target = torch.from_numpy(data), torch.from_numpy(target)
+            cache = self.__dataset_cache()
+            self.mapped_cache = cache if mmap_mode is not None else None
+            self.task = meta["task"]
+            self.window_size = meta["window_size"]
+            self.num_samples = data.shape[0]
+            self.num_columns = data.shape[1]
+            self.output_dim = target.shape[1]
+            self.missing_ratio = meta["missing_ratio"]
+            return
+
         try:
             (
                 target_data_nonnull,
@@ -529,25 +746,65 @@ class Dataloader(BaseDataloader):
                 dataset_path=self.dataset_name,
                 prefix=self.data_dir,
                 reload=self.reload,
+                mmap_mode=mmap_mode,
+                chunk_size=self.chunk_size,
+                imputation=self.imputation,
+                n_jobs=self.n_jobs,
             )
         except Exception as e:
             raise e
 
-        # import at Runtime to avoid circular import
-        from ..models import OutlierDetectorNet
-
-        self.data = torch.tensor(data_one_hot.astype(float).values)
-        self.target = torch.tensor(target_data_nonnull.astype(float).values)
-        self.task = task
-        self.outlier_label = OutlierDetectorNet.outlier_detector_marker(
-            data_onehot_nonnull.astype(float)
+        self.data, self.target = self.__load_common_arrays(
+            data_one_hot, target_data_nonnull
         )
+        self.task = task
+        self.window_size = window_size
 
         self.num_samples = data_one_hot.shape[0]
         self.num_columns = data_one_hot.shape[1]
         self.output_dim = output_dim
-        self.outlier_ratio = np.sum(self.outlier_label) / self.num_samples
-        self.missing_ratio = self.calculate_missing_rate(data_before_onehot)
+        cache = self.__dataset_cache()
+        if data_before_onehot is not None:
+            self.missing_ratio = self.calculate_missing_rate(data_before_onehot)
+        else:
+            # the raw data is not loaded from the cache, which stores its
+            # missing ratio instead
+            self.missing_ratio = cache.read_manifest()["meta"]["missing_ratio"]
+
+        # outlier labels are computed on first access, keep the imputed data
+        # in memory only if it cannot be read back from the cache
+        if not cache.has_frame("onehot_nonnull"):
+            self.__outlier_source = data_onehot_nonnull
+
+    def __mark_outliers(self) -> np.ndarray:
+        """
+        Mark the outliers of an OEBench dataset with ``OutlierDetectorNet``. The
+        labels are stored in the dataset cache, so that they are computed only once
+        across processes and runs.
+
+        Returns:
+            out (np.ndarray): the outlier labels.
+        """
+        # import at Runtime to avoid circular import
+        from ..models import OutlierDetectorNet
+
+        cache = self.__dataset_cache()
+        if self.__outlier_source is None and cache.has_array("outlier_label"):
+            return cache.load_array("outlier_label")
+
+        logging.info(f"Start to mark the outliers of {self.dataset_name}")
+        if self.__outlier_source is not None:
+            data_onehot_nonnull = self.__outlier_source
+        else:
+            data_onehot_nonnull = cache.load_frame("onehot_nonnull", "r")
+        outlier_label = OutlierDetectorNet.outlier_detector_marker(
+            data_onehot_nonnull.astype(float)
+        )
+        try:
+            cache.save_arrays({"outlier_label": outlier_label})
+        except OSError as e:
+            logging.warning(f'Failed to cache the outlier labels due to "{e}"')
+        return outlier_label
 
     def _load_od_dataset(self) -> None:
         """
@@ -565,7 +822,7 @@ class Dataloader(BaseDataloader):
             numeric = data["value"].values  # .reshape(-1, 1)
             labels = data["label"].values
             X = shingle(numeric, 10)  # shape (windowsize, len-win+1)
-            numeric = torch.FloatTensor(np.transpose(X))
+            numeric = torch.tensor(np.transpose(X), dtype=torch.float)
             t1, _ = np.shape(numeric)
             labels = labels[:t1]
         elif self.dataset_name == "OD_datasets/CPU":
@@ -575,7 +832,7 @@ class Dataloader(BaseDataloader):
             numeric = data["value"].values
             labels = data["label"].values
             X = shingle(numeric, 10)
-            numeric = torch.FloatTensor(np.transpose(X))
+            numeric = torch.tensor(np.transpose(X), dtype=torch.float)
             t1, _ = np.shape(numeric)
             labels = labels[:t1]
         elif self.dataset_name == "OD_datasets/MT":
@@ -585,7 +842,7 @@ class Dataloader(BaseDataloader):
             numeric = data["value"].values
             labels = data["label"].values
             X = shingle(numeric, 10)
-            numeric = torch.FloatTensor(np.transpose(X))
+            numeric = torch.tensor(np.transpose(X), dtype=torch.float)
             t1, _ = np.shape(numeric)
             labels = labels[:t1]
         elif self.dataset_name == "OD_datasets/NYC":
@@ -593,7 +850,7 @@ class Dataloader(BaseDataloader):
             numeric = data["value"].values
             labels = data["label"].values
             X = shingle(numeric, 10)
-            numeric = torch.FloatTensor(np.transpose(X))
+            numeric = torch.tensor(np.transpose(X), dtype=torch.float)
             t1, _ = np.shape(numeric)
             labels = labels[:t1]
         elif self.dataset_name in [
@@ -644,6 +901,27 @@ class Dataloader(BaseDataloader):
     Below are some helper functions with regard to outlier detection.
     """
 
+    @property
+    def outlier_label(self) -> np.ndarray:
+        """
+        The outlier labels of the dataset. For OEBench datasets, they are marked
+        by ``OutlierDetectorNet`` on first access and cached with the dataset.
+        """
+        if self.__outlier_label is None:
+            self.__outlier_label = self.__mark_outliers()
+        return self.__outlier_label
+
+    @outlier_label.setter
+    def outlier_label(self, value: np.ndarray) -> None:
+        self.__outlier_label = value
+
+    @property
+    def outlier_ratio(self) -> float:
+        """
+        The ratio of outliers in the dataset, computed from ``outlier_label``.
+        """
+        return np.sum(self.outlier_label) / self.num_samples
+
     def get_outlier_ratio(self) -> float:
         """
         Return the outlier ratio for the dataset.
@@ -658,6 +936,10 @@ class TimeSeriesDataloader(BaseDataloader):
     """
     This class is used to load the time series dataset from local files.
     For time-series data only, the data is stored in a pandas dataframe.
+
+    The numeric data is also held in ``series`` as contiguous arrays with a
+    timestamp index, which serves row and range lookups and caches the
+    ``TimeSeriesDataFrame`` used by Chronos.
     """
 
     def __init__(
@@ -683,20 +965,38 @@ class TimeSeriesDataloader(BaseDataloader):
             reload=reload,
         )
 
-    def __getitem__(self, idx: int, return_outlier_label=False):
+    def __getitem__(self, idx, return_outlier_label=False):
         """
         Return the data and target at the given index. This function is required by
-        PyTorch.
+        PyTorch. A whole batch can be fetched at once by passing a sequence of
+        indices or a slice. Only the numeric values are returned, the timestamps
+        are available in ``series.timestamps``.
 
         Args:
-            idx (int): the index of the sample.
+            idx (int | slice | Sequence[int]): the index of the sample or the
+                indices of a batch.
             return_outlier_label (bool): whether to return the outlier label
                 (not used for time series data).
 
         Returns:
             value (tuple): a tuple of data, target and an empty tensor.
         """
-        return (self.data.iloc[idx], self.target.iloc[idx], torch.tensor([]))
+        data, target = self.series[idx]
+        return (torch.from_numpy(data), torch.as_tensor(target), torch.tensor([]))
+
+    def get_time_series_frame(self, stop: int | None = None) -> "TimeSeriesDataFrame":
+        """
+        Return the dataset as an autogluon ``TimeSeriesDataFrame``, which can be
+        passed to ``ChronosModel`` instead of the data and target frames. The frame
+        is built once and cached.
+
+        Args:
+            stop (int | None): if set, only the first ``stop`` time steps are kept.
+
+        Returns:
+            out (TimeSeriesDataFrame): the time series frame.
+        """
+        return self.series.to_time_series_frame(stop)
 
     def _load_common_dataset(self) -> None:
         """
@@ -723,10 +1023,12 @@ class TimeSeriesDataloader(BaseDataloader):
         self.data = data_onehot_nonnull
         self.target = target_data_nonnull
         self.task = task
+        self.window_size = window_size
 
         # time series data needs item_id and timestamp (for target)
         self.data["item_id"] = 0
         self.target["item_id"] = 0
+        self.series = TimeSeriesArray.from_frames(self.data, self.target)
 
         self.num_samples = data_one_hot.shape[0]
         self.num_columns = data_one_hot.shape[1]
@@ -752,30 +1054,25 @@ class TimeSeriesDataloader(BaseDataloader):
         if not os.path.exists(f"{self.data_dir}/{self.dataset_name}"):
             raise ValueError("Dataset not supported.")
 
-        # load the dataset
-        whole_data = pd.read_csv(f"{self.data_dir}/{self.dataset_name}")
-        whole_data["date"] = pd.to_datetime(whole_data["date"])
+        # load the dataset indexed by date
+        whole_data = pd.read_csv(
+            f"{self.data_dir}/{self.dataset_name}", index_col="date", parse_dates=True
+        )
 
-        # infer and then set frequency
+        # set frequency
         freq = "D"  # note: datasets in ``financial_datasets`` are daily
-        whole_data.set_index("date", inplace=True)
         whole_data = whole_data.asfreq(freq, method="ffill")
-        whole_data.reset_index(inplace=True)
-
-        target = whole_data[["date", self.predicted_label]]
-        target["date"] = pd.to_datetime(target["date"])
-        data = whole_data.drop(columns=["date", self.predicted_label])
 
-        # rename the columns
-        rename_dict = {self.predicted_label: "target", "date": "timestamp"}
-        target.rename(columns=rename_dict, inplace=True)
-
-        # add some necessary columns
-        target["item_id"] = 0
-        data["item_id"] = 0
-
-        self.data = data
-        self.target = target
+        # hold the numeric columns as arrays, and build the frames from them
+        data = whole_data.drop(columns=[self.predicted_label])
+        self.series = TimeSeriesArray(
+            data.to_numpy(dtype=np.float64),
+            data.columns.tolist(),
+            whole_data[self.predicted_label].to_numpy(dtype=np.float64),
+            whole_data.index.to_numpy(),
+        )
+        self.data = self.series.to_data_frame()
+        self.target = self.series.to_target_frame()
         self.task = "forecasting"
         self.num_samples = self.data.shape[0]
         self.num_columns = self.data.shape[1]
@@ -797,19 +1094,34 @@ class DataloaderWrapper(Dataset):
         self.dataset = dataset
         self.return_outlier_label = return_outlier_label
 
-    def __getitem__(self, idx: int):
+    def __getitem__(self, idx):
         """
         The wrapper function to get the data and target from the dataset.
         This function is required by PyTorch.
 
         Args:
-            idx (int): the index of the sample.
+            idx (int | Sequence[int]): the index of the sample or the indices of a batch.
 
         Returns:
             value (tuple): a tuple of data, target and outlier (if ``return_outlier_label`` is ``True``).
         """
         return self.dataset.__getitem__(idx, self.return_outlier_label)
 
+    def __getitems__(self, indices: list[int]) -> list:
+        """
+        The wrapper function to get a list of samples from the dataset.
+        This function is used by PyTorch when batching automatically.
+
+        Args:
+            indices (list[int]): the indices of the samples.
+
+        Returns:
+            value (list): a list of (data, target, outlier) tuples.
+        """
+        if hasattr(self.dataset, "__getitems__"):
+            return self.dataset.__getitems__(indices, self.return_outlier_label)
+        return [self.__getitem__(idx) for idx in indices]
+
     def __len__(self) -> int:
         """
         The wrapper function to get the length of the dataset.
@@ -819,3 +1131,40 @@ class DataloaderWrapper(Dataset):
             int: the number of samples in the dataset.
         """
         return self.dataset.__len__()
+
+
+class BatchDataloader(TorchDataLoader):
+    """
+    A ``torch.utils.data.DataLoader`` which fetches every batch with a single
+    slicing operation instead of collating it sample by sample. The dataset
+    should accept a sequence of indices in ``__getitem__``, which is the case for
+    ``Dataloader``, ``TimeSeriesDataloader`` and ``DataloaderWrapper``.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: int = 64,
+        shuffle: bool = False,
+        sampler: Sampler | None = None,
+        drop_last: bool = False,
+        **kwargs,
+    ):
+        """
+        Args:
+            dataset (Dataset): the dataset to load batches from.
+            batch_size (int): the number of samples in each batch.
+            shuffle (bool): whether to shuffle the samples (ignored if ``sampler`` is set).
+            sampler (Sampler | None): the sampler that yields the sample indices.
+            drop_last (bool): whether to drop the last incomplete batch.
+            **kwargs: other arguments passed to ``torch.utils.data.DataLoader``.
+        """
+        if sampler is None:
+            sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+        # automatic batching is disabled, so each index is a whole batch
+        super().__init__(
+            dataset,
+            sampler=BatchSampler(sampler, batch_size, drop_last),
+            batch_size=None,
+            **kwargs,
+        )
@@ -0,0 +1,492 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Iterator
+from .store import FileLock
+
+# bump this number whenever the on-disk layout changes
+CACHE_VERSION = 3
+# name of the cache folder inside each dataset folder, which holds one cache per
+# set of preprocessing options
+CACHE_DIR_NAME = "pyoe_cache"
+# files smaller than this are fingerprinted by content, larger ones by size and mtime
+HASH_SIZE_LIMIT = 16 * 1024 * 1024
+
+
+class DatasetCache:
+    """
+    A versioned binary cache for preprocessed datasets. Every cached frame is
+    split into dtype-homogeneous column blocks, each of them saved as a ``.npy``
+    file, and described by a JSON manifest (columns, dtypes, task, window size).
+    Loading a cached dataset therefore needs no parsing at all.
+
+    The cache is keyed by a fingerprint of the source files (``info.json``,
+    ``schema.json`` and the raw data file) and of the preprocessing options, so
+    it is invalidated automatically whenever one of them changes. Every set of
+    options has its own cache folder, so datasets loaded with different options
+    do not replace each other's cache.
+
+    Writers (replacing the cache, adding arrays to it) hold an inter-process lock
+    on a file next to the cache folder, so concurrent writers never lose updates.
+    """
+
+    def __init__(
+        self,
+        dataset_path: str,
+        source_files: list[str],
+        options: dict | None = None,
+    ):
+        """
+        Args:
+            dataset_path (str): the path of the dataset folder.
+            source_files (list[str]): the files that the cached data is derived from.
+            options (dict | None): preprocessing options that also key the cache.
+        """
+        self.dataset_path = dataset_path
+        self.source_files = source_files
+        self.options = options or {}
+        options_key = hashlib.sha1(
+            json.dumps(self.options, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        self.cache_dir = os.path.join(dataset_path, CACHE_DIR_NAME, options_key)
+        self.manifest_path = os.path.join(self.cache_dir, "manifest.json")
+        # the lock file lives outside the cache folder, which is swapped on commit
+        self.lock_path = f"{self.cache_dir}.lock"
+        self.__lock_held = False
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Hold the inter-process lock of the cache. The lock is re-entrant within
+        this object, so locked methods can be called while holding it.
+        """
+        if self.__lock_held:
+            yield
+            return
+        with FileLock(self.lock_path):
+            self.__lock_held = True
+            try:
+                yield
+            finally:
+                self.__lock_held = False
+
+    @staticmethod
+    def __file_fingerprint(path: str) -> dict:
+        """
+        Compute the fingerprint of a single file.
+
+        Args:
+            path (str): the path of the file.
+
+        Returns:
+            out (dict): size, modification time and (for small files) content digest.
+        """
+        stat = os.stat(path)
+        fingerprint = {
+            "path": os.path.basename(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if stat.st_size <= HASH_SIZE_LIMIT:
+            with open(path, "rb") as f:
+                fingerprint["sha256"] = hashlib.sha256(f.read()).hexdigest()
+        return fingerprint
+
+    def fingerprint(self) -> dict:
+        """
+        Compute the fingerprint of the current source files and options.
+
+        Returns:
+            out (dict): the fingerprint which is stored in the manifest.
+        """
+        return {
+            "version": CACHE_VERSION,
+            "sources": [self.__file_fingerprint(path) for path in self.source_files],
+            "options": self.options,
+        }
+
+    def read_manifest(self) -> dict | None:
+        """
+        Read the manifest of the cache.
+
+        Returns:
+            out (dict | None): the manifest, or ``None`` if there is no readable one.
+        """
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            logging.warning(f"Cache manifest {self.manifest_path} is corrupted")
+            return None
+
+    def __write_manifest(self, manifest: dict) -> None:
+        """
+        Atomically replace the manifest of an existing cache.
+
+        Args:
+            manifest (dict): the new manifest.
+        """
+        tmp_path = f"{self.manifest_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_valid(self) -> bool:
+        """
+        Check whether the cache exists and matches the current source files.
+
+        Returns:
+            out (bool): whether the cache can be used.
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            return False
+        try:
+            return manifest["fingerprint"] == self.fingerprint()
+        except (KeyError, OSError):
+            return False
+
+    @staticmethod
+    def __save_array(path, array: np.ndarray) -> None:
+        """
+        Save an array to a ``.npy`` file, pickling it only if it holds objects.
+
+        Args:
+            path (str | file): the path of (or the handle to) the ``.npy`` file.
+            array (np.ndarray): the array to save.
+        """
+        np.save(path, array, allow_pickle=array.dtype == object)
+
+    @staticmethod
+    def __load_array(path: str, mmap_mode: str | None = None) -> np.ndarray:
+        """
+        Load an array from a ``.npy`` file. Object arrays can not be memory-mapped,
+        so they are always loaded into memory.
+
+        Args:
+            path (str): the path of the ``.npy`` file.
+            mmap_mode (str | None): the memory-map mode passed to ``np.load``.
+
+        Returns:
+            out (np.ndarray): the loaded array.
+        """
+        try:
+            return np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        except ValueError:
+            # object arrays need pickling and can not be memory-mapped
+            return np.load(path, allow_pickle=True)
+
+    def __save_frame(self, directory: str, name: str, frame: pd.DataFrame) -> dict:
+        """
+        Save a dataframe as dtype-homogeneous column blocks.
+
+        Args:
+            directory (str): the folder to write the blocks to.
+            name (str): the name of the frame.
+            frame (pd.DataFrame): the frame to save.
+
+        Returns:
+            out (dict): the description of the frame stored in the manifest.
+        """
+        # group column positions by their dtype
+        groups: dict[str, list[int]] = {}
+        for position, dtype in enumerate(frame.dtypes):
+            groups.setdefault(str(dtype), []).append(position)
+
+        blocks = []
+        for i, (dtype, positions) in enumerate(groups.items()):
+            block = frame.iloc[:, positions]
+            if isinstance(block.dtypes.iloc[0], np.dtype):
+                array = np.ascontiguousarray(block.to_numpy())
+            else:
+                # extension dtypes are stored as objects and restored on loading
+                array = block.to_numpy(dtype=object)
+            file_name = f"{name}.{i}.npy"
+            self.__save_array(os.path.join(directory, file_name), array)
+            blocks.append({"file": file_name, "dtype": dtype, "columns": positions})
+
+        # the index is only stored if it carries information
+        index = None
+        if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0:
+            file_name = f"{name}.index.npy"
+            self.__save_array(
+                os.path.join(directory, file_name), np.asarray(frame.index)
+            )
+            index = {"file": file_name, "dtype": str(frame.index.dtype)}
+
+        return {
+            "columns": frame.columns.tolist(),
+            "rows": frame.shape[0],
+            "blocks": blocks,
+            "index": index,
+        }
+
+    def __load_frame(self, description: dict, mmap_mode: str | None) -> pd.DataFrame:
+        """
+        Load a dataframe saved by ``__save_frame``.
+
+        Args:
+            description (dict): the description of the frame in the manifest.
+            mmap_mode (str | None): the memory-map mode passed to ``np.load``.
+
+        Returns:
+            out (pd.DataFrame): the loaded frame.
+        """
+        columns = description["columns"]
+        parts = []
+        for block in description["blocks"]:
+            array = self.__load_array(
+                os.path.join(self.cache_dir, block["file"]), mmap_mode
+            )
+            part = pd.DataFrame(array, columns=[columns[i] for i in block["columns"]])
+            if array.dtype == object and block["dtype"] != "object":
+                part = part.astype(block["dtype"])
+            parts.append(part)
+
+        # restore the original column order
+        if len(parts) == 0:
+            frame = pd.DataFrame(index=range(description["rows"]), columns=columns)
+        elif len(parts) == 1:
+            frame = parts[0]
+        else:
+            frame = pd.concat(parts, axis=1)[columns]
+
+        if description["index"] is not None:
+            index = self.__load_array(
+                os.path.join(self.cache_dir, description["index"]["file"])
+            )
+            frame.index = pd.Index(index, dtype=description["index"]["dtype"])
+        return frame
+
+    def begin(self) -> None:
+        """
+        Start writing a new cache. Everything is first written to a staging folder
+        which only replaces the current cache in ``commit``, so a crash never
+        leaves a half-written cache behind.
+        """
+        logging.info(f"Start to write the dataset cache to {self.cache_dir}")
+        self.staging_dir = f"{self.cache_dir}.tmp-{os.getpid()}"
+        if os.path.exists(self.staging_dir):
+            shutil.rmtree(self.staging_dir)
+        os.makedirs(self.staging_dir)
+        self.staging = {"frames": {}, "arrays": {}}
+
+    def add_frame(self, name: str, frame: pd.DataFrame) -> None:
+        """
+        Write a dataframe to the staging folder.
+
+        Args:
+            name (str): the name of the frame.
+            frame (pd.DataFrame): the frame to write.
+        """
+        self.staging["frames"][name] = self.__save_frame(self.staging_dir, name, frame)
+
+    def create_frame(
+        self, name: str, columns: list, rows: int, dtype: str = "float64"
+    ) -> np.memmap:
+        """
+        Allocate a frame made of a single block in the staging folder and return a
+        writable memory map of it, so that large frames can be filled block by
+        block without holding them in memory.
+
+        Args:
+            name (str): the name of the frame.
+            columns (list): the columns of the frame.
+            rows (int): the number of rows of the frame.
+            dtype (str): the dtype of all the columns.
+
+        Returns:
+            out (np.memmap): the writable memory map of shape ``(rows, len(columns))``.
+        """
+        file_name = f"{name}.0.npy"
+        array = np.lib.format.open_memmap(
+            os.path.join(self.staging_dir, file_name),
+            mode="w+",
+            dtype=dtype,
+            shape=(rows, len(columns)),
+        )
+        self.staging["frames"][name] = {
+            "columns": list(columns),
+            "rows": rows,
+            "blocks": [
+                {
+                    "file": file_name,
+                    "dtype": str(array.dtype),
+                    "columns": list(range(len(columns))),
+                }
+            ],
+            "index": None,
+        }
+        return array
+
+    def alias_array(self, name: str, frame_name: str) -> None:
+        """
+        Expose the single block of a staged frame as a named array without
+        copying it (see ``save_arrays``).
+
+        Args:
+            name (str): the name of the array.
+            frame_name (str): the name of a frame created by ``create_frame``.
+        """
+        description = self.staging["frames"][frame_name]
+        self.staging["arrays"][name] = {
+            "file": description["blocks"][0]["file"],
+            "dtype": description["blocks"][0]["dtype"],
+            "shape": [description["rows"], len(description["columns"])],
+        }
+
+    def commit(self, meta: dict) -> None:
+        """
+        Write the manifest and move the staged cache in place.
+
+        Args:
+            meta (dict): JSON-serializable metadata such as task and window size.
+        """
+        manifest = {"fingerprint": self.fingerprint(), "meta": meta, **self.staging}
+        with open(os.path.join(self.staging_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        # replace the old cache by the new one: the old folder is renamed aside
+        # first, so the cache folder is never seen half-deleted
+        old_dir = f"{self.cache_dir}.old-{os.getpid()}"
+        with self.lock():
+            if os.path.exists(self.cache_dir):
+                os.rename(self.cache_dir, old_dir)
+            os.rename(self.staging_dir, self.cache_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        logging.info("Writing the dataset cache finished")
+
+    def save(self, frames: dict[str, pd.DataFrame], meta: dict) -> None:
+        """
+        Write the frames and metadata to the cache.
+
+        Args:
+            frames (dict[str, pd.DataFrame]): the frames to cache, keyed by name.
+            meta (dict): JSON-serializable metadata such as task and window size.
+        """
+        self.begin()
+        for name, frame in frames.items():
+            self.add_frame(name, frame)
+        self.commit(meta)
+
+    def load(
+        self, mmap_mode: str | None = None, names: list[str] | None = None
+    ) -> tuple[dict[str, pd.DataFrame], dict]:
+        """
+        Load the frames and metadata from the cache.
+
+        Args:
+            mmap_mode (str | None): the memory-map mode passed to ``np.load``.
+            names (list[str] | None): the frames to load, all of them if ``None``.
+                Frames which are not in the cache are skipped.
+
+        Returns:
+            frames (dict[str, pd.DataFrame]): the cached frames, keyed by name.
+            meta (dict): the cached metadata.
+        """
+        logging.info(f"Loading the processed data from {self.cache_dir}")
+        manifest = self.read_manifest()
+        frames = {
+            name: self.__load_frame(description, mmap_mode)
+            for name, description in manifest["frames"].items()
+            if names is None or name in names
+        }
+        return frames, manifest["meta"]
+
+    def load_frame(self, name: str, mmap_mode: str | None = None) -> pd.DataFrame:
+        """
+        Load a single frame from the cache.
+
+        Args:
+            name (str): the name of the frame.
+            mmap_mode (str | None): the memory-map mode passed to ``np.load``.
+
+        Returns:
+            out (pd.DataFrame): the cached frame.
+        """
+        manifest = self.read_manifest()
+        if manifest is None or name not in manifest["frames"]:
+            raise KeyError(f"Frame {name} not found in {self.cache_dir}")
+        return self.__load_frame(manifest["frames"][name], mmap_mode)
+
+    def has_frame(self, name: str) -> bool:
+        """
+        Check whether a frame is stored in the cache.
+
+        Args:
+            name (str): the name of the frame.
+
+        Returns:
+            out (bool): whether the frame exists.
+        """
+        manifest = self.read_manifest()
+        return manifest is not None and name in manifest["frames"]
+
+    def has_array(self, name: str) -> bool:
+        """
+        Check whether a named array has been stored in the cache.
+
+        Args:
+            name (str): the name of the array.
+
+        Returns:
+            out (bool): whether the array exists.
+        """
+        manifest = self.read_manifest()
+        return manifest is not None and name in manifest.get("arrays", {})
+
+    def save_arrays(self, arrays: dict[str, np.ndarray]) -> None:
+        """
+        Add named arrays to an existing cache. Unlike frames, arrays are stored
+        as a single C-contiguous ``.npy`` file each, so that they can be
+        memory-mapped and sliced row by row.
+
+        Args:
+            arrays (dict[str, np.ndarray]): the arrays to store, keyed by name.
+        """
+        # the manifest is read, updated and written back under the lock, so that
+        # arrays stored at the same time by other processes are kept
+        with self.lock():
+            manifest = self.read_manifest()
+            if manifest is None:
+                raise FileNotFoundError(f"No dataset cache found in {self.cache_dir}")
+
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                file_name = f"{name}.array.npy"
+                path = os.path.join(self.cache_dir, file_name)
+                tmp_path = f"{path}.tmp-{os.getpid()}"
+                with open(tmp_path, "wb") as f:
+                    self.__save_array(f, array)
+                os.replace(tmp_path, path)
+                manifest.setdefault("arrays", {})[name] = {
+                    "file": file_name,
+                    "dtype": str(array.dtype),
+                    "shape": list(array.shape),
+                }
+            self.__write_manifest(manifest)
+
+    def load_array(self, name: str, mmap_mode: str | None = None) -> np.ndarray:
+        """
+        Load a named array from the cache.
+
+        Args:
+            name (str): the name of the array.
+            mmap_mode (str | None): the memory-map mode passed to ``np.load``.
+
+        Returns:
+            out (np.ndarray): the loaded (possibly memory-mapped) array.
+        """
+        manifest = self.read_manifest()
+        if manifest is None or name not in manifest.get("arrays", {}):
+            raise KeyError(f"Array {name} not found in {self.cache_dir}")
+        return self.__load_array(
+            os.path.join(self.cache_dir, manifest["arrays"][name]["file"]), mmap_mode
+        )
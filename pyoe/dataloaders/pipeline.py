@@ -3,8 +3,10 @@ import json
 import logging
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.impute import KNNImputer
 from sklearn.preprocessing import OneHotEncoder
+from .cache import DatasetCache
 
 
 def __schema_parser(path: str):
@@ -30,12 +32,54 @@ def __schema_parser(path: str):
     return data_path, schema_path, task
 
 
+def __knn_impute(
+    data: np.ndarray, window_size: int | None = None, n_jobs: int = 1
+) -> np.ndarray:
+    """
+    Fill the null values of the data with ``KNNImputer``. If a window size is
+    given, every window of consecutive rows is imputed on its own, so the cost
+    grows linearly with the row count, and windows are processed in parallel.
+
+    Args:
+        data (np.ndarray): the numeric data with null values.
+        window_size (int | None): the window size, or None to impute all rows at once.
+        n_jobs (int): the number of parallel jobs used for window imputation.
+
+    Returns:
+        out (np.ndarray): the data without null values.
+    """
+    if window_size is None:
+        imp = KNNImputer(n_neighbors=2, weights="uniform")
+        return imp.fit_transform(data)
+
+    def impute_window(window: np.ndarray) -> np.ndarray:
+        if not np.isnan(window).any():
+            return window
+        # columns missing in the whole window are filled with 0
+        imp = KNNImputer(n_neighbors=2, weights="uniform", keep_empty_features=True)
+        return imp.fit_transform(window)
+
+    windows = [
+        data[begin : begin + window_size]
+        for begin in range(0, data.shape[0], window_size)
+    ]
+    if n_jobs == 1:
+        results = [impute_window(window) for window in windows]
+    else:
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(impute_window)(window) for window in windows
+        )
+    return np.concatenate(results) if results else data.copy()
+
+
 def __data_preprocessing(
     dataset_path_prefix: str,
     data_path: str,
     schema_path: str,
     task: str,
     reload: bool = False,
+    imputation: str = "global",
+    n_jobs: int = 1,
 ):
     """
     Preprocess the data and return the target data, data before one hot encoding,
@@ -47,6 +91,10 @@ def __data_preprocessing(
         data_path (str): the path of the data file.
         schema_path (str): the path of the schema file.
         task (str): the task of the data.
+        reload (bool): whether to ignore the legacy processed csv file.
+        imputation (str): "global" to impute null values over all rows,
+            "window" to impute them window by window.
+        n_jobs (int): the number of parallel jobs used for window imputation.
 
     Returns:
         target_data_nonnull (pd.DataFrame): the target data without null values.
@@ -96,7 +144,8 @@ def __data_preprocessing(
     if not pd.api.types.is_datetime64_any_dtype(data[timestamp]):
         for col in timestamp:
             data[col] = pd.to_datetime(data[col], errors="ignore")
-    data = data.sort_values(timestamp, ascending=True)
+    # a stable sort keeps the order of the file for equal timestamps
+    data = data.sort_values(timestamp, ascending=True, kind="stable")
     logging.info("Sorting finished")
 
     # get the target data
@@ -137,10 +186,14 @@ def __data_preprocessing(
         raise ValueError(f"{task}: task not supported")
 
     logging.info("Start null values processing")
-    # check for the existence of the cache file
+    # check for the existence of the legacy csv file shipped with older archives
     whole_data_one_hot_path = dataset_path_prefix + "/onehot_nonnull.csv"
-    if os.path.exists(whole_data_one_hot_path) and reload is False:
-        logging.info("Loading the processed data from previouly saved file")
+    if (
+        os.path.exists(whole_data_one_hot_path)
+        and reload is False
+        and imputation == "global"
+    ):
+        logging.info("Loading the processed data from legacy csv file")
         # load the data from the file
         whole_data_one_hot = pd.read_csv(whole_data_one_hot_path, index_col=0)
         if task == "forecasting":
@@ -155,27 +208,34 @@ def __data_preprocessing(
     elif data_one_hot.isna().values.any():
         # join target columns to the one hot data
         logging.info("The dataset has null values")
-        data_one_hot[target] = target_data  # add target to one hot data
+        # add target to one hot data (the target may have been re-indexed)
+        data_one_hot[target] = target_data.to_numpy()
 
-        # use KNNImputer to fill the null values
-        imp = KNNImputer(n_neighbors=2, weights="uniform")
-        # drop the rows with null target
-        data_one_hot = data_one_hot.dropna(subset=(target + ["timestamp"]))
-        target_data, timestamp_data = data_one_hot[target], data_one_hot["timestamp"]
-        data_one_hot = data_one_hot.drop(target + ["timestamp"], axis=1)
+        # drop the rows with null target (and null timestamp for forecasting)
+        extra = ["timestamp"] if task == "forecasting" else []
+        data_one_hot = data_one_hot.dropna(subset=(target + extra))
+        target_data = data_one_hot[target]
+        if task == "forecasting":
+            timestamp_data = data_one_hot["timestamp"]
+        data_one_hot = data_one_hot.drop(target + extra, axis=1)
 
         # convert all columns to numeric
         non_numeric_columns = data_one_hot.select_dtypes(exclude=[np.number]).columns
         for col in non_numeric_columns:
             data_one_hot[col] = pd.to_numeric(data_one_hot[col], errors="coerce")
 
-        # inpute the null values
-        data_onehot_nonnull = imp.fit_transform(data_one_hot)
+        # use KNNImputer to fill the null values
+        data_onehot_nonnull = __knn_impute(
+            data_one_hot.to_numpy(dtype=float),
+            window_size if imputation == "window" else None,
+            n_jobs,
+        )
         data_onehot_nonnull = pd.DataFrame(data_onehot_nonnull, columns=new_columns)
         assert not data_onehot_nonnull.isnull().values.any()
 
-        # add the timestamp back to the data
-        data_onehot_nonnull["timestamp"] = timestamp_data.reset_index(drop=True)
+        if task == "forecasting":
+            # add the timestamp back to the data
+            data_onehot_nonnull["timestamp"] = timestamp_data.reset_index(drop=True)
     else:
         logging.info("The dataset has no null values")
         data_onehot_nonnull = data_one_hot
@@ -187,8 +247,6 @@ def __data_preprocessing(
         target_data.reset_index(drop=True),
     ]
     whole_data_one_hot = pd.concat(concat_data, axis=1)
-    # output the data without null values to a csv file
-    whole_data_one_hot.to_csv(whole_data_one_hot_path, mode="w")
 
     if task == "forecasting":
         logging.info("Start processing data for time series")
@@ -217,7 +275,265 @@ def __data_preprocessing(
     )
 
 
-def load_data(dataset_path: str, prefix: str = "", reload: bool = False):
+def __chunked_data_preprocessing(
+    cache: DatasetCache,
+    data_path: str,
+    schema_path: str,
+    task: str,
+    chunk_size: int,
+    n_jobs: int = 1,
+) -> None:
+    """
+    Preprocess the data in row blocks and write the result straight into the
+    dataset cache, so that peak memory depends on the chunk size and the window
+    size rather than on the file size. The raw file is streamed twice: a first
+    lightweight pass over the target, timestamp and categorical columns learns
+    the sort order, the target classes and the one hot vocabulary, then a second
+    pass encodes every block into its sorted position in the cache. Null values
+    are imputed with ``KNNImputer`` window by window.
+
+    Args:
+        cache (DatasetCache): the cache to write the processed data to.
+        data_path (str): the path of the data file.
+        schema_path (str): the path of the schema file.
+        task (str): the task of the data.
+        chunk_size (int): the number of rows read at a time.
+        n_jobs (int): the number of parallel jobs used for window imputation.
+    """
+    # open the schema.json file
+    with open(schema_path, "r") as f:
+        schema: dict = json.load(f)
+        categorical = schema["categorical"]
+        target = schema["target"]
+        timestamp = schema["timestamp"]
+        unnecessary = schema["unnecessary"]
+        window_size = schema["window size"]
+        replace_with_null = schema.get("replace_with_null", [])
+
+    if not data_path.endswith(".csv"):
+        logging.error(f'Chunked ingestion does not support data file "{data_path}"')
+        raise ValueError(f"{data_path}: data format not supported in chunks")
+    if task not in ("classification", "regression"):
+        logging.error(f"Task {task} is not supported in chunked ingestion")
+        raise ValueError(f"{task}: task not supported in chunks")
+
+    # the first pass only reads the columns needed for the sort and the vocabulary
+    logging.info("Start the first pass over the data")
+    row_ids, timestamps, targets = [], [], []
+    uniques = {col: [] for col in categorical}
+    row_count = 0
+    for chunk in pd.read_csv(
+        data_path,
+        usecols=list(dict.fromkeys(target + timestamp + categorical)),
+        chunksize=chunk_size,
+    ):
+        chunk.index = pd.RangeIndex(row_count, row_count + chunk.shape[0])
+        row_count += chunk.shape[0]
+        for value in replace_with_null:
+            chunk = chunk.replace(value, np.nan)
+        chunk = chunk.dropna(subset=target)
+
+        row_ids.append(chunk.index.to_numpy())
+        timestamps.append(chunk[timestamp])
+        targets.append(chunk[target[0]])
+        for col in categorical:
+            uniques[col].append(pd.Series(chunk[col].dropna().unique()))
+
+    if sum(chunk.shape[0] for chunk in targets) == 0:
+        logging.error(f'The data file "{data_path}" has no rows with a target')
+        raise ValueError(f"{data_path}: no rows with a target")
+
+    # sort the rows by timestamp (ties keep the order of the file)
+    logging.info("Start to sort the data by timestamp")
+    timestamp_data = pd.concat(timestamps)
+    for col in timestamp:
+        try:
+            timestamp_data[col] = pd.to_datetime(timestamp_data[col])
+        except (ValueError, TypeError):
+            pass
+    order = timestamp_data.sort_values(timestamp, kind="stable").index.to_numpy()
+    row_count_nonnull = order.shape[0]
+    position = np.full(row_count, -1, dtype=np.int64)
+    position[order] = np.arange(row_count_nonnull)
+    del timestamps, timestamp_data, row_ids
+    logging.info("Sorting finished")
+
+    # the categories of each column, sorted like ``pd.get_dummies`` does
+    vocabulary = {
+        col: pd.Categorical(pd.concat(uniques[col], ignore_index=True)).categories
+        for col in categorical
+    }
+
+    # encode the target in sorted order
+    cache.begin()
+    target_data = pd.concat(targets).loc[order].to_numpy()
+    del targets
+    if task == "classification":
+        # classes are numbered by their first appearance, like ``pd.factorize``
+        codes = pd.factorize(target_data)[0]
+        target_columns = [f"{target[0]}_{i}" for i in range(codes.max() + 1)]
+        target_array = cache.create_frame("target", target_columns, row_count_nonnull)
+        target_array[np.arange(row_count_nonnull), codes] = 1.0
+    else:
+        target_array = cache.create_frame("target", target, row_count_nonnull)
+        target_array[:, 0] = pd.to_numeric(target_data, errors="coerce")
+    target_array.flush()
+    del target_data
+
+    # the second pass encodes all the features block by block
+    logging.info("Start the second pass over the data")
+    data_one_hot = None
+    missing_row_count = 0
+    start = 0
+    for chunk in pd.read_csv(data_path, chunksize=chunk_size):
+        chunk.index = pd.RangeIndex(start, start + chunk.shape[0])
+        start += chunk.shape[0]
+        missing_row_count += chunk.isna().any(axis=1).sum()
+        for value in replace_with_null:
+            chunk = chunk.replace(value, np.nan)
+
+        # keep the rows with a target and find their sorted positions
+        rows = position[chunk.index.to_numpy()]
+        chunk = chunk[rows >= 0]
+        rows = rows[rows >= 0]
+
+        # one hot encoding with the vocabulary learned in the first pass
+        chunk = chunk.drop(unnecessary + timestamp + target, axis=1)
+        for col in categorical:
+            chunk[col] = pd.Categorical(chunk[col], categories=vocabulary[col])
+        chunk = pd.get_dummies(chunk, columns=categorical)
+        chunk = chunk.apply(pd.to_numeric, errors="coerce")
+
+        if data_one_hot is None:
+            new_columns = chunk.columns.tolist()
+            logging.info(f"Columns after one hot encoding: {new_columns}")
+            data_one_hot = cache.create_frame("onehot", new_columns, row_count_nonnull)
+        data_one_hot[rows] = chunk.to_numpy(dtype=float)
+    data_one_hot.flush()
+
+    # impute the null values window by window
+    logging.info("Start null values processing")
+    data_onehot_nonnull = cache.create_frame(
+        "onehot_nonnull", new_columns, row_count_nonnull
+    )
+    # blocks are whole windows so that the result does not depend on the block size
+    block_size = window_size * max(chunk_size // window_size, 1)
+    for begin in range(0, row_count_nonnull, block_size):
+        block = np.array(data_one_hot[begin : begin + block_size])
+        data_onehot_nonnull[begin : begin + block_size] = __knn_impute(
+            block, window_size, n_jobs
+        )
+    data_onehot_nonnull.flush()
+    logging.info("Null values processing finished")
+
+    # the encoded blocks double as the arrays used by ``Dataloader``
+    cache.alias_array("data", "onehot")
+    cache.alias_array("target", "target")
+    cache.commit(
+        {
+            "task": task,
+            "window_size": window_size,
+            "missing_ratio": missing_row_count / row_count,
+        }
+    )
+
+
+def get_cache_options(
+    chunk_size: int | None = None, imputation: str | None = None
+) -> dict:
+    """
+    Return the preprocessing options which key the cache of a dataset. Chunked
+    and in-memory ingestion give the same data, so only the imputation matters.
+
+    Args:
+        chunk_size (int | None): the chunk size the dataset is ingested with.
+        imputation (str | None): the imputation the dataset is preprocessed with
+            (see ``load_data``).
+
+    Returns:
+        out (dict): the options of the cache.
+    """
+    if imputation is None:
+        imputation = "window" if chunk_size is not None else "global"
+    return {"imputation": imputation}
+
+
+def get_dataset_cache(
+    dataset_path: str, prefix: str = "", options: dict | None = None
+) -> DatasetCache:
+    """
+    Return the binary cache of a dataset. The cache is keyed by the info file,
+    the schema file and the raw data file of the dataset.
+
+    Args:
+        dataset_path (str): the path of the dataset folder.
+        prefix (str): the prefix of the dataset path.
+        options (dict | None): preprocessing options that also key the cache.
+
+    Returns:
+        out (DatasetCache): the cache of the dataset.
+    """
+    data_path, schema_path, _ = __schema_parser(prefix + dataset_path)
+    return DatasetCache(
+        prefix + dataset_path,
+        [prefix + dataset_path + "/info.json", schema_path, prefix + data_path],
+        options,
+    )
+
+
+def load_cached_arrays(
+    dataset_path: str,
+    prefix: str = "",
+    mmap_mode: str | None = None,
+    chunk_size: int | None = None,
+    imputation: str | None = None,
+) -> tuple[np.ndarray, np.ndarray, dict] | None:
+    """
+    Load only the float64 data and target arrays of a dataset from its binary
+    cache, without loading any of the cached frames.
+
+    Args:
+        dataset_path (str): the path of the dataset folder.
+        prefix (str): the prefix of the dataset path.
+        mmap_mode (str | None): if set, the arrays are memory-mapped with this mode
+            (see ``np.load``) instead of read into memory.
+        chunk_size (int | None): the chunk size the dataset is ingested with.
+        imputation (str | None): the imputation the dataset is preprocessed with
+            (see ``load_data``).
+
+    Returns:
+        out (tuple | None): the data, the target and the cached metadata (task,
+            window size and missing ratio), or ``None`` if the dataset has no valid
+            cache with these arrays yet.
+    """
+    cache = get_dataset_cache(
+        dataset_path, prefix, get_cache_options(chunk_size, imputation)
+    )
+    if not (
+        cache.is_valid() and cache.has_array("data") and cache.has_array("target")
+    ):
+        return None
+    try:
+        data = cache.load_array("data", mmap_mode)
+        target = cache.load_array("target", mmap_mode)
+    except (OSError, KeyError) as e:
+        # e.g. the cache has been replaced meanwhile
+        logging.warning(f'Dataset cache not usable due to "{e}"')
+        return None
+    logging.info(f"Data for {dataset_path} has been loaded from cache")
+    return data, target, cache.read_manifest()["meta"]
+
+
+def load_data(
+    dataset_path: str,
+    prefix: str = "",
+    reload: bool = False,
+    mmap_mode: str | None = None,
+    chunk_size: int | None = None,
+    imputation: str | None = None,
+    n_jobs: int = 1,
+    load_raw: bool = False,
+):
     """
     Load the data and return the target data, data before one hot encoding,
     data after one hot encoding, window size, output dimension, data one hot,
@@ -226,10 +542,24 @@ def load_data(dataset_path: str, prefix: str = "", reload: bool = False):
     Args:
         dataset_path (str): the path of the dataset folder.
         prefix (str): the prefix of the dataset path.
+        reload (bool): whether to ignore the cache and process the raw data again.
+        mmap_mode (str | None): if set, numeric data loaded from the cache is
+            memory-mapped with this mode (see ``np.load``) instead of read into memory.
+        chunk_size (int | None): if set, the raw data is streamed into the cache in
+            blocks of this many rows instead of being processed in memory at once.
+        imputation (str | None): "global" to impute null values with ``KNNImputer``
+            over all rows, "window" to impute them window by window (the window size
+            comes from the schema). Defaults to "window" in chunks, else "global".
+        n_jobs (int): the number of parallel jobs used for window imputation.
+        load_raw (bool): whether to load the data before one hot encoding from the
+            cache. Its missing ratio is stored in the cache metadata, so it is
+            rarely needed.
 
     Returns:
         target_data_nonnull (pd.DataFrame): the target data without null values.
-        data_before_onehot (pd.DataFrame): the data before one hot encoding.
+        data_before_onehot (pd.DataFrame | None): the data before one hot encoding
+            (``None`` if it has been loaded from the cache without ``load_raw``,
+            or if the data has been ingested in chunks).
         data_one_hot (pd.DataFrame): the data after one hot encoding.
         data_onehot_nonnull (pd.DataFrame): the data after one hot encoding without null values.
         window_size (int): the window size.
@@ -243,26 +573,86 @@ def load_data(dataset_path: str, prefix: str = "", reload: bool = False):
     data_path, schema_path, task = __schema_parser(prefix + dataset_path)
     data_path = prefix + data_path
 
-    logging.info(f"Start data pre-processing for {dataset_path}")
-    (
-        target_data_nonnull,
-        data_before_onehot,
-        data_one_hot,
-        data_onehot_nonnull,
-        original_columns,
-        window_size,
-        row_count,
-        original_column_count,
-        new_columns,
-        new_column_count,
-    ) = __data_preprocessing(
-        prefix + dataset_path,
-        data_path,
-        schema_path,
-        task,
-        reload,
-    )
-    logging.info(f"Data preprocessing for {dataset_path} has been done")
+    options = get_cache_options(chunk_size, imputation)
+    imputation = options["imputation"]
+    if imputation not in ("global", "window"):
+        logging.error(f"Imputation {imputation} is not supported")
+        raise ValueError(f"Imputation {imputation} is not supported.")
+    if imputation == "global" and chunk_size is not None:
+        logging.error("Global imputation is not supported in chunked ingestion")
+        raise ValueError("Global imputation is not supported in chunks.")
+
+    # the binary cache is keyed by the info, schema and raw data files
+    cache = get_dataset_cache(dataset_path, prefix, options)
+    from_cache = reload is False and cache.is_valid()
+
+    if not from_cache and chunk_size is not None:
+        # stream the raw data into the cache, it is loaded from there below
+        logging.info(f"Start chunked data pre-processing for {dataset_path}")
+        __chunked_data_preprocessing(
+            cache, data_path, schema_path, task, chunk_size, n_jobs
+        )
+        logging.info(f"Data preprocessing for {dataset_path} has been done")
+        from_cache = True
+
+    if from_cache:
+        # load the processed frames from the binary cache, the raw data is an
+        # object frame which is slow to unpickle, so only on demand
+        names = ["target", "onehot", "onehot_nonnull"]
+        if load_raw:
+            names.append("before_onehot")
+        frames, meta = cache.load(mmap_mode, names)
+        target_data_nonnull = frames["target"]
+        data_before_onehot = frames.get("before_onehot")
+        data_one_hot = frames["onehot"]
+        data_onehot_nonnull = frames["onehot_nonnull"]
+        window_size = meta["window_size"]
+        logging.info(f"Data for {dataset_path} has been loaded from cache")
+    else:
+        logging.info(f"Start data pre-processing for {dataset_path}")
+        (
+            target_data_nonnull,
+            data_before_onehot,
+            data_one_hot,
+            data_onehot_nonnull,
+            original_columns,
+            window_size,
+            row_count,
+            original_column_count,
+            new_columns,
+            new_column_count,
+        ) = __data_preprocessing(
+            prefix + dataset_path,
+            data_path,
+            schema_path,
+            task,
+            reload,
+            imputation,
+            n_jobs,
+        )
+        logging.info(f"Data preprocessing for {dataset_path} has been done")
+
+        # write the processed frames to the binary cache only once
+        try:
+            cache.save(
+                {
+                    "target": target_data_nonnull,
+                    "before_onehot": data_before_onehot,
+                    "onehot": data_one_hot,
+                    "onehot_nonnull": data_onehot_nonnull,
+                },
+                {
+                    "task": task,
+                    "window_size": window_size,
+                    # rows with any null value, as in the chunked ingestion
+                    "missing_ratio": float(
+                        data_before_onehot.isna().any(axis=1).sum()
+                        / data_before_onehot.shape[0]
+                    ),
+                },
+            )
+        except OSError as e:
+            logging.warning(f"Failed to write the dataset cache due to \"{e}\"")
 
     # output the data info
     output_dim = len(target_data_nonnull.columns)
@@ -0,0 +1,502 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import zipfile
+import urllib.error
+import urllib.request
+from typing import Callable
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# where the datasets are downloaded from, can be overridden by ``PYOE_DATASET_URL``
+DEFAULT_DATASET_URL = "http://137.132.83.144/yiqun/"
+# the store shared by all jobs, can be overridden by ``PYOE_STORE_DIR``
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pyoe")
+# size of the blocks read while downloading and hashing
+BLOCK_SIZE = 1024 * 1024
+# the digest manifest served next to the archives, in ``sha256sum`` format
+CHECKSUMS_FILE = "SHA256SUMS"
+
+
+def get_dataset_url(archive: str) -> str:
+    """
+    Return the download url of a dataset archive.
+
+    Args:
+        archive (str): the file name of the archive.
+
+    Returns:
+        out (str): the url of the archive.
+    """
+    base_url = os.environ.get("PYOE_DATASET_URL", DEFAULT_DATASET_URL)
+    return base_url.rstrip("/") + "/" + archive
+
+
+@lru_cache(maxsize=None)
+def __read_checksums(url: str) -> dict[str, str]:
+    """
+    Download and parse a digest manifest, once per process.
+
+    Args:
+        url (str): the url of the manifest.
+
+    Returns:
+        out (dict[str, str]): the sha256 digests keyed by file name, empty if the
+            manifest is not available.
+    """
+    try:
+        with urllib.request.urlopen(url) as response:
+            lines = response.read().decode().splitlines()
+    except (urllib.error.URLError, OSError) as e:
+        logging.warning(f'Failed to read the digest manifest {url} due to "{e}"')
+        return {}
+    checksums = {}
+    for line in lines:
+        parts = line.split(maxsplit=1)
+        if len(parts) == 2:
+            # binary mode entries are prefixed with "*"
+            checksums[parts[1].strip().lstrip("*")] = parts[0].lower()
+    return checksums
+
+
+def get_dataset_checksum(archive: str) -> str | None:
+    """
+    Return the expected sha256 digest of a dataset archive, as listed in the
+    ``SHA256SUMS`` manifest served next to the archives.
+
+    Args:
+        archive (str): the file name of the archive.
+
+    Returns:
+        out (str | None): the digest, or None if the manifest does not list it.
+    """
+    checksum = __read_checksums(get_dataset_url(CHECKSUMS_FILE)).get(archive)
+    if checksum is None:
+        logging.warning(
+            f"No digest is listed for {archive}, only its zip checksums are verified"
+        )
+    return checksum
+
+
+class FileLock:
+    """
+    An exclusive inter-process lock held on a file. The lock is released by the
+    operating system if the holding process dies, so it never goes stale.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): the path of the lock file.
+        """
+        self.path = path
+        self.file = None
+
+    def __enter__(self) -> "FileLock":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *args) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class DownloadProgress:
+    """
+    The progress of fetching a single archive, updated while it is running.
+    """
+
+    def __init__(self, url: str):
+        """
+        Args:
+            url (str): the url of the archive.
+        """
+        self.url = url
+        # one of "pending", "downloading", "extracting", "done" and "failed"
+        self.state = "pending"
+        self.total_bytes: int | None = None
+        self.downloaded_bytes = 0
+        # bytes of an interrupted download that were reused
+        self.resumed_bytes = 0
+        self.start_time: float | None = None
+        self.end_time: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The seconds spent so far.
+        """
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    @property
+    def speed(self) -> float:
+        """
+        The download speed in bytes per second, without the resumed bytes.
+        """
+        elapsed = self.elapsed
+        transferred = self.downloaded_bytes - self.resumed_bytes
+        return transferred / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> float | None:
+        """
+        The downloaded fraction of the archive, or None if its size is unknown.
+        """
+        if not self.total_bytes:
+            return None
+        return self.downloaded_bytes / self.total_bytes
+
+    def __repr__(self) -> str:
+        return (
+            f"DownloadProgress(url={self.url!r}, state={self.state!r}, "
+            f"downloaded_bytes={self.downloaded_bytes}, total_bytes={self.total_bytes})"
+        )
+
+
+class DatasetStore:
+    """
+    A content-addressed local store for dataset archives, shared by all jobs.
+    Every archive is downloaded once into ``objects/<sha256>`` and the url is
+    mapped to its digest in ``refs``. Downloads and extractions are serialized
+    by file locks and published by atomic renames, so concurrent jobs never see
+    a partial archive or a partially extracted dataset. Archives are checked
+    against their expected digest (see ``get_dataset_checksum``) and against the
+    checksums of their zip members, so corrupted archives are never extracted.
+
+    Interrupted downloads are resumed with HTTP range requests, independent
+    archives are fetched in parallel with ``extract_all``, and the progress of
+    every archive is available in ``progress`` (and reported to a callback).
+    """
+
+    def __init__(
+        self,
+        root: str | None = None,
+        progress_callback: Callable[[DownloadProgress], None] | None = None,
+    ):
+        """
+        Args:
+            root (str | None): the folder of the store. Defaults to ``PYOE_STORE_DIR``
+                or ``~/.cache/pyoe``.
+            progress_callback (Callable[[DownloadProgress], None] | None): called
+                whenever the progress of an archive changes.
+        """
+        self.root = root or os.environ.get("PYOE_STORE_DIR", DEFAULT_STORE_DIR)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.refs_dir = os.path.join(self.root, "refs")
+        self.locks_dir = os.path.join(self.root, "locks")
+        self.progress: dict[str, DownloadProgress] = {}
+        self.progress_callback = progress_callback
+
+    def __report(self, progress: DownloadProgress, state: str | None = None) -> None:
+        """
+        Update the state of a progress and report it to the callback.
+
+        Args:
+            progress (DownloadProgress): the progress to report.
+            state (str | None): the new state, if it changes.
+        """
+        if state is not None:
+            progress.state = state
+            if state in ("done", "failed"):
+                progress.end_time = time.perf_counter()
+        if self.progress_callback is not None:
+            self.progress_callback(progress)
+
+    @staticmethod
+    def __url_key(url: str) -> str:
+        """
+        Return the file name used for the ref and the lock of an url.
+
+        Args:
+            url (str): the url of the archive.
+
+        Returns:
+            out (str): the key of the url.
+        """
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    @staticmethod
+    def file_digest(path: str) -> str:
+        """
+        Compute the sha256 digest of a file.
+
+        Args:
+            path (str): the path of the file.
+
+        Returns:
+            out (str): the hex digest.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(BLOCK_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def __read_ref(self, url: str) -> dict | None:
+        """
+        Read the ref of an url, or None if the url has not been downloaded yet.
+
+        Args:
+            url (str): the url of the archive.
+
+        Returns:
+            out (dict | None): the ref with the url, digest and size of the archive.
+        """
+        try:
+            with open(os.path.join(self.refs_dir, self.__url_key(url) + ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def __write_ref(self, url: str, digest: str, size: int) -> None:
+        """
+        Atomically map an url to the digest of its archive.
+
+        Args:
+            url (str): the url of the archive.
+            digest (str): the sha256 digest of the archive.
+            size (int): the size of the archive.
+        """
+        os.makedirs(self.refs_dir, exist_ok=True)
+        path = os.path.join(self.refs_dir, self.__url_key(url) + ".json")
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump({"url": url, "sha256": digest, "size": size}, f)
+        os.replace(tmp_path, path)
+
+    def __download(self, url: str, progress: DownloadProgress) -> tuple[str, str]:
+        """
+        Download an url into a partial file of the store, hashing it on the fly.
+        If a previous download of the url was interrupted, only the missing bytes
+        are requested. The partial file is kept on errors so that it can be resumed.
+
+        Args:
+            url (str): the url of the archive.
+            progress (DownloadProgress): the progress to update.
+
+        Returns:
+            path (str): the path of the downloaded file.
+            digest (str): the sha256 digest of the file.
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # only the holder of the url lock writes this file
+        part_path = os.path.join(self.objects_dir, f"{self.__url_key(url)}.part")
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        headers = {"Range": f"bytes={offset}-"} if offset > 0 else {}
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or offset == 0:
+                raise
+            # the partial file does not match the archive any more, start over
+            os.remove(part_path)
+            return self.__download(url, progress)
+
+        with response:
+            if offset > 0 and response.status != 206:
+                # the server ignored the range, start over
+                logging.info(f"Server does not support resuming {url}")
+                offset = 0
+            length = response.headers.get("Content-Length")
+            progress.total_bytes = offset + int(length) if length else None
+            progress.downloaded_bytes = progress.resumed_bytes = offset
+
+            digest = hashlib.sha256()
+            if offset > 0:
+                logging.info(f"Resuming the download of {url} from byte {offset}")
+                with open(part_path, "rb") as f:
+                    while block := f.read(BLOCK_SIZE):
+                        digest.update(block)
+            with open(part_path, "ab" if offset > 0 else "wb") as f:
+                while block := response.read(BLOCK_SIZE):
+                    digest.update(block)
+                    f.write(block)
+                    progress.downloaded_bytes += len(block)
+                    self.__report(progress)
+
+        # the connection may be closed early without an error
+        if progress.total_bytes and progress.downloaded_bytes < progress.total_bytes:
+            raise urllib.error.ContentTooShortError(
+                f"{url}: got {progress.downloaded_bytes} of "
+                f"{progress.total_bytes} bytes, the download can be resumed",
+                None,
+            )
+        return part_path, digest.hexdigest()
+
+    def fetch(self, url: str, checksum: str | None = None) -> str:
+        """
+        Return the local path of an archive, downloading it only if the store
+        does not hold it yet.
+
+        Args:
+            url (str): the url of the archive.
+            checksum (str | None): the expected sha256 digest of the archive.
+
+        Returns:
+            out (str): the path of the archive in the store.
+        """
+        with FileLock(os.path.join(self.locks_dir, self.__url_key(url) + ".lock")):
+            ref = self.__read_ref(url)
+            if ref is not None and (checksum is None or ref["sha256"] == checksum):
+                path = os.path.join(self.objects_dir, ref["sha256"])
+                if os.path.exists(path) and os.path.getsize(path) == ref["size"]:
+                    logging.info(f"Found {url} in the dataset store")
+                    return path
+
+            logging.info(f"Start to download {url}")
+            progress = self.progress.setdefault(url, DownloadProgress(url))
+            progress.start_time = progress.start_time or time.perf_counter()
+            self.__report(progress, "downloading")
+            tmp_path, digest = self.__download(url, progress)
+            if checksum is not None and digest != checksum:
+                os.remove(tmp_path)
+                logging.error(f"Checksum mismatch for {url}")
+                raise ValueError(f"{url}: checksum mismatch.")
+            path = os.path.join(self.objects_dir, digest)
+            os.replace(tmp_path, path)
+            self.__write_ref(url, digest, os.path.getsize(path))
+            logging.info(
+                f"Downloading finished! ({progress.downloaded_bytes} bytes "
+                f"in {progress.elapsed:.1f}s)"
+            )
+            return path
+
+    def extract(
+        self,
+        url: str,
+        out_dir: str,
+        members: list[str],
+        checksum: str | None = None,
+    ) -> None:
+        """
+        Extract an archive into a folder exactly once. The archive is unpacked
+        into a temporary folder, verified, and its top-level entries are renamed
+        into place, so the ``members`` appear either complete or not at all.
+
+        Args:
+            url (str): the url of the archive.
+            out_dir (str): the folder to extract the archive to.
+            members (list[str]): the top-level entries that the archive provides.
+            checksum (str | None): the expected sha256 digest of the archive.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        lock_key = self.__url_key(url + "\n" + os.path.abspath(out_dir))
+        progress = self.progress.setdefault(url, DownloadProgress(url))
+        progress.start_time, progress.end_time = time.perf_counter(), None
+
+        try:
+            with FileLock(os.path.join(self.locks_dir, lock_key + ".lock")):
+                self.__extract(url, out_dir, members, checksum, lock_key, progress)
+        except BaseException:
+            self.__report(progress, "failed")
+            raise
+        self.__report(progress, "done")
+
+    def __extract(
+        self,
+        url: str,
+        out_dir: str,
+        members: list[str],
+        checksum: str | None,
+        lock_key: str,
+        progress: DownloadProgress,
+    ) -> None:
+        """
+        Extract an archive into a folder while holding the extraction lock.
+
+        Args:
+            url (str): the url of the archive.
+            out_dir (str): the folder to extract the archive to.
+            members (list[str]): the top-level entries that the archive provides.
+            checksum (str | None): the expected sha256 digest of the archive.
+            lock_key (str): the key of the extraction lock.
+            progress (DownloadProgress): the progress to update.
+        """
+        # another job may have extracted the archive while we were waiting
+        if all(os.path.exists(os.path.join(out_dir, m)) for m in members):
+            logging.info(f"Found the extracted archive {url} in {out_dir}")
+            return
+
+        archive_path = self.fetch(url, checksum)
+        # the archive is addressed by its digest, check that it is intact
+        digest = self.file_digest(archive_path)
+        if digest != os.path.basename(archive_path):
+            os.remove(archive_path)
+            logging.error(f"The archive of {url} in the store is corrupted")
+            raise ValueError(f"{url}: checksum mismatch.")
+
+        logging.info(f"Start to unzip {url} to {out_dir}")
+        self.__report(progress, "extracting")
+        tmp_dir = os.path.join(out_dir, f".tmp-extract-{lock_key}-{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        try:
+            try:
+                with zipfile.ZipFile(archive_path) as archive:
+                    archive.extractall(tmp_dir)
+            except zipfile.BadZipFile:
+                # drop the archive so that it is downloaded again next time
+                os.remove(archive_path)
+                raise
+            for entry in os.listdir(tmp_dir):
+                # existing entries are kept untouched
+                target = os.path.join(out_dir, entry)
+                if not os.path.exists(target):
+                    os.replace(os.path.join(tmp_dir, entry), target)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logging.info("Unzipping finished!")
+
+    def extract_all(
+        self,
+        archives: dict[str, list[str]],
+        out_dir: str,
+        n_jobs: int | None = None,
+        checksums: dict[str, str | None] | None = None,
+    ) -> None:
+        """
+        Fetch and extract independent archives in parallel, so that one archive
+        is extracted while the others are still downloading.
+
+        Args:
+            archives (dict[str, list[str]]): the top-level entries of each archive,
+                keyed by url.
+            out_dir (str): the folder to extract the archives to.
+            n_jobs (int | None): the number of parallel downloads, one per archive
+                by default.
+            checksums (dict[str, str | None] | None): the expected sha256 digests
+                of the archives, keyed by url.
+        """
+        checksums = checksums or {}
+        with ThreadPoolExecutor(max_workers=n_jobs or len(archives)) as executor:
+            futures = [
+                executor.submit(
+                    self.extract, url, out_dir, members, checksums.get(url)
+                )
+                for url, members in archives.items()
+            ]
+            for future in futures:
+                future.result()
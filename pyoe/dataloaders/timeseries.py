@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from typing import TYPE_CHECKING
+
+# autogluon is heavy to import, so it is imported on the first conversion
+if TYPE_CHECKING:
+    from autogluon.timeseries import TimeSeriesDataFrame
+
+
+class TimeSeriesArray:
+    """
+    Array storage for a single time series. The numeric columns are held as one
+    contiguous float64 matrix and the target as a contiguous array, both aligned
+    with a sorted timestamp index, so that a row or a range of rows is a plain
+    array view. The ``TimeSeriesDataFrame`` needed by autogluon is built once
+    and cached.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        columns: list[str],
+        target: np.ndarray,
+        timestamps: np.ndarray | None = None,
+        item_id: int = 0,
+    ):
+        """
+        Args:
+            values (np.ndarray): the numeric data of shape (num_samples, num_columns).
+            columns (list[str]): the names of the data columns.
+            target (np.ndarray): the target of shape (num_samples,) or
+                (num_samples, output_dim).
+            timestamps (np.ndarray | None): the timestamps of the samples.
+            item_id (int): the id of the time series.
+        """
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.columns = list(columns)
+        self.target = np.ascontiguousarray(target, dtype=np.float64)
+        self.timestamps = (
+            None if timestamps is None else np.asarray(timestamps, "datetime64[ns]")
+        )
+        self.item_id = item_id
+        self.__time_series_frame = None
+
+    @classmethod
+    def from_frames(cls, data: pd.DataFrame, target: pd.DataFrame) -> "TimeSeriesArray":
+        """
+        Build the arrays from the data and target frames of a time series dataset.
+
+        Args:
+            data (pd.DataFrame): the data, with an optional ``item_id`` column.
+            target (pd.DataFrame): the target, with optional ``timestamp`` and
+                ``item_id`` columns. If there is a ``target`` column, it is the target.
+
+        Returns:
+            out (TimeSeriesArray): the time series.
+        """
+        data = data.drop(columns=["item_id"], errors="ignore")
+        timestamps = target["timestamp"] if "timestamp" in target else None
+        if "target" in target:
+            target_values = target["target"]
+        else:
+            target_values = target.drop(columns=["timestamp", "item_id"], errors="ignore")
+        return cls(
+            data.to_numpy(dtype=np.float64),
+            data.columns.tolist(),
+            target_values.to_numpy(dtype=np.float64),
+            None if timestamps is None else timestamps.to_numpy(),
+        )
+
+    def __len__(self) -> int:
+        """
+        Return the number of samples.
+
+        Returns:
+            out (int): the number of samples.
+        """
+        return self.values.shape[0]
+
+    def __getitem__(self, idx) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the data and target of a row or a range of rows.
+
+        Args:
+            idx (int | slice | Sequence[int]): the index or the indices.
+
+        Returns:
+            data (np.ndarray): the data (a view for an index or a slice).
+            target (np.ndarray): the target (a view for an index or a slice).
+        """
+        return self.values[idx], self.target[idx]
+
+    def index_of(self, timestamp) -> int:
+        """
+        Return the position of the first sample at or after a timestamp.
+
+        Args:
+            timestamp: anything that ``np.datetime64`` accepts.
+
+        Returns:
+            out (int): the position of the sample.
+        """
+        if self.timestamps is None:
+            raise ValueError("Time series has no timestamps.")
+        return int(np.searchsorted(self.timestamps, np.datetime64(timestamp, "ns")))
+
+    def to_data_frame(self) -> pd.DataFrame:
+        """
+        Return the data as a frame with an ``item_id`` column.
+
+        Returns:
+            out (pd.DataFrame): the data frame.
+        """
+        data = pd.DataFrame(self.values, columns=self.columns)
+        data["item_id"] = self.item_id
+        return data
+
+    def to_target_frame(self) -> pd.DataFrame:
+        """
+        Return the target as a frame with ``timestamp``, ``target`` and ``item_id``
+        columns (or one column per target dimension if the target is not 1D).
+
+        Returns:
+            out (pd.DataFrame): the target frame.
+        """
+        if self.target.ndim == 1:
+            target = pd.DataFrame({"target": self.target})
+        else:
+            target = pd.DataFrame(self.target)
+        if self.timestamps is not None:
+            target.insert(0, "timestamp", self.timestamps)
+        target["item_id"] = self.item_id
+        return target
+
+    def to_time_series_frame(self, stop: int | None = None) -> "TimeSeriesDataFrame":
+        """
+        Return the time series as an autogluon ``TimeSeriesDataFrame``. The frame
+        is built on the first call only.
+
+        Args:
+            stop (int | None): if set, only the first ``stop`` time steps are kept.
+
+        Returns:
+            out (TimeSeriesDataFrame): the time series frame.
+        """
+        if self.__time_series_frame is None:
+            from autogluon.timeseries import TimeSeriesDataFrame
+
+            self.__time_series_frame = TimeSeriesDataFrame(
+                self.to_target_frame(), self.to_data_frame()
+            )
+        if stop is None:
+            return self.__time_series_frame
+        return self.__time_series_frame.slice_by_timestep(None, stop)
@@ -0,0 +1,122 @@
+import torch
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .base import Dataloader
+
+
+def sliding_windows(
+    data: torch.Tensor | np.ndarray, window_size: int, step: int = 1
+) -> torch.Tensor | np.ndarray:
+    """
+    Return all the full windows of the data along the first axis as a strided
+    view of shape (num_windows, window_size, ...). No data is copied.
+
+    Args:
+        data (torch.Tensor | np.ndarray): the data to split into windows.
+        window_size (int): the number of samples in a window.
+        step (int): the number of samples between the starts of two windows.
+
+    Returns:
+        out (torch.Tensor | np.ndarray): the view of the windows.
+    """
+    if isinstance(data, torch.Tensor):
+        # ``unfold`` appends the window dimension, move it next to the windows
+        return data.unfold(0, window_size, step).movedim(-1, 1)
+    return np.moveaxis(sliding_window_view(data, window_size, axis=0), -1, 1)[::step]
+
+
+class WindowedDataloader:
+    """
+    Iterate over a dataset window by window, as done by window-based continual
+    learning. Each window is a view of the data, the target and (optionally)
+    the outlier labels of the dataset, so no memory is allocated per window.
+    By default, windows do not overlap and their size comes from the schema
+    of the dataset.
+    """
+
+    def __init__(
+        self,
+        dataloader: Dataloader,
+        window_size: int | None = None,
+        step: int | None = None,
+        drop_last: bool = False,
+        return_outlier_label: bool = False,
+    ):
+        """
+        Args:
+            dataloader (Dataloader): the dataloader object that contains the dataset.
+            window_size (int | None): the number of samples in a window. Defaults to
+                the window size of the dataset.
+            step (int | None): the number of samples between the starts of two
+                windows. Defaults to ``window_size``.
+            drop_last (bool): whether to drop the last windows if they are incomplete.
+            return_outlier_label (bool): whether to return the outlier labels.
+        """
+        window_size = window_size or dataloader.get_window_size()
+        if window_size is None:
+            raise ValueError("Window size is not specified.")
+        self.dataloader = dataloader
+        self.window_size = window_size
+        self.step = step or window_size
+        self.drop_last = drop_last
+        self.return_outlier_label = return_outlier_label
+
+    def __len__(self) -> int:
+        """
+        Return the number of windows.
+
+        Returns:
+            out (int): the number of windows.
+        """
+        num_samples = len(self.dataloader)
+        if self.drop_last:
+            return max((num_samples - self.window_size) // self.step + 1, 0)
+        return (num_samples + self.step - 1) // self.step
+
+    def __getitem__(self, index: int) -> tuple:
+        """
+        Return the window at the given index.
+
+        Args:
+            index (int): the index of the window.
+
+        Returns:
+            out (tuple): views of the data, target and outlier labels (if
+                ``return_outlier_label`` is ``True``) in the window.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Window index out of range.")
+        begin = index * self.step
+        window = slice(begin, begin + self.window_size)
+        data = self.dataloader.get_data()
+        target = self.dataloader.get_target()
+        if not self.return_outlier_label:
+            return data[window], target[window]
+        return (
+            data[window],
+            target[window],
+            torch.as_tensor(self.dataloader.outlier_label[window]),
+        )
+
+    def __iter__(self):
+        """
+        Iterate over the windows in order.
+        """
+        for index in range(len(self)):
+            yield self[index]
+
+    def windows(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Return all the full windows at once, as strided views of shape
+        (num_windows, window_size, ...) over the data and the target.
+
+        Returns:
+            data (torch.Tensor): the view of the data windows.
+            target (torch.Tensor): the view of the target windows.
+        """
+        return (
+            sliding_windows(self.dataloader.get_data(), self.window_size, self.step),
+            sliding_windows(self.dataloader.get_target(), self.window_size, self.step),
+        )
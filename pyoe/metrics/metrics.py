@@ -3,9 +3,8 @@ import numpy as np
 from abc import abstractmethod
 from sklearn.linear_model import LinearRegression
 from torch.utils.data import DataLoader
-from menelaus.concept_drift import DDM
 from ..models import ModelTemplate
-from ..dataloaders import Dataloader
+from ..dataloaders import Dataloader, BatchDataloader
 
 
 class MetricTemplate:
@@ -59,7 +58,7 @@ class EffectivenessMetric(MetricTemplate):
             out (float): the average loss of the model on the whole dataset.
         """
         loss = 0.0
-        torch_dataloader = DataLoader(self.dataloader, batch_size=64, shuffle=True)
+        torch_dataloader = BatchDataloader(self.dataloader, batch_size=64, shuffle=True)
         for X, y, _ in torch_dataloader:
             X, y = X.to(self.model.device).float(), y.to(self.model.device).float()
             loss += self.model.calculate_loss(X, y)
@@ -101,6 +100,8 @@ class DriftDelayMetric(MetricTemplate):
                 drift state. Defaults to 3.
             **kwargs: other arguments that you want to pass
         """
+        from menelaus.concept_drift import DDM
+
         super().__init__(dataloader, model, **kwargs)
         self.ddm = DDM(
             n_threshold=n_threshold,
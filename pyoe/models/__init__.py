@@ -1,2 +1,3 @@
 from .models import *
 from .networks import *
+from .exemplars import *
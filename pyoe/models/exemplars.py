@@ -0,0 +1,215 @@
+import torch
+from typing import Callable, Literal
+
+
+class ExemplarMemory:
+    """
+    A fixed-capacity exemplar memory for iCaRL. The exemplars are kept in tensors
+    preallocated on the device, so the memory is bounded and survives across
+    training batches. For classification, the capacity is split evenly between the
+    classes and every class owns a contiguous block of slots. For regression, all
+    the slots are shared.
+
+    Two replacement policies are supported:
+
+    - ``"herding"``: the exemplars of a class are the samples (already stored or
+      new) whose features are the closest to the mean features of the class.
+    - ``"ring"``: new samples of a class overwrite its oldest exemplars.
+
+    Both policies rank the candidates of all the classes at once with masks and
+    sorting, so an update costs O(batch + capacity).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        num_columns: int,
+        num_classes: int | None = None,
+        policy: Literal["herding", "ring"] = "herding",
+        device: Literal["cpu", "cuda"] = "cpu",
+    ):
+        """
+        Args:
+            capacity (int): the maximum number of exemplars.
+            num_columns (int): the number of columns of the data.
+            num_classes (int | None): the number of classes, ``None`` for regression.
+            policy (Literal["herding", "ring"]): how the exemplars are replaced.
+            device (Literal["cpu", "cuda"]): the device to keep the exemplars on.
+        """
+        if policy not in ("herding", "ring"):
+            raise ValueError(f"Replacement policy {policy} is not supported.")
+        self.capacity = capacity
+        self.num_classes = num_classes
+        self.policy = policy
+        self.device = device
+        # number of slots of each class (a single class for regression)
+        self.num_groups = num_classes or 1
+        self.slots_per_group = capacity // self.num_groups
+        num_slots = self.slots_per_group * self.num_groups
+        self.x = torch.zeros((num_slots, num_columns), device=device)
+        self.y = torch.zeros(
+            num_slots, dtype=torch.long if num_classes else torch.float, device=device
+        )
+        self.valid = torch.zeros(num_slots, dtype=torch.bool, device=device)
+        # the next slot to overwrite in each class with the ring policy
+        self.position = torch.zeros(self.num_groups, dtype=torch.long, device=device)
+
+    def __len__(self) -> int:
+        """
+        Return the number of stored exemplars.
+
+        Returns:
+            out (int): the number of stored exemplars.
+        """
+        return int(self.valid.sum())
+
+    def get(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Return the stored exemplars.
+
+        Returns:
+            x (torch.Tensor): the data of the exemplars.
+            y (torch.Tensor): the labels (classification) or targets (regression) of
+                the exemplars.
+        """
+        return self.x[self.valid], self.y[self.valid]
+
+    def update(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        feature_extractor: Callable[[torch.Tensor], torch.Tensor] | None = None,
+    ) -> None:
+        """
+        Offer new samples to the memory.
+
+        Args:
+            X (torch.Tensor): the data of the samples.
+            y (torch.Tensor): the labels (classification) or targets (regression) of
+                the samples.
+            feature_extractor (Callable | None): the function that maps data to
+                features, required by the herding policy.
+        """
+        if self.slots_per_group == 0 or X.shape[0] == 0:
+            return
+        X = X.to(self.device, torch.float)
+        y = y.to(self.device, self.y.dtype).reshape(-1)
+        if self.policy == "herding":
+            if feature_extractor is None:
+                raise ValueError("Herding requires a feature extractor.")
+            self.__update_herding(X, y, feature_extractor)
+        else:
+            self.__update_ring(X, y)
+
+    def __groups(self, y: torch.Tensor) -> torch.Tensor:
+        """
+        Return the group (class, or 0 for regression) of each sample.
+
+        Args:
+            y (torch.Tensor): the labels or targets of the samples.
+
+        Returns:
+            out (torch.Tensor): the group of each sample.
+        """
+        if self.num_classes:
+            return y
+        return torch.zeros_like(y, dtype=torch.long)
+
+    def __store(
+        self, X: torch.Tensor, y: torch.Tensor, slots: torch.Tensor
+    ) -> None:
+        """
+        Write samples into the given slots.
+
+        Args:
+            X (torch.Tensor): the data of the samples.
+            y (torch.Tensor): the labels or targets of the samples.
+            slots (torch.Tensor): the slot of each sample.
+        """
+        self.x[slots] = X
+        self.y[slots] = y
+        self.valid[slots] = True
+
+    def __update_herding(
+        self,
+        X: torch.Tensor,
+        y: torch.Tensor,
+        feature_extractor: Callable[[torch.Tensor], torch.Tensor],
+    ) -> None:
+        """
+        Keep the candidates which are the closest to the mean features of their class.
+
+        Args:
+            X (torch.Tensor): the data of the new samples.
+            y (torch.Tensor): the labels or targets of the new samples.
+            feature_extractor (Callable): the function that maps data to features.
+        """
+        # the candidates are the stored exemplars and the new samples
+        stored_x, stored_y = self.get()
+        candidates_x = torch.cat((stored_x, X))
+        candidates_y = torch.cat((stored_y, y))
+        groups = self.__groups(candidates_y)
+
+        with torch.no_grad():
+            features = feature_extractor(candidates_x).reshape(len(candidates_x), -1)
+        # the mean features of each class
+        sums = torch.zeros(
+            (self.num_groups, features.shape[1]), device=self.device
+        ).index_add_(0, groups, features)
+        counts = torch.bincount(groups, minlength=self.num_groups).clamp(min=1)
+        means = sums / counts.unsqueeze(1)
+        distance = torch.norm(features - means[groups], dim=1)
+
+        # order the candidates by class, then by distance within the class
+        order = torch.argsort(distance)
+        order = order[torch.argsort(groups[order], stable=True)]
+        rank = self.__rank_in_group(groups[order])
+        keep = order[rank < self.slots_per_group]
+        rank = rank[rank < self.slots_per_group]
+
+        self.valid[:] = False
+        self.__store(
+            candidates_x[keep],
+            candidates_y[keep],
+            groups[keep] * self.slots_per_group + rank,
+        )
+
+    def __update_ring(self, X: torch.Tensor, y: torch.Tensor) -> None:
+        """
+        Overwrite the oldest exemplars of each class with the new samples.
+
+        Args:
+            X (torch.Tensor): the data of the new samples.
+            y (torch.Tensor): the labels or targets of the new samples.
+        """
+        groups = self.__groups(y)
+        # the samples of each class in order of arrival
+        order = torch.argsort(groups, stable=True)
+        rank = self.__rank_in_group(groups[order])
+        counts = torch.bincount(groups, minlength=self.num_groups)
+        # only the newest samples of a class fit in its slots
+        keep = rank >= counts[groups[order]] - self.slots_per_group
+        order, rank = order[keep], rank[keep]
+
+        group = groups[order]
+        offset = (self.position[group] + rank) % self.slots_per_group
+        self.__store(X[order], y[order], group * self.slots_per_group + offset)
+        self.position = (self.position + counts) % self.slots_per_group
+
+    @staticmethod
+    def __rank_in_group(groups: torch.Tensor) -> torch.Tensor:
+        """
+        Return the position of each element within its group, for sorted groups.
+
+        Args:
+            groups (torch.Tensor): the sorted groups.
+
+        Returns:
+            out (torch.Tensor): the position of each element in its group.
+        """
+        index = torch.arange(len(groups), device=groups.device)
+        is_start = torch.ones_like(groups, dtype=torch.bool)
+        is_start[1:] = groups[1:] != groups[:-1]
+        # the index of the first element of the group of each element
+        start = torch.cummax(torch.where(is_start, index, 0), dim=0).values
+        return index - start
@@ -1,17 +1,18 @@
 import logging
 from abc import abstractmethod
-from typing import Literal
-from torch.utils.data import DataLoader as TorchDataLoader
-from pytorch_tabnet.tab_model import TabNetClassifier, TabNetRegressor
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
+from typing import Literal, TYPE_CHECKING
 from ..OEBench.model import *
 from ..OEBench.ewc import *
-from ..OEBench.arf import *
 from ..OEBench.armnet import *
 from ..algorithms.loss import *
 from ..dataloaders import Dataloader
 from .networks import *
+from .exemplars import ExemplarMemory
+
+# backends (sklearn ensembles, pytorch_tabnet, ...) are heavy to import, so they
+# are imported when the model that needs them is created
+if TYPE_CHECKING:
+    from autogluon.timeseries import TimeSeriesDataFrame
 
 
 class ModelTemplate:
@@ -100,6 +101,22 @@ class ModelTemplate:
         """
         return self.device
 
+    def predict(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        This function is used to get the outputs of the model for the input data,
+        i.e. the outputs of the network for neural network models and the
+        predictions of the estimator for the others.
+
+        Args:
+            X (torch.Tensor): the input data.
+
+        Returns:
+            out (torch.Tensor): the outputs of the model, on the device of ``X``.
+        """
+        if isinstance(self.net, nn.Module):
+            return self.net(X)
+        return torch.as_tensor(self.net.predict(X.cpu().numpy()), device=X.device)
+
 
 class MlpModel(ModelTemplate):
     """
@@ -127,6 +144,8 @@ class MlpModel(ModelTemplate):
             FcNet(self.column_count, hidden_layers, self.output_dim)
             for i in range(ensemble)
         ]
+        # the exemplar memory of iCaRL, created on the first iCaRL training
+        self.exemplars: ExemplarMemory | None = None
 
     def process_model(self, lr: float, **kwargs):
         """
@@ -231,18 +250,14 @@ class MlpModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
+        # move the data to the device once, mini-batches are views of it
+        X = X.to(self.device, torch.float)
+        y = y.to(self.device, torch.float)
         # training for mlp and armnet with epochs times
         for epoch in range(epochs):
             # logging some information for each epoch
             logging.info(f"Starting epoch {epoch + 1}/{epochs}")
-            # use torch.utils.data.DataLoader to load the data
-            x_loader = TorchDataLoader(X, batch_size=batch_size)
-            y_loader = TorchDataLoader(y, batch_size=batch_size)
-
-            for x_batch, y_batch in zip(x_loader, y_loader):
-                # get a batch of x and y
-                x_batch = x_batch.to(self.device).float()
-                y_batch = y_batch.to(self.device).float()
+            for x_batch, y_batch in zip(X.split(batch_size), y.split(batch_size)):
 
                 # using gradient descent to optimize the parameters
                 self.optimizer.zero_grad()
@@ -341,8 +356,14 @@ class MlpModel(ModelTemplate):
         Returns:
             out (tuple): the preprocessed data.
         """
-        self.x_example = None
-        self.y_example = None
+        # the exemplars are kept across calls, unless the buffer size changes
+        if self.exemplars is None or self.exemplars.capacity != buffer_size:
+            self.exemplars = ExemplarMemory(
+                buffer_size,
+                self.column_count,
+                self.output_dim if self.task == "classification" else None,
+                device=self.device,
+            )
         # TODO: need_test is not used in this function
 
         return (X, y, y_outlier, batch_size, epochs, buffer_size)
@@ -370,18 +391,13 @@ class MlpModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
+        # move the data to the device once, mini-batches are views of it
+        X, y = X.to(self.device), y.to(self.device)
+        x_example, y_example = self.exemplars.get()
         # train epochs times
         for epoch in range(epochs):
             logging.info(f"Starting epoch {epoch + 1}/{epochs}")
-            # use torch.utils.data.DataLoader to load the data
-            x_loader = TorchDataLoader(X, batch_size=batch_size)
-            y_loader = TorchDataLoader(y, batch_size=batch_size)
-
-            for x_batch, y_batch in zip(x_loader, y_loader):
-                # get a batch of x and y
-                x_batch = x_batch.to(self.device)
-                y_batch = y_batch.to(self.device)
-
+            for x_batch, y_batch in zip(X.split(batch_size), y.split(batch_size)):
                 # zero the gradient
                 self.optimizer.zero_grad()
                 out = self.net(x_batch)
@@ -389,9 +405,11 @@ class MlpModel(ModelTemplate):
                     out = out.reshape(-1)
                 # calculate the loss
                 loss = self.criterion(out, y_batch)
-                if self.x_example is not None:
-                    out_e = self.net(self.x_example)
-                    loss += self.criterion(out_e, self.y_example)
+                if len(x_example) > 0:
+                    out_e = self.net(x_example)
+                    if self.task == "regression":
+                        out_e = out_e.reshape(-1)
+                    loss += self.criterion(out_e, y_example)
                 # backward and optimize
                 loss.backward()
 
@@ -422,63 +440,12 @@ class MlpModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
-        # prepare some variables here
-        examples = [[] for _ in range(self.output_dim)]
-        buffer_class = int(buffer_size / self.output_dim)
-
-        # post processing
-        if self.task == "regression":
-            if self.x_example is None:
-                features = self.net.feature_extractor(X).detach()
-                avg = torch.mean(features, dim=0).unsqueeze(0)
-                distance = torch.norm(features - avg, dim=1)
-                chosen_k = min(buffer_size, len(distance))
-                _, indices = torch.topk(distance, k=chosen_k, largest=False)
-                self.x_example = X[indices].to(self.device)
-                self.y_example = y[indices].to(self.device)
-        elif self.task == "classification":
-            update = False
-            # iterate over all output dimensions
-            for i in range(self.output_dim):
-                if len(examples[i]) < buffer_class and i in y:
-                    # get some information of the current class
-                    targeted_data_list = [X[j] for j in range(len(y)) if y[j][i] == 1]
-                    data_class = (
-                        torch.stack(targeted_data_list).to(self.device)
-                        if len(targeted_data_list) > 0
-                        else torch.tensor([]).to(self.device)
-                    )
-                    features = self.net.feature_extractor(data_class).detach()
-                    avg = torch.mean(features, dim=0).unsqueeze(0)
-                    distance = torch.norm(features - avg, dim=1)
-                    chosen_k = min(buffer_class - len(examples[i]), len(distance))
-                    _, indices = torch.topk(distance, k=chosen_k, largest=False)
-                    examples[i] = (
-                        data_class[indices]
-                        if len(examples[i]) == 0
-                        else torch.cat((examples[i], data_class[indices]), dim=0)
-                    )
-                    update = True
-
-            # if update is needed
-            if update:
-                self.x_example = []
-                for i in range(self.output_dim):
-                    if len(examples[i]) == 0:
-                        continue
-                    if len(self.x_example) == 0:
-                        self.x_example = examples[i]
-                        self.y_example = torch.ones(examples[i].shape[0]) * i
-                    else:
-                        self.x_example = torch.cat((self.x_example, examples[i]), dim=0)
-                        self.y_example = torch.cat(
-                            (self.y_example, torch.ones(examples[i].shape[0]) * i),
-                            dim=0,
-                        )
-
-                # convert the data type of y to long and move the data to device
-                self.x_example = self.x_example.to(self.device)
-                self.y_example = self.y_example.long().to(self.device)
+        # offer the batch to the exemplar memory, which keeps for each class the
+        # samples closest to the mean features of the class
+        if self.task == "classification":
+            # the target is one-hot encoded
+            y = torch.argmax(y.reshape(len(y), -1), dim=1)
+        self.exemplars.update(X, y, self.net.feature_extractor)
 
     def calculate_loss(self, X: torch.Tensor, y: torch.Tensor) -> float:
         """
@@ -510,17 +477,35 @@ class TreeModel(ModelTemplate):
         dataloader: Dataloader,
         ensemble: int = 1,
         device: Literal["cpu"] = "cpu",
+        mode: Literal["refit", "stream"] = "refit",
     ):
         """
         Args:
             dataloader (Dataloader): the dataloader object that contains the dataset.
             ensemble (int): the number of models in the ensemble.
             device (Literal["cpu"]): the device that you want to use for training.
+            mode (Literal["refit", "stream"]): "refit" fits a new decision tree on
+                every batch, "stream" grows a Hoeffding tree incrementally from all
+                the batches (requires river).
         """
+        from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
         super().__init__(dataloader, ensemble, device)
         self.model_type = "tree"
+        self.mode = mode
         # initialization for Tree model
-        if self.task == "classification":
+        if mode == "stream":
+            if self.task not in ("classification", "regression"):
+                logging.error(f"Task {self.task} not supported.")
+                raise ValueError("Task not supported.")
+            self.net = HoeffdingTreeNet(self.task, self.output_dim)
+            self.net_ensemble = [
+                HoeffdingTreeNet(self.task, self.output_dim) for i in range(ensemble)
+            ]
+        elif mode != "refit":
+            logging.error(f"Mode {mode} not supported.")
+            raise ValueError("Mode not supported.")
+        elif self.task == "classification":
             self.net = DecisionTreeClassifier()
             self.net_ensemble = [DecisionTreeClassifier() for i in range(ensemble)]
         elif self.task == "regression":
@@ -626,8 +611,11 @@ class TreeModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
-        # training for mlp and armnet with epochs times
-        self.net.fit(X, y)
+        # a decision tree is rebuilt from the batch, a Hoeffding tree is updated
+        if self.mode == "stream":
+            self.net.partial_fit(X, y)
+        else:
+            self.net.fit(X, y)
 
     def __train_naive_footer(
         self,
@@ -709,17 +697,46 @@ class GdbtModel(ModelTemplate):
         dataloader: Dataloader,
         ensemble: int = 1,
         device: Literal["cpu"] = "cpu",
+        mode: Literal["exact", "hist", "warm_start"] = "exact",
+        trees_per_fit: int = 10,
     ):
         """
         Args:
             dataloader (Dataloader): the dataloader object that contains the dataset.
             ensemble (int): the number of models in the ensemble.
             device (Literal["cpu"]): the device that you want to use for training.
+            mode (Literal["exact", "hist", "warm_start"]): "exact" retrains an exact
+                GBDT on every batch, "hist" retrains a histogram-based GBDT on
+                features binned once for the dataset, and "warm_start" adds
+                ``trees_per_fit`` trees to the histogram-based GBDT for every batch.
+            trees_per_fit (int): the number of trees added for every batch in
+                "warm_start" mode.
         """
+        from sklearn.ensemble import GradientBoostingClassifier
+        from sklearn.ensemble import GradientBoostingRegressor
+
         super().__init__(dataloader, ensemble, device)
         self.model_type = "gbdt"
+        self.mode = mode
         # initialization for GBDT model
-        if self.task == "classification":
+        if mode in ("hist", "warm_start"):
+            if self.task not in ("classification", "regression"):
+                logging.error(f"Task {self.task} not supported.")
+                raise ValueError("Task not supported.")
+            # the bins are computed once for the dataset and shared by all the models
+            bin_edges = HistGbdtNet.compute_bin_edges(dataloader.get_data())
+            options = dict(
+                warm_start=mode == "warm_start", trees_per_fit=trees_per_fit
+            )
+            self.net = HistGbdtNet(self.task, self.output_dim, bin_edges, **options)
+            self.net_ensemble = [
+                HistGbdtNet(self.task, self.output_dim, bin_edges, **options)
+                for i in range(ensemble)
+            ]
+        elif mode != "exact":
+            logging.error(f"Mode {mode} not supported.")
+            raise ValueError("Mode not supported.")
+        elif self.task == "classification":
             self.net = GradientBoostingClassifier()
             self.net_ensemble = [GradientBoostingClassifier() for i in range(ensemble)]
         elif self.task == "regression":
@@ -825,7 +842,7 @@ class GdbtModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
-        # training for mlp and armnet with epochs times
+        # retrain the model on the batch, or add trees to it with warm start
         self.net.fit(X, y)
 
     def __train_naive_footer(
@@ -914,17 +931,32 @@ class TabnetModel(ModelTemplate):
         dataloader: Dataloader,
         ensemble: int = 1,
         device: Literal["cpu"] = "cpu",
+        mode: Literal["refit", "incremental"] = "refit",
     ):
         """
         Args:
             dataloader (Dataloader): the dataloader object that contains the dataset.
             ensemble (int): the number of models in the ensemble.
             device (Literal["cpu"]): the device that you want to use for training.
+            mode (Literal["refit", "incremental"]): "refit" fits a new TabNet on
+                every batch, "incremental" keeps the network and its optimizer and
+                goes on training them on every batch.
         """
+        from pytorch_tabnet.tab_model import TabNetClassifier, TabNetRegressor
+
         super().__init__(dataloader, ensemble, device)
         self.model_type = "tabnet"
+        self.mode = mode
         # initialization for TabNet model
-        if self.task == "classification":
+        if mode == "incremental":
+            if self.task not in ("classification", "regression"):
+                logging.error(f"Task {self.task} not supported.")
+                raise ValueError("Task not supported.")
+            self.net = IncrementalTabnetNet(self.task, self.output_dim)
+        elif mode != "refit":
+            logging.error(f"Mode {mode} not supported.")
+            raise ValueError("Mode not supported.")
+        elif self.task == "classification":
             self.net = TabNetClassifier()
         elif self.task == "regression":
             self.net = TabNetRegressor()
@@ -1008,9 +1040,11 @@ class TabnetModel(ModelTemplate):
         elif self.task == "classification":
             y = y.argmax(dim=1)
 
-        # transit the data type of X and y to numpy array
-        X: np.ndarray = X.cpu().numpy()
-        y: np.ndarray = y.cpu().numpy()
+        # the incremental network takes the tensors as they are, while TabNet
+        # needs numpy arrays
+        if self.mode == "refit":
+            X: np.ndarray = X.cpu().numpy()
+            y: np.ndarray = y.cpu().numpy()
 
         return (X, y, y_outlier, batch_size, epochs)
 
@@ -1035,13 +1069,16 @@ class TabnetModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
-        self.net.fit(
-            X,
-            y,
-            batch_size=batch_size,
-            virtual_batch_size=batch_size,
-            max_epochs=epochs,
-        )
+        if self.mode == "incremental":
+            self.net.partial_fit(X, y, batch_size=batch_size, epochs=epochs)
+        else:
+            self.net.fit(
+                X,
+                y,
+                batch_size=batch_size,
+                virtual_batch_size=batch_size,
+                max_epochs=epochs,
+            )
 
     def __train_naive_footer(
         self,
@@ -1131,15 +1168,27 @@ class ArmnetModel(ModelTemplate):
         dataloader: Dataloader,
         ensemble: int = 1,
         device: Literal["cpu", "cuda"] = "cuda",
+        compile_net: bool = False,
+        entmax_method: Literal["auto", "bisect", "adaptive"] = "auto",
     ):
         """
         Args:
             dataloader (Dataloader): the dataloader object that contains the dataset.
             ensemble (int): the number of models in the ensemble.
             device (Literal["cpu", "cuda"]): the device that you want to use for training.
+            compile_net (bool): if True, the network is compiled with ``torch.compile``,
+                which fuses the embedding and attention kernels. The first batches
+                are slower while the network is compiled.
+            entmax_method (Literal["auto", "bisect", "adaptive"]): how the sparse
+                attention (1.7-entmax) is computed. "bisect" runs a fixed number of
+                bisection iterations, "adaptive" and "auto" stop the bisection once
+                it has converged.
         """
         super().__init__(dataloader, ensemble, device)
         self.model_type = "armnet"
+        # the field ids are the same for every row, so they are computed once and
+        # broadcast over the batch by the embedding
+        self.__field_ids = torch.arange(self.column_count, device=device).view(1, -1)
         # initialization for ARMNet model
         self.net = ARMNetModel(
             self.column_count,
@@ -1155,7 +1204,10 @@ class ArmnetModel(ModelTemplate):
             3,
             16,
             noutput=self.output_dim,
+            entmax_method=entmax_method,
         ).to(device)
+        if compile_net:
+            self.net = torch.compile(self.net)
 
     def process_model(self, lr: float, **kwargs):
         """
@@ -1194,13 +1246,7 @@ class ArmnetModel(ModelTemplate):
         Returns:
             out (dict): the preprocessed data.
         """
-        return {
-            "value": X,
-            "id": torch.arange(X.shape[1])
-            .repeat(X.shape[0])
-            .view(X.shape[0], -1)
-            .to(self.device),
-        }
+        return {"value": X, "id": self.__field_ids}
 
     def train_naive(
         self,
@@ -1280,18 +1326,15 @@ class ArmnetModel(ModelTemplate):
             need_test (bool): if this parameter is True, the accurate loss
                 will be calculated during training.
         """
+        # move the data to the device once, mini-batches are views of it
+        X = X.to(self.device, torch.float)
+        y = y.to(self.device, torch.float)
         # training for mlp and armnet with epochs times
         for epoch in range(epochs):
             # logging some information for each epoch
             logging.info(f"Starting epoch {epoch + 1}/{epochs}")
-            # use torch.utils.data.DataLoader to load the data
-            x_loader = TorchDataLoader(X, batch_size=batch_size)
-            y_loader = TorchDataLoader(y, batch_size=batch_size)
-
-            for x_batch, y_batch in zip(x_loader, y_loader):
-                # get a batch of x and y
-                x_batch = self.__preprocess_x(x_batch.to(self.device).float())
-                y_batch = y_batch.to(self.device).float()
+            for x_batch, y_batch in zip(X.split(batch_size), y.split(batch_size)):
+                x_batch = self.__preprocess_x(x_batch)
 
                 # using gradient descent to optimize the parameters
                 self.optimizer.zero_grad()
@@ -1373,6 +1416,18 @@ class ArmnetModel(ModelTemplate):
 
         return loss.item()
 
+    def predict(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        This function is used to get the outputs of the network for the input data.
+
+        Args:
+            X (torch.Tensor): the input data.
+
+        Returns:
+            out (torch.Tensor): the outputs of the network.
+        """
+        return self.net(self.__preprocess_x(X))
+
 
 class CluStreamModel(ModelTemplate):
     """
@@ -1899,23 +1954,29 @@ class ChronosModel(ModelTemplate):
         """
         pass
 
-    def train_forecast(self, X: pd.DataFrame, y: pd.DataFrame):
+    def train_forecast(
+        self, X: pd.DataFrame | None, y: "pd.DataFrame | TimeSeriesDataFrame"
+    ):
         """
         Train the model with the input data.
 
         Args:
-            X (pd.DataFrame): the input data.
-            y (pd.DataFrame): the target value.
+            X (pd.DataFrame | None): the input data.
+            y (pd.DataFrame | TimeSeriesDataFrame): the target value, or a time
+                series frame (see ``TimeSeriesDataloader.get_time_series_frame``).
         """
         self.net.fit(X, y)
 
-    def predict_forecast(self, X: pd.DataFrame, y: pd.DataFrame) -> TimeSeriesDataFrame:
+    def predict_forecast(
+        self, X: pd.DataFrame | None, y: "pd.DataFrame | TimeSeriesDataFrame"
+    ) -> "TimeSeriesDataFrame":
         """
         Predict the target value of the input data.
 
         Args:
-            X (pd.DataFrame): the input data.
-            y (pd.DataFrame): the target value.
+            X (pd.DataFrame | None): the input data.
+            y (pd.DataFrame | TimeSeriesDataFrame): the target value, or a time
+                series frame (see ``TimeSeriesDataloader.get_time_series_frame``).
 
         Returns:
             out (TimeSeriesDataFrame): the predicted target value of the input data.
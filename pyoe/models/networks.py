@@ -4,17 +4,12 @@ import functools
 import numpy as np
 import pandas as pd
 from torch import nn
-from typing import Literal
-from river import cluster, stream
-from autogluon.timeseries import TimeSeriesDataFrame, TimeSeriesPredictor
-from ..OEBench.ADBench.baseline.PyOD import PYOD
-from streamad.model import (
-    xStreamDetector,
-    RShashDetector,
-    HSTreeDetector,
-    LodaDetector,
-    RrcfDetector,
-)
+from typing import Literal, TYPE_CHECKING
+
+# backends (river, streamad, PyOD, autogluon) are heavy to import, so they are
+# imported when the network that needs them is created
+if TYPE_CHECKING:
+    from autogluon.timeseries import TimeSeriesDataFrame
 
 
 class ClusterNet(nn.Module):
@@ -37,6 +32,8 @@ class ClusterNet(nn.Module):
         Args:
             X (torch.Tensor): the input data.
         """
+        from river import stream
+
         for x, _ in stream.iter_array(X.numpy().tolist()):
             self.stream.learn_one(x)
 
@@ -50,6 +47,8 @@ class ClusterNet(nn.Module):
         Returns:
             out (torch.Tensor): the predicted cluster assignments.
         """
+        from river import stream
+
         return torch.tensor(
             [
                 self.stream.predict_one(x)
@@ -67,6 +66,8 @@ class CluStreamNet(ClusterNet):
         """
         Initialize the CluStream network.
         """
+        from river import cluster
+
         super().__init__(cluster.CluStream())
 
 
@@ -79,6 +80,8 @@ class DbStreamNet(ClusterNet):
         """
         Initialize the DBStream network.
         """
+        from river import cluster
+
         super().__init__(cluster.DBSTREAM())
 
 
@@ -91,6 +94,8 @@ class DenStreamNet(ClusterNet):
         """
         Initialize the DenStream network.
         """
+        from river import cluster
+
         super().__init__(cluster.DenStream())
 
 
@@ -103,6 +108,8 @@ class StreamKMeansNet(ClusterNet):
         """
         Initialize the StreamKMeans network.
         """
+        from river import cluster
+
         super().__init__(cluster.STREAMKMeans())
 
 
@@ -128,6 +135,8 @@ class OutlierDetectorNet(nn.Module):
             out (np.ndarray): the detected outliers.
         """
 
+        from ..OEBench.ADBench.baseline.PyOD import PYOD
+
         # assign PYOD seed and model
         seed = 0
         model_dict = {
@@ -185,6 +194,8 @@ class XStreamDetectorNet(OutlierDetectorNet):
         """
         Initialize the xStreamDetector network.
         """
+        from streamad.model import xStreamDetector
+
         super().__init__(xStreamDetector(depth=10))
 
 
@@ -197,6 +208,8 @@ class RShashDetectorNet(OutlierDetectorNet):
         """
         Initialize the RShashDetector network.
         """
+        from streamad.model import RShashDetector
+
         super().__init__(RShashDetector(components_num=10))
 
 
@@ -209,6 +222,8 @@ class HSTreeDetectorNet(OutlierDetectorNet):
         """
         Initialize the HSTreeDetector network.
         """
+        from streamad.model import HSTreeDetector
+
         super().__init__(HSTreeDetector())
 
 
@@ -221,6 +236,8 @@ class LodaDetectorNet(OutlierDetectorNet):
         """
         Initialize the LodaDetector network.
         """
+        from streamad.model import LodaDetector
+
         super().__init__(LodaDetector())
 
 
@@ -233,9 +250,432 @@ class RrcfDetectorNet(OutlierDetectorNet):
         """
         Initialize the RrcfDetector network.
         """
+        from streamad.model import RrcfDetector
+
         super().__init__(RrcfDetector())
 
 
+class HoeffdingTreeNet:
+    """
+    Hoeffding tree for streaming classification and regression. The tree is grown
+    incrementally from split statistics kept in its leaves, so learning a row costs
+    the same whatever the length of the stream. It follows the ``fit``/``predict``
+    interface of sklearn trees, and classification outputs are one-hot encoded like
+    those of a sklearn tree fitted on one-hot targets.
+    """
+
+    def __init__(
+        self,
+        task: Literal["classification", "regression"],
+        output_dim: int,
+        grace_period: int = 200,
+        delta: float = 1e-7,
+    ) -> None:
+        """
+        Args:
+            task (Literal["classification", "regression"]): the task of the tree.
+            output_dim (int): the number of classes for classification.
+            grace_period (int): the number of rows a leaf learns between split attempts.
+            delta (float): the significance level of the Hoeffding bound.
+        """
+        from river import tree
+
+        self.task = task
+        self.output_dim = output_dim
+        if task == "classification":
+            self.tree = tree.HoeffdingTreeClassifier(
+                grace_period=grace_period, delta=delta
+            )
+        elif task == "regression":
+            self.tree = tree.HoeffdingTreeRegressor(
+                grace_period=grace_period, delta=delta
+            )
+        else:
+            raise ValueError(f"Task {task} is not supported.")
+
+    def partial_fit(
+        self, X: torch.Tensor | np.ndarray, y: torch.Tensor | np.ndarray
+    ) -> "HoeffdingTreeNet":
+        """
+        Learn from the rows one by one, keeping what was learnt before.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the target (one-hot encoded for
+                classification).
+
+        Returns:
+            out (HoeffdingTreeNet): the tree itself.
+        """
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+        if self.task == "classification":
+            y = y.reshape(len(y), -1).argmax(axis=1)
+        else:
+            y = y.reshape(-1).astype(np.float64)
+        for row, target in zip(X, y.tolist()):
+            self.tree.learn_one(dict(enumerate(row.tolist())), target)
+        return self
+
+    def fit(
+        self, X: torch.Tensor | np.ndarray, y: torch.Tensor | np.ndarray
+    ) -> "HoeffdingTreeNet":
+        """
+        Same as ``partial_fit``: the tree is updated, not rebuilt.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the target.
+
+        Returns:
+            out (HoeffdingTreeNet): the tree itself.
+        """
+        return self.partial_fit(X, y)
+
+    def predict(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Predict the target of the rows.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the one-hot encoded classes for classification, the
+                predicted values for regression.
+        """
+        rows = [dict(enumerate(row)) for row in np.asarray(X, np.float64).tolist()]
+        if self.task == "regression":
+            return np.array([self.tree.predict_one(row) for row in rows], np.float64)
+        # the tree predicts nothing before it has learnt a class
+        labels = [self.tree.predict_one(row) for row in rows]
+        labels = np.array([0 if label is None else label for label in labels], int)
+        return np.eye(self.output_dim)[labels]
+
+
+class HistGbdtNet:
+    """
+    Histogram-based gradient boosting for classification and regression. The
+    features are binned with quantile edges computed once for the whole dataset,
+    so every batch is binned the same way and the trees can be grown across batches.
+    With ``warm_start``, each call of ``fit`` adds trees to the model instead of
+    retraining it. Split finding is multi-threaded by sklearn (OpenMP).
+    """
+
+    def __init__(
+        self,
+        task: Literal["classification", "regression"],
+        output_dim: int,
+        bin_edges: list[np.ndarray],
+        warm_start: bool = False,
+        trees_per_fit: int = 10,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            task (Literal["classification", "regression"]): the task of the model.
+            output_dim (int): the number of classes for classification.
+            bin_edges (list[np.ndarray]): the bin edges of each column, see
+                ``HistGbdtNet.compute_bin_edges``.
+            warm_start (bool): if True, each ``fit`` adds ``trees_per_fit`` trees to
+                the model instead of retraining it.
+            trees_per_fit (int): the number of trees added by each ``fit`` with
+                ``warm_start``.
+            **kwargs: other parameters of the sklearn histogram gradient boosting.
+        """
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        self.task = task
+        self.output_dim = output_dim
+        self.bin_edges = bin_edges
+        self.warm_start = warm_start
+        self.trees_per_fit = trees_per_fit
+        # early stopping would hold out a different part of every batch
+        kwargs.setdefault("early_stopping", False)
+        if warm_start:
+            kwargs.update(warm_start=True, max_iter=0)
+        if task == "classification":
+            self.model = HistGradientBoostingClassifier(**kwargs)
+        elif task == "regression":
+            self.model = HistGradientBoostingRegressor(**kwargs)
+        else:
+            raise ValueError(f"Task {task} is not supported.")
+
+    @staticmethod
+    def compute_bin_edges(
+        data: torch.Tensor | np.ndarray, max_bins: int = 255
+    ) -> list[np.ndarray]:
+        """
+        Compute the quantile bin edges of each column of the data.
+
+        Args:
+            data (torch.Tensor | np.ndarray): the data of the whole dataset.
+            max_bins (int): the maximum number of bins of a column.
+
+        Returns:
+            out (list[np.ndarray]): the bin edges of each column.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        quantiles = np.linspace(0, 1, max_bins + 1)[1:-1]
+        with np.errstate(all="ignore"):
+            # all-NaN columns give NaN edges, which are dropped below
+            edges = np.nanquantile(data, quantiles, axis=0).T
+        return [np.unique(column[~np.isnan(column)]) for column in edges]
+
+    def transform(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Replace the values of the data by their bin indices. Missing values are kept.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the binned data.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        binned = np.empty(X.shape, dtype=np.float32)
+        for column, edges in enumerate(self.bin_edges):
+            binned[:, column] = np.searchsorted(edges, X[:, column], side="right")
+        binned[np.isnan(X)] = np.nan
+        return binned
+
+    def fit(
+        self, X: torch.Tensor | np.ndarray, y: torch.Tensor | np.ndarray
+    ) -> "HistGbdtNet":
+        """
+        Train the model on the data, or add trees to it with ``warm_start``.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the labels (classification) or targets
+                (regression).
+
+        Returns:
+            out (HistGbdtNet): the model itself.
+        """
+        X, y = self.transform(X), np.asarray(y).reshape(-1)
+        weight = np.ones(len(y))
+        if self.task == "classification":
+            # a row of weight zero for each class, so that all the fits see the same
+            # classes even if a batch misses some of them
+            X = np.concatenate((X, np.zeros((self.output_dim, X.shape[1]), X.dtype)))
+            y = np.concatenate((y.astype(int), np.arange(self.output_dim)))
+            weight = np.concatenate((weight, np.zeros(self.output_dim)))
+        if self.warm_start:
+            self.model.max_iter += self.trees_per_fit
+        self.model.fit(X, y, sample_weight=weight)
+        return self
+
+    def partial_fit(
+        self, X: torch.Tensor | np.ndarray, y: torch.Tensor | np.ndarray
+    ) -> "HistGbdtNet":
+        """
+        Same as ``fit``.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the labels or targets.
+
+        Returns:
+            out (HistGbdtNet): the model itself.
+        """
+        return self.fit(X, y)
+
+    def predict(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Predict the labels (classification) or values (regression) of the rows.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the predictions.
+        """
+        return self.model.predict(self.transform(X))
+
+    def predict_proba(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Predict the class probabilities of the rows (classification only).
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the probabilities of shape ``(rows, output_dim)``.
+        """
+        return self.model.predict_proba(self.transform(X))
+
+
+class IncrementalTabnetNet:
+    """
+    TabNet trained incrementally. The network and its optimizer are created once
+    and kept across the calls of ``partial_fit``, which train them on the rows
+    directly, without building datasets and dataloaders. The classes are fixed to
+    ``0 .. output_dim - 1`` up front, so a batch may miss some of them.
+    """
+
+    def __init__(
+        self,
+        task: Literal["classification", "regression"],
+        output_dim: int,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            task (Literal["classification", "regression"]): the task of the model.
+            output_dim (int): the number of classes for classification, or the
+                number of targets for regression.
+            **kwargs: other parameters of the TabNet model.
+        """
+        from pytorch_tabnet.tab_model import TabNetClassifier, TabNetRegressor
+
+        self.task = task
+        self.output_dim = output_dim
+        if task == "classification":
+            self.model = TabNetClassifier(**kwargs)
+        elif task == "regression":
+            self.model = TabNetRegressor(**kwargs)
+        else:
+            raise ValueError(f"Task {task} is not supported.")
+
+    def __setup(self, num_columns: int, batch_size: int) -> None:
+        """
+        Create the network, the optimizer and the loss of the TabNet model by
+        fitting it for zero epochs on one placeholder row per class.
+
+        Args:
+            num_columns (int): the number of columns of the data.
+            batch_size (int): the batch size for training.
+        """
+        if self.task == "classification":
+            y = np.arange(self.output_dim)
+        else:
+            y = np.zeros((2, self.output_dim), dtype=np.float32)
+        self.model.fit(
+            np.zeros((len(y), num_columns), dtype=np.float32),
+            y,
+            max_epochs=0,
+            batch_size=batch_size,
+            virtual_batch_size=batch_size,
+            compute_importance=False,
+        )
+
+    def __to_tensor(self, X: torch.Tensor | np.ndarray, dtype: torch.dtype):
+        """
+        Convert the data to a tensor on the device of the TabNet model.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the data.
+            dtype (torch.dtype): the type of the tensor.
+
+        Returns:
+            out (torch.Tensor): the tensor.
+        """
+        return torch.as_tensor(X, dtype=dtype, device=self.model.device)
+
+    def partial_fit(
+        self,
+        X: torch.Tensor | np.ndarray,
+        y: torch.Tensor | np.ndarray,
+        batch_size: int = 1024,
+        epochs: int = 1,
+    ) -> "IncrementalTabnetNet":
+        """
+        Train the network on the rows, keeping what was learnt before.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the labels (classification) or targets
+                (regression).
+            batch_size (int): the batch size for training.
+            epochs (int): the number of epochs for training.
+
+        Returns:
+            out (IncrementalTabnetNet): the model itself.
+        """
+        if not hasattr(self.model, "network"):
+            self.__setup(X.shape[1], batch_size)
+        X = self.__to_tensor(X, torch.float)
+        if self.task == "classification":
+            y = self.__to_tensor(y, torch.long).reshape(-1)
+        else:
+            y = self.__to_tensor(y, torch.float).reshape(len(X), -1)
+
+        self.model.network.train()
+        for epoch in range(epochs):
+            permutation = torch.randperm(len(X), device=X.device)
+            for index in permutation.split(batch_size):
+                # batch normalization needs more than one row
+                if len(index) > 1:
+                    self.model._train_batch(X[index], y[index])
+        self.model.network.eval()
+        return self
+
+    def fit(
+        self,
+        X: torch.Tensor | np.ndarray,
+        y: torch.Tensor | np.ndarray,
+        batch_size: int = 1024,
+        epochs: int = 1,
+    ) -> "IncrementalTabnetNet":
+        """
+        Same as ``partial_fit``: the network is updated, not rebuilt.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+            y (torch.Tensor | np.ndarray): the labels or targets.
+            batch_size (int): the batch size for training.
+            epochs (int): the number of epochs for training.
+
+        Returns:
+            out (IncrementalTabnetNet): the model itself.
+        """
+        return self.partial_fit(X, y, batch_size, epochs)
+
+    def __forward(self, X: torch.Tensor | np.ndarray) -> torch.Tensor:
+        """
+        Compute the outputs of the network for the rows.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (torch.Tensor): the outputs of the network.
+        """
+        if not hasattr(self.model, "network"):
+            self.__setup(X.shape[1], len(X))
+        self.model.network.eval()
+        with torch.no_grad():
+            out, _ = self.model.network(self.__to_tensor(X, torch.float))
+        return out
+
+    def predict_proba(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Predict the probability of each class for the rows.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the probabilities of the classes.
+        """
+        return torch.softmax(self.__forward(X), dim=1).cpu().numpy()
+
+    def predict(self, X: torch.Tensor | np.ndarray) -> np.ndarray:
+        """
+        Predict the labels (classification) or values (regression) of the rows.
+
+        Args:
+            X (torch.Tensor | np.ndarray): the input data.
+
+        Returns:
+            out (np.ndarray): the predictions.
+        """
+        out = self.__forward(X)
+        if self.task == "classification":
+            out = out.argmax(dim=1)
+        return out.cpu().numpy()
+
+
 class ChronosPredictorNet(nn.Module):
     """
     Chronos model for time series prediction.
@@ -254,6 +694,8 @@ class ChronosPredictorNet(nn.Module):
             model_path (Literal["tiny", "mini", "small", "base", "large"]): the type of the model.
             device (Literal["cpu", "cuda"]): the device to run the model.
         """
+        from autogluon.timeseries import TimeSeriesPredictor
+
         super().__init__()
         self.model = TimeSeriesPredictor(prediction_length=prediction_length)
         self.model_parameters = {
@@ -263,16 +705,48 @@ class ChronosPredictorNet(nn.Module):
                 "device": device,
             }
         }
+        # the last (data, target, time series frame) conversion
+        self.__cached_time_series = None
 
-    def fit(self, X: pd.DataFrame, y: pd.DataFrame) -> None:
+    def __to_time_series(
+        self, X: pd.DataFrame | None, y: "pd.DataFrame | TimeSeriesDataFrame"
+    ) -> "TimeSeriesDataFrame":
         """
-        Learn from the time series data.
+        Convert the data and target frames to a ``TimeSeriesDataFrame``. The last
+        conversion is cached, so fitting and predicting on the same frames builds
+        it only once.
 
         Args:
-            X (pd.DataFrame): the input data.
-            y (pd.DataFrame): the target data.
+            X (pd.DataFrame | None): the input data.
+            y (pd.DataFrame | TimeSeriesDataFrame): the target data, or an
+                already built time series frame (then ``X`` is ignored).
+
+        Returns:
+            out (TimeSeriesDataFrame): the time series frame.
         """
+        from autogluon.timeseries import TimeSeriesDataFrame
+
+        if isinstance(y, TimeSeriesDataFrame):
+            return y
+        cached = self.__cached_time_series
+        if cached is not None and cached[0] is X and cached[1] is y:
+            return cached[2]
         time_series = TimeSeriesDataFrame(y, X)
+        self.__cached_time_series = (X, y, time_series)
+        return time_series
+
+    def fit(
+        self, X: pd.DataFrame | None, y: "pd.DataFrame | TimeSeriesDataFrame"
+    ) -> None:
+        """
+        Learn from the time series data.
+
+        Args:
+            X (pd.DataFrame | None): the input data.
+            y (pd.DataFrame | TimeSeriesDataFrame): the target data, or a time
+                series frame (see ``TimeSeriesDataloader.get_time_series_frame``).
+        """
+        time_series = self.__to_time_series(X, y)
         self.model = self.model.fit(
             time_series,
             hyperparameters=self.model_parameters,
@@ -280,16 +754,18 @@ class ChronosPredictorNet(nn.Module):
             verbosity=0,
         )
 
-    def forward(self, X: pd.DataFrame, y: pd.DataFrame) -> TimeSeriesDataFrame:
+    def forward(
+        self, X: pd.DataFrame | None, y: "pd.DataFrame | TimeSeriesDataFrame"
+    ) -> "TimeSeriesDataFrame":
         """
         Predict the future time series data.
 
         Args:
-            X (pd.DataFrame): the input data.
-            y (pd.DataFrame): the target data.
+            X (pd.DataFrame | None): the input data.
+            y (pd.DataFrame | TimeSeriesDataFrame): the target data, or a time
+                series frame (see ``TimeSeriesDataloader.get_time_series_frame``).
 
         Returns:
             out (TimeSeriesDataFrame): the predicted time series data.
         """
-        time_series = TimeSeriesDataFrame(y, X)
-        return self.model.predict(time_series)
+        return self.model.predict(self.__to_time_series(X, y))
@@ -18,12 +18,12 @@ def fill_missing_value(
     if missing_fill.startswith("knn"):
         num = eval(missing_fill[3:])
         imp = KNNImputer(n_neighbors=num, weights="uniform", keep_empty_features=True)
-        filled = imp.fit_transform(window_x.numpy())
-        return torch.tensor(filled)
+        filled = imp.fit_transform(window_x.cpu().numpy())
+        return torch.tensor(filled, device=window_x.device)
     elif missing_fill == "regression":
         imp = IterativeImputer(keep_empty_features=True)
-        filled = imp.fit_transform(window_x.numpy())
-        return torch.tensor(filled)
+        filled = imp.fit_transform(window_x.cpu().numpy())
+        return torch.tensor(filled, device=window_x.device)
     elif missing_fill == "avg":
         column_means = torch.mean(window_x, dim=0)
         column_means = torch.nan_to_num(column_means, nan=0.0)
@@ -1,19 +1,18 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 def shingle(series: np.array, dim: int) -> np.array:
     """
     Takes a one dimensional series and shingles it into dim dimensions.
+    The result is a read-only strided view, no data is copied for float series.
 
     Args:
         series (np.array): the input series.
         dim (int): the dimension of the shingled array.
 
     Returns:
-        shingled (np.array): the shingled array.
+        shingled (np.array): the shingled array of shape (dim, len(series) - dim + 1).
     """
-    height = len(series) - dim + 1
-    shingled = np.zeros((dim, height))
-    for i in range(dim):
-        shingled[i] = series[i : i + height]
-    return shingled
+    series = np.asarray(series, dtype=float)
+    return sliding_window_view(series, dim).T
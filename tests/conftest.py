@@ -0,0 +1,79 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+DATASET = "dataset_experiment_info/tiny"
+
+
+def write_dataset(
+    data_dir,
+    frame: pd.DataFrame,
+    task: str = "classification",
+    name: str = "tiny",
+    **schema,
+) -> str:
+    """
+    Write a dataset in the layout of the OEBench datasets, with the column "c" as
+    categorical and the column "y" as target.
+
+    Args:
+        data_dir (pathlib.Path): the data directory.
+        frame (pd.DataFrame): the raw data of the dataset.
+        task (str): the task of the dataset.
+        name (str): the name of the dataset.
+        **schema: entries of the schema which replace the default ones.
+
+    Returns:
+        out (str): the name of the dataset, as passed to ``Dataloader``.
+    """
+    (data_dir / "dataset").mkdir(exist_ok=True)
+    frame.to_csv(data_dir / "dataset" / f"{name}.csv", index=False)
+
+    info_dir = data_dir / "dataset_experiment_info" / name
+    info_dir.mkdir(parents=True)
+    info = {"schema": "schema.json", "data": f"dataset/{name}.csv", "task": task}
+    schema = {
+        "categorical": ["c"],
+        "target": ["y"],
+        "timestamp": [],
+        "unnecessary": [],
+        "window size": 50,
+        **schema,
+    }
+    (info_dir / "info.json").write_text(json.dumps(info))
+    (info_dir / "schema.json").write_text(json.dumps(schema))
+    return f"dataset_experiment_info/{name}"
+
+
+def tiny_frame(rows: int = 300, seed: int = 0) -> pd.DataFrame:
+    """
+    Build the raw data of a small classification dataset with some null values.
+
+    Args:
+        rows (int): the number of rows.
+        seed (int): the random seed.
+
+    Returns:
+        out (pd.DataFrame): the raw data.
+    """
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "a": rng.normal(size=rows),
+            "b": rng.integers(0, 5, size=rows).astype(float),
+            "c": rng.choice(["x", "y", "z"], size=rows),
+            "y": rng.choice(["p", "q"], size=rows),
+        }
+    )
+    frame.loc[::17, "a"] = np.nan
+    return frame
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> str:
+    """
+    Write the tiny classification dataset and return the data directory.
+    """
+    write_dataset(tmp_path, tiny_frame())
+    return f"{tmp_path}/"
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from pyoe.dataloaders import Dataloader, get_dataset_cache
+from conftest import tiny_frame, write_dataset
+
+
+def sentinel_frame():
+    """
+    The tiny dataset with sentinel values, null targets and unsorted timestamps.
+    """
+    frame = tiny_frame(rows=500)
+    frame["t"] = np.random.default_rng(1).integers(0, 100, size=len(frame))
+    frame["d"] = "drop me"
+    frame.loc[::11, "b"] = -999
+    frame.loc[::13, "c"] = "?"
+    frame.loc[::19, "y"] = None
+    return frame
+
+
+def load(tmp_path, folder, frame, **options):
+    data_dir = tmp_path / folder
+    data_dir.mkdir()
+    dataset = write_dataset(
+        data_dir,
+        frame,
+        timestamp=["t"],
+        unnecessary=["d"],
+        replace_with_null=[-999, "?"],
+    )
+    dataloader = Dataloader(
+        dataset_name=dataset, data_dir=f"{data_dir}/", imputation="window", **options
+    )
+    cache = get_dataset_cache(dataset, f"{data_dir}/", {"imputation": "window"})
+    return dataloader, cache
+
+
+@pytest.mark.parametrize("chunk_size", [37, 50, 1000])
+def test_chunked_output_equals_in_memory_output(tmp_path, chunk_size):
+    frame = sentinel_frame()
+    expected, expected_cache = load(tmp_path, "memory", frame)
+    chunked, chunked_cache = load(tmp_path, "chunked", frame, chunk_size=chunk_size)
+
+    # the sentinels are null, the rows with a null target are dropped
+    assert chunked.get_num_samples() == (frame["y"].notna()).sum()
+    assert np.isnan(chunked.get_data().numpy()).any()
+    assert chunked.get_num_columns() == expected.get_num_columns()
+    assert chunked.get_output_dim() == expected.get_output_dim()
+    assert chunked.get_missing_rate() == pytest.approx(expected.get_missing_rate())
+    assert np.array_equal(
+        chunked.get_data().numpy(), expected.get_data().numpy(), equal_nan=True
+    )
+    assert np.array_equal(chunked.get_target().numpy(), expected.get_target().numpy())
+
+    nonnull = chunked_cache.load_frame("onehot_nonnull")
+    expected_nonnull = expected_cache.load_frame("onehot_nonnull")
+    assert nonnull.columns.tolist() == expected_nonnull.columns.tolist()
+    assert np.allclose(nonnull.to_numpy(dtype=float), expected_nonnull.to_numpy(float))
+
+
+@pytest.mark.parametrize("rows", [0, 5])
+def test_chunked_ingestion_rejects_datasets_without_targets(tmp_path, rows):
+    frame = tiny_frame(rows=rows)
+    frame["y"] = None
+    dataset = write_dataset(tmp_path, frame)
+    with pytest.raises(ValueError, match="no rows with a target"):
+        Dataloader(dataset_name=dataset, data_dir=f"{tmp_path}/", chunk_size=10)
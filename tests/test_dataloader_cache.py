@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from pyoe.dataloaders import Dataloader, load_cached_arrays, get_dataset_cache
+from pyoe.dataloaders.cache import DatasetCache
+from conftest import DATASET
+
+
+
+def test_mmap_reload_maps_arrays_without_loading_frames(data_dir, monkeypatch):
+    # the first load preprocesses the raw data and builds the cache
+    built = Dataloader(dataset_name=DATASET, data_dir=data_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a cached frame has been loaded")
+
+    monkeypatch.setattr(DatasetCache, "_DatasetCache__load_frame", fail)
+
+    data, target, meta = load_cached_arrays(DATASET, data_dir, "c")
+    assert isinstance(data, np.memmap)
+    assert isinstance(target, np.memmap)
+    assert meta["missing_ratio"] == pytest.approx(built.get_missing_rate())
+
+    mapped = Dataloader(dataset_name=DATASET, data_dir=data_dir, storage="mmap")
+    assert mapped.mapped_cache is not None
+    assert mapped.get_num_samples() == built.get_num_samples()
+    assert mapped.get_num_columns() == built.get_num_columns()
+    assert mapped.get_output_dim() == built.get_output_dim()
+    assert mapped.get_missing_rate() == built.get_missing_rate()
+    assert np.array_equal(mapped.data.numpy(), built.data.numpy(), equal_nan=True)
+    assert np.array_equal(mapped.target.numpy(), built.target.numpy())
+
+
+
+def test_each_option_set_keeps_its_own_cache(data_dir, monkeypatch):
+    from pyoe.dataloaders import pipeline
+
+    global_imputed = Dataloader(dataset_name=DATASET, data_dir=data_dir)
+    window_imputed = Dataloader(
+        dataset_name=DATASET, data_dir=data_dir, imputation="window"
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the raw data has been preprocessed again")
+
+    monkeypatch.setattr(pipeline, "__data_preprocessing", fail)
+    monkeypatch.setattr(pipeline, "__chunked_data_preprocessing", fail)
+    for imputation in ["global", "window", "global"]:
+        Dataloader(dataset_name=DATASET, data_dir=data_dir, imputation=imputation)
+    # chunked ingestion gives the same data as the in-memory one
+    Dataloader(dataset_name=DATASET, data_dir=data_dir, chunk_size=64)
+
+    caches = [
+        get_dataset_cache(DATASET, data_dir, {"imputation": imputation})
+        for imputation in ["global", "window"]
+    ]
+    assert caches[0].cache_dir != caches[1].cache_dir
+    assert caches[0].is_valid() and caches[1].is_valid()
+    assert np.array_equal(
+        global_imputed.get_data().numpy(),
+        window_imputed.get_data().numpy(),
+        equal_nan=True,
+    )
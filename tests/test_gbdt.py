@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from pyoe.dataloaders import Dataloader
+from pyoe.metrics import EffectivenessMetric
+from pyoe.models import GdbtModel, HistGbdtNet
+from conftest import tiny_frame, write_dataset
+
+
+def test_hist_net_predicts_probabilities():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = (X[:, 0] > 0).astype(int)
+    edges = HistGbdtNet.compute_bin_edges(X)
+    net = HistGbdtNet("classification", 2, edges, warm_start=True)
+    net.fit(X, y)
+
+    proba = net.predict_proba(X)
+    assert proba.shape == (200, 2)
+    assert np.allclose(proba.sum(axis=1), 1)
+    assert np.array_equal(proba.argmax(axis=1), net.predict(X))
+
+
+@pytest.mark.parametrize("mode", ["hist", "warm_start"])
+@pytest.mark.parametrize("task", ["classification", "regression"])
+def test_effectiveness_of_hist_modes(tmp_path, mode, task):
+    frame = tiny_frame()
+    if task == "regression":
+        frame["y"] = frame["b"] * 2 + np.arange(len(frame)) % 3
+    dataset = write_dataset(tmp_path, frame, task)
+    dataloader = Dataloader(dataset_name=dataset, data_dir=f"{tmp_path}/")
+
+    model = GdbtModel(dataloader=dataloader, mode=mode)
+    model.process_model()
+    X, y = dataloader.get_data().float(), dataloader.get_target().float()
+    model.train_naive(X, y, None, batch_size=64, epochs=1)
+
+    loss = EffectivenessMetric(dataloader, model).measure()
+    assert np.isfinite(loss)
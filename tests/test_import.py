@@ -0,0 +1,36 @@
+import sys
+import subprocess
+import pyoe
+
+# backends that must not be imported by `import pyoe` alone
+HEAVY_MODULES = ["river", "pytorch_tabnet", "pyod", "autogluon"]
+
+
+def imported_modules(statement: str) -> set[str]:
+    """
+    Return the modules imported by a statement in a fresh interpreter.
+    """
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return set(result.stdout.split())
+
+
+def heavy_modules(modules: set[str]) -> set[str]:
+    return {name.split(".")[0] for name in modules} & set(HEAVY_MODULES)
+
+
+def test_import_does_not_load_heavy_backends():
+    assert not heavy_modules(imported_modules("import pyoe"))
+
+
+def test_unknown_attributes_do_not_import_submodules():
+    modules = imported_modules("import pyoe; assert not hasattr(pyoe, 'foo')")
+    assert "pyoe.models" not in modules and "pyoe.algorithms" not in modules
+    assert not heavy_modules(modules)
+
+
+def test_lazy_attributes_resolve():
+    for name, submodule in pyoe._LAZY_ATTRIBUTES.items():
+        assert getattr(pyoe, name) is getattr(getattr(pyoe, submodule), name)
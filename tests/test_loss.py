@@ -0,0 +1,70 @@
+import torch
+import pytest
+from pyoe.algorithms.loss import (
+    classification_loss,
+    classification_loss_tree,
+    regression_loss,
+    regression_loss_tree,
+)
+
+
+class Predictor:
+    """
+    A tree-like model which predicts with a function of the numpy input.
+    """
+
+    def __init__(self, predict):
+        self.predict = predict
+
+
+# scores predicting the labels 1, 0, 2 and 2, for the true labels 1, 1, 2 and 0
+SCORES = torch.tensor(
+    [[0.1, 0.8, 0.1], [0.7, 0.2, 0.1], [0.2, 0.3, 0.5], [0.3, 0.3, 0.4]]
+)
+LABELS = torch.eye(3)[[1, 1, 2, 0]]
+# predictions 1, 2 and 4 for the targets 1, 3 and 1: squared errors 0, 1 and 9
+VALUES = torch.tensor([[1.0], [2.0], [4.0]])
+TARGETS = torch.tensor([[1.0], [3.0], [1.0]])
+
+
+@pytest.mark.parametrize(
+    "loss",
+    [
+        classification_loss(lambda x: x),
+        classification_loss_tree(Predictor(lambda x: x.argmax(axis=1))),
+    ],
+)
+def test_classification_loss(loss):
+    assert loss.loss(SCORES, LABELS) == pytest.approx(2 / 4)
+    # the second sample (an error) is an outlier
+    outlier = torch.tensor([0.0, 1.0, 0.0, 0.0])
+    assert loss.loss(SCORES, LABELS, outlier) == pytest.approx(1 / 3)
+
+    windows = loss.loss_windows([SCORES[:1], SCORES[1:]], [LABELS[:1], LABELS[1:]])
+    assert windows.tolist() == pytest.approx([0, 2 / 3])
+    windows = loss.loss_windows(
+        [SCORES[:2], SCORES[2:]], [LABELS[:2], LABELS[2:]], [outlier[:2], outlier[2:]]
+    )
+    assert windows.tolist() == pytest.approx([0, 1 / 2])
+
+
+@pytest.mark.parametrize(
+    "loss",
+    [
+        regression_loss(lambda x: x),
+        regression_loss_tree(Predictor(lambda x: x[:, 0])),
+    ],
+)
+def test_regression_loss(loss):
+    # the mean of the squared errors of the samples, not of all the pairs of
+    # predictions and targets
+    assert loss.loss(VALUES, TARGETS) == pytest.approx(10 / 3)
+    outlier = torch.tensor([0.0, 0.0, 1.0])
+    assert loss.loss(VALUES, TARGETS, outlier) == pytest.approx(1 / 2)
+
+    windows = loss.loss_windows([VALUES[:2], VALUES[2:]], [TARGETS[:2], TARGETS[2:]])
+    assert windows.tolist() == pytest.approx([1 / 2, 9])
+    windows = loss.loss_windows(
+        [VALUES[:1], VALUES[1:]], [TARGETS[:1], TARGETS[1:]], [outlier[:1], outlier[1:]]
+    )
+    assert windows.tolist() == pytest.approx([0, 1])
@@ -0,0 +1,150 @@
+import io
+import os
+import hashlib
+import zipfile
+import threading
+import http.server
+import multiprocessing
+from functools import partial
+import pytest
+from pyoe.dataloaders import Dataloader
+from pyoe.dataloaders.store import DatasetStore
+from conftest import DATASET, tiny_frame, write_dataset
+
+
+class ArchiveHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serve the archives of a folder, counting the requests of every path. The
+    path "/short.zip" announces more bytes than it sends, like a dropped
+    connection.
+    """
+
+    def do_GET(self):
+        self.server.requests[self.path] = self.server.requests.get(self.path, 0) + 1
+        if self.path == "/short.zip":
+            body = self.server.short_body
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body) * 2))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def zip_folder(source, entry) -> bytes:
+    """
+    Zip a top-level entry of a folder like the dataset archives.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for root, _, files in os.walk(source / entry):
+            for name in files:
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, source))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    Serve the archives of the tiny dataset and their digest manifest over HTTP,
+    and point the dataset url and the dataset store at them.
+    """
+    source, served = tmp_path / "source", tmp_path / "served"
+    source.mkdir()
+    served.mkdir()
+    write_dataset(source, tiny_frame())
+    checksums = []
+    for entry in ["dataset", "dataset_experiment_info"]:
+        body = zip_folder(source, entry)
+        (served / f"{entry}.zip").write_bytes(body)
+        checksums.append(f"{hashlib.sha256(body).hexdigest()}  {entry}.zip")
+    (served / "SHA256SUMS").write_text("\n".join(checksums) + "\n")
+
+    handler = partial(ArchiveHandler, directory=str(served))
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.requests = {}
+    httpd.served = served
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    monkeypatch.setenv("PYOE_DATASET_URL", url)
+    monkeypatch.setenv("PYOE_STORE_DIR", str(tmp_path / "store"))
+    httpd.url = url
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def construct(data_dir: str) -> int:
+    return Dataloader(dataset_name=DATASET, data_dir=data_dir).get_num_samples()
+
+
+def test_concurrent_dataloaders_download_and_extract_once(
+    tmp_path, server, monkeypatch
+):
+    # count the extractions of all the processes in a file
+    extractions = tmp_path / "extractions"
+    extract = zipfile.ZipFile.extractall
+
+    def counted_extract(archive, path=None, *args, **kwargs):
+        with open(extractions, "a") as f:
+            f.write(f"{os.path.basename(archive.filename)}\n")
+        return extract(archive, path, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", counted_extract)
+
+    data_dir = f"{tmp_path}/data/"
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        num_samples = pool.map(construct, [data_dir] * 4)
+
+    assert num_samples == [300] * 4
+    assert server.requests["/dataset.zip"] == 1
+    assert server.requests["/dataset_experiment_info.zip"] == 1
+    assert len(extractions.read_text().splitlines()) == 2
+    assert sorted(os.listdir(data_dir)) == ["dataset", "dataset_experiment_info"]
+
+
+def test_archive_not_matching_its_digest_is_rejected(tmp_path, server):
+    # the served archive is corrupted after its digest has been published
+    archive = server.served / "dataset.zip"
+    body = bytearray(archive.read_bytes())
+    body[len(body) // 2] ^= 0xFF
+    archive.write_bytes(bytes(body))
+
+    data_dir = tmp_path / "data"
+    with pytest.raises(ValueError, match="checksum mismatch"):
+        Dataloader(dataset_name=DATASET, data_dir=f"{data_dir}/")
+    assert "dataset" not in os.listdir(data_dir)
+    objects = os.listdir(os.path.join(os.environ["PYOE_STORE_DIR"], "objects"))
+    digest = hashlib.sha256(bytes(body)).hexdigest()
+    assert digest not in objects
+
+
+def test_truncated_archive_is_rejected(tmp_path, server):
+    # a truncated archive without a listed digest fails its zip checks
+    body = (server.served / "dataset.zip").read_bytes()
+    (server.served / "truncated.zip").write_bytes(body[: len(body) // 2])
+
+    store = DatasetStore()
+    out_dir = tmp_path / "data"
+    with pytest.raises(zipfile.BadZipFile):
+        store.extract(server.url + "truncated.zip", str(out_dir), ["dataset"])
+    assert os.listdir(out_dir) == []
+    assert not os.listdir(os.path.join(store.root, "objects"))
+
+
+def test_interrupted_download_is_rejected(tmp_path, server):
+    server.short_body = (server.served / "dataset.zip").read_bytes()[:100]
+
+    store = DatasetStore()
+    out_dir = tmp_path / "data"
+    with pytest.raises(Exception, match="100 of 200 bytes"):
+        store.extract(server.url + "short.zip", str(out_dir), ["dataset"])
+    assert os.listdir(out_dir) == []
+    # only the partial file is kept, to resume the download later
+    objects = os.listdir(os.path.join(store.root, "objects"))
+    assert len(objects) == 1 and objects[0].endswith(".part")
@@ -0,0 +1,34 @@
+import os
+import torch
+from pyoe.algorithms import NaiveTrainer, MultiProcessTrainer
+from pyoe.dataloaders import Dataloader
+from pyoe.models import MlpModel
+from pyoe.preprocessors import Preprocessor
+from conftest import DATASET
+
+
+def test_multi_process_training_returns_weights_and_optimizer_state(
+    data_dir, monkeypatch
+):
+    monkeypatch.delenv("MASTER_ADDR", raising=False)
+    monkeypatch.delenv("MASTER_PORT", raising=False)
+    torch.manual_seed(0)
+    dataloader = Dataloader(dataset_name=DATASET, data_dir=data_dir)
+    model = MlpModel(dataloader=dataloader, device="cpu")
+    preprocessor = Preprocessor(missing_fill="zero")
+    trainer = NaiveTrainer(dataloader, model, preprocessor, epochs=1)
+    # an optimizer with a state, which SGD does not have
+    model.optimizer = torch.optim.Adam(model.net.parameters(), lr=0.01)
+    weights = [p.detach().clone() for p in model.net.parameters()]
+
+    MultiProcessTrainer(2, dataloader, trainer, preprocessor).train()
+
+    assert any(
+        not torch.equal(before, after.detach())
+        for before, after in zip(weights, model.net.parameters())
+    )
+    states = [model.optimizer.state[p] for p in model.net.parameters()]
+    # every process runs ceil(300 / 2 / 64) steps
+    assert all(state["step"].item() == 3 for state in states)
+    assert all(state["step"].device.type == "cpu" for state in states)
+    assert "MASTER_PORT" not in os.environ and "MASTER_ADDR" not in os.environ